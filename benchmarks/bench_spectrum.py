@@ -0,0 +1,250 @@
+# coding: utf-8
+
+# Benchmark suite comparing the sampled GLT symbol to the spectrum of the
+# corresponding Toeplitz matrices, for Poisson, convection-diffusion and
+# bilaplacian problems in 1D, 2D and 3D.
+#
+# For every case, the following quantities are recorded
+#   - symbol construction time (gelatize)
+#   - compile time (compile_symbol)
+#   - evaluation time of the compiled kernel
+#   - peak memory of the evaluation
+#   - relative spectral error between the sampled symbol and the eigenvalues
+#     of the banded Toeplitz matrices assembled from the same 1D coefficients
+#     (see gelato.core.toeplitz), which only requires 1D eigenvalue problems.
+#     The eigenvalues of a non-normal matrix are not related to its symbol, so
+#     for convection-diffusion only the Hermitian part (the diffusion) is
+#     compared
+#
+# usage: python3 benchmarks/bench_spectrum.py [--dims 1 2] [--degrees 1 2 3]
+#                                             [--output results.json]
+
+import argparse
+import json
+import tracemalloc
+from time import time
+
+import numpy as np
+
+from sympy import Mul
+
+from symfe.core import dx, dy, dz
+from symfe.core import grad, dot
+from symfe.core import H1Space
+from symfe.core import TestFunction
+from symfe.core import BilinearForm
+
+from gelato.core import gelatize
+from gelato.core import separate_axes
+from gelato.core import symbol_kind
+from gelato.core import glt_sampling_sizes
+from gelato.core import glt_approximate_eigenvalues
+from gelato.core import toeplitz_eigenvalues
+from gelato.core import toeplitz_pencil_eigenvalues
+from gelato.codegen import compile_symbol
+
+# ...
+def poisson(dim):
+    V = H1Space('V', ldim=dim)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    return BilinearForm((v,u), dot(grad(v), grad(u)))
+
+def convection_diffusion(dim):
+    V = H1Space('V', ldim=dim)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    return BilinearForm((v,u), dot(grad(v), grad(u)) + 10.*dx(u)*v)
+
+def bilaplacian(dim):
+    V = H1Space('V', ldim=dim)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    expr = sum(d(d(v))*d(d(u)) for d in [dx, dy, dz][:dim])
+    return BilinearForm((v,u), expr)
+
+_cases = {'poisson':              poisson,
+          'convection_diffusion': convection_diffusion,
+          'bilaplacian':          bilaplacian}
+# ...
+
+# ...
+def hermitian_part(expr, dim):
+    """Returns the real part of a separable symbol, which is the symbol of the
+    Hermitian part of its matrix. Every term must be real or purely
+    imaginary."""
+    part = 0
+    for coeff, factors in separate_axes(expr, dim):
+        term = Mul(coeff, *factors)
+
+        kind = symbol_kind(term)
+        if kind == 'real':
+            part = part + term
+        elif kind == 'complex':
+            raise ValueError('> Expecting real or imaginary terms')
+
+    return part
+
+def reference_error(expr, degrees, n_elements):
+    """
+    Returns the kind of reference ('matrix' or 'pencil') and the spectral error
+    of the sampled symbol. The eigenvalues of the matrix are used when it is a
+    Kronecker sum (for instance in 1D); otherwise the pencil (A, M_1 x ... x M_d)
+    is used, whose eigenvalues are sums of 1D ones and are approximated by the
+    symbol divided by the masses. For a complex symbol, only its Hermitian part
+    is compared.
+    """
+    if not( symbol_kind(expr) == 'real' ):
+        expr = hermitian_part(expr, len(degrees))
+
+    ns = glt_sampling_sizes(degrees, n_elements)
+    try:
+        eigenvalues = toeplitz_eigenvalues(expr, ns, max_dense_size=0)
+        reference = 'matrix'
+
+    except ValueError:
+        eigenvalues, mass = toeplitz_pencil_eigenvalues(expr, ns)
+        expr = expr / mass
+        reference = 'pencil'
+
+    samples = glt_approximate_eigenvalues(expr, degrees, n_elements)
+
+    return reference, spectral_error(samples, eigenvalues)
+
+def spectral_error(samples, eigenvalues):
+    """Relative error between the sorted samples and the sorted eigenvalues of
+    a real symbol."""
+    a = np.sort(np.real(samples))
+    b = np.sort(np.real(eigenvalues))
+
+    scale = max(np.abs(b).max(), 1.e-300)
+    return float(np.abs(a - b).max() / scale)
+# ...
+
+# ...
+def run_case(case, dim, p, n, n_points=None):
+    """
+    Runs one benchmark case and returns a dictionary of measurements.
+
+    case: str
+        one of 'poisson', 'convection_diffusion', 'bilaplacian'
+
+    dim: int
+        dimension
+
+    p: int
+        spline degree, in every direction
+
+    n: int
+        number of elements, in every direction
+
+    n_points: int
+        number of sampling points of the compiled kernel, in every direction
+    """
+    degrees    = [p]*dim
+    n_elements = [n]*dim
+    if n_points is None:
+        n_points = n + p
+
+    record = {'case': case, 'dim': dim, 'degree': p, 'n_elements': n}
+
+    # ... symbol construction
+    tb = time()
+    form = _cases[case](dim)
+    expr = gelatize(form, degrees=degrees, n_elements=n_elements)
+    record['symbol_time'] = time() - tb
+    # ...
+
+    # ... compilation and evaluation of the kernel
+    tb = time()
+    name = 'bench_{case}_{dim}d_p{p}_n{n}'.format(case=case, dim=dim, p=p, n=n)
+    kernel = compile_symbol(name, form, degrees,
+                            n_elements=n_elements,
+                            backend='numpy',
+                            export_pyfile=False)
+    record['compile_time'] = time() - tb
+
+    xs = [np.linspace(0., 1., n_points) for i in range(0, dim)]
+    ts = [np.linspace(-np.pi, np.pi, n_points) for i in range(0, dim)]
+    mat = np.zeros([n_points]*dim, dtype=kernel.dtype)
+
+    tracemalloc.start()
+    tb = time()
+    kernel(*xs, *ts, mat)
+    record['eval_time'] = time() - tb
+    record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # ...
+
+    # ... spectral error against the Toeplitz reference
+    reference, error = reference_error(expr, degrees, n_elements)
+    record['reference']      = reference
+    record['spectral_error'] = error
+    # ...
+
+    return record
+# ...
+
+# ...
+_sizes = {1: [16, 64, 256, 4096],
+          2: [8, 16, 32, 1024],
+          3: [4, 8, 16, 96]}
+
+def run(dims=[1, 2, 3], degrees=range(1, 7), cases=list(_cases.keys()),
+        verbose=True):
+    """Runs the whole suite and returns the list of records."""
+    records = []
+    for case in cases:
+        for dim in dims:
+            for p in degrees:
+                # the bilaplacian symbol vanishes for linear splines
+                if case == 'bilaplacian' and p < 2:
+                    continue
+
+                for n in _sizes[dim]:
+                    record = run_case(case, dim, p, n)
+                    records.append(record)
+
+                    if verbose:
+                        print(_format_record(record))
+
+    return records
+
+def _format_record(record):
+    def _fmt(v, pattern):
+        if v is None:
+            return '-'
+        return pattern.format(v)
+
+    return ('> {case:22s} {dim}d p={degree} n={n_elements:4d}  '
+            'symbol: {s}  compile: {c}  eval: {e}  memory: {m}  '
+            'error ({reference}): {err}').format(
+                s=_fmt(record['symbol_time'], '{:.2e}s'),
+                c=_fmt(record['compile_time'], '{:.2e}s'),
+                e=_fmt(record['eval_time'], '{:.2e}s'),
+                m=_fmt(record['peak_memory'], '{:d}B'),
+                err=_fmt(record['spectral_error'], '{:.2e}'),
+                **record)
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='GLT symbol vs matrix spectrum benchmarks.')
+    parser.add_argument('--dims', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--degrees', type=int, nargs='+', default=list(range(1, 7)))
+    parser.add_argument('--cases', nargs='+', default=list(_cases.keys()))
+    parser.add_argument('--output', default=None,
+                        help='writes the records to a json file')
+    args = parser.parse_args()
+
+    records = run(dims=args.dims, degrees=args.degrees, cases=args.cases)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(records, f, indent=2)
@@ -0,0 +1,112 @@
+# coding: utf-8
+
+# Compares the evaluation time of the GLT symbol kernels generated by the
+# different backends of compile_symbol, with and without factorization.
+#
+# usage: python3 benchmarks/bench_symbol.py
+
+from time import time
+
+from numpy import linspace, zeros, pi
+from numpy import allclose
+
+from symfe.core import grad, dot
+from symfe.core import H1Space
+from symfe.core import TestFunction
+from symfe.core import BilinearForm
+
+from gelato.codegen import compile_symbol
+
+
+# ...
+def timeit(f, *args, repeat=3):
+    """Returns the best elapsed time over repeat calls of f(*args)."""
+    elapsed = []
+    for i in range(0, repeat):
+        tb = time()
+        f(*args)
+        te = time()
+        elapsed.append(te - tb)
+    return min(elapsed)
+# ...
+
+# ...
+_variants = [('python', False),
+             ('numpy',  False),
+             ('python', True),
+             ('numpy',  True)]
+
+def bench_backends(dim, degrees, n_points, variants=_variants):
+    """
+    Evaluates the symbol of the Laplace + mass operator with every backend, with
+    and without the tensor-product factorization, and prints the elapsed times.
+
+    dim: int
+        dimension of the logical domain
+
+    degrees: list
+        spline degrees
+
+    n_points: int
+        number of sampling points in every direction
+
+    variants: list
+        list of (backend, factorize)
+    """
+    V = H1Space('V', ldim=dim)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+
+    n_elements = [16]*dim
+
+    xs = [linspace(0., 1., n_points) for i in range(0, dim)]
+    ts = [linspace(-pi, pi, n_points) for i in range(0, dim)]
+
+    reference = None
+    timings = {}
+    labels = []
+    for backend, factorize in variants:
+        label = backend
+        if factorize:
+            label = '{}+factorize'.format(backend)
+        labels.append(label)
+
+        name = 'bench_symbol_{dim}d_{label}'.format(dim=dim,
+                                                    label=label.replace('+', '_'))
+        symbol = compile_symbol(name, a, degrees,
+                                n_elements=n_elements,
+                                backend=backend,
+                                factorize=factorize,
+                                export_pyfile=False)
+
+        mat = zeros([n_points]*dim)
+        timings[label] = timeit(symbol, *xs, *ts, mat)
+
+        if reference is None:
+            reference = mat
+        else:
+            assert(allclose(reference, mat))
+
+    line = '> {dim}d  n = {n:4d} '.format(dim=dim, n=n_points)
+    for label in labels:
+        line += ' {label}: {t:.3e}s '.format(label=label, t=timings[label])
+
+    t_ref = timings[labels[0]]
+    for label in labels[1:]:
+        line += ' speed-up ({label}): {s:.1f}'.format(label=label,
+                                                     s=t_ref/timings[label])
+    print(line)
+
+    return timings
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    for n in [32, 64, 128]:
+        bench_backends(2, [3, 3], n)
+
+    for n in [16, 32, 64]:
+        bench_backends(3, [3, 3, 3], n)
@@ -0,0 +1,110 @@
+# coding: utf-8
+
+# Scaling of the slab-parallel evaluation of the GLT symbol kernels, from 1 to
+# N threads, on 2D and 3D grids.
+#
+# usage: python3 benchmarks/bench_threads.py [n_threads_max]
+
+import os
+import sys
+
+from numpy import linspace, zeros, pi
+from numpy import array_equal
+
+from symfe.core import grad, dot
+from symfe.core import H1Space
+from symfe.core import TestFunction
+from symfe.core import BilinearForm
+
+from gelato.codegen import compile_symbol
+from gelato.codegen import evaluate_symbol
+
+from bench_symbol import timeit
+
+
+# ...
+def bench_threads(dim, degrees, n_points, n_threads_max, backend='numpy',
+                  factorize=False):
+    """
+    Evaluates the symbol of the Laplace + mass operator with 1, 2, 4, ...
+    threads and prints the elapsed times and the speed-ups.
+
+    dim: int
+        dimension of the logical domain
+
+    degrees: list
+        spline degrees
+
+    n_points: int
+        number of sampling points in every direction
+
+    n_threads_max: int
+        maximum number of threads
+
+    backend: str
+        backend of compile_symbol
+
+    factorize: bool
+        use of the tensor-product factorization
+    """
+    V = H1Space('V', ldim=dim)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+
+    name = 'bench_threads_{dim}d_{backend}'.format(dim=dim, backend=backend)
+    if factorize:
+        name = '{}_factorize'.format(name)
+
+    symbol = compile_symbol(name, a, degrees,
+                            n_elements=[16]*dim,
+                            backend=backend,
+                            factorize=factorize,
+                            export_pyfile=False)
+
+    xs = [linspace(0., 1., n_points) for i in range(0, dim)]
+    ts = [linspace(-pi, pi, n_points) for i in range(0, dim)]
+
+    n_threads = [1]
+    while 2*n_threads[-1] <= n_threads_max:
+        n_threads.append(2*n_threads[-1])
+
+    reference = None
+    timings = []
+    for n in n_threads:
+        mat = zeros([n_points]*dim)
+        timings.append(timeit(evaluate_symbol, symbol, dim, xs + ts, mat,
+                              n_threads=n))
+
+        # the result does not depend on the number of threads
+        if reference is None:
+            reference = mat
+        else:
+            assert(array_equal(reference, mat))
+
+    line = '> {dim}d  {backend:6s} n = {n:4d} '.format(dim=dim, backend=backend,
+                                                       n=n_points)
+    for n, t in zip(n_threads, timings):
+        line += ' [{n} threads] {t:.3e}s (x{s:.1f})'.format(n=n, t=t,
+                                                           s=timings[0]/t)
+    print(line)
+
+    return timings
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    n_threads_max = os.cpu_count() or 1
+    if len(sys.argv) > 1:
+        n_threads_max = int(sys.argv[1])
+
+    for n in [512, 1024, 2048]:
+        bench_threads(2, [3, 3], n, n_threads_max)
+
+    for n in [64, 128, 192]:
+        bench_threads(3, [3, 3, 3], n, n_threads_max)
+
+    for n in [64, 128, 192]:
+        bench_threads(3, [3, 3, 3], n, n_threads_max, factorize=True)
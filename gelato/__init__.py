@@ -1,2 +1,4 @@
 # -*- coding: UTF-8 -*-
+__version__ = '0.1'
+
 from .core  import *
@@ -1,3 +1,8 @@
 from .utils import *
+from .cache import *
+from .registry import *
+from .ir import *
+from .ccode import *
+from .evaluation import *
 from .symbol import *
 from .discretization import *
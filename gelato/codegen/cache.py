@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains a content-addressed cache for the source code of the
+generated symbol kernels, with an optional on-disk tier, so that the symbolic
+pipeline (gelatize and code generation) is only run once per kernel."""
+
+import os
+import json
+import hashlib
+
+from sympy import srepr
+
+import gelato
+from gelato.core import BasicCache
+
+
+# ...
+def kernel_key(a, degrees, n_elements=None, backend='python', factorize=True,
+               name=None, **options):
+    """
+    Returns a stable (independent of the process and of PYTHONHASHSEED) hash
+    of a kernel, computed from the weak formulation, the discretization, the
+    backend and the GeLaTo version.
+
+    a: BilinearForm
+        the weak formulation
+
+    degrees: list, tuple
+        spline degrees for every direction, None if they are arguments of the
+        kernel
+
+    n_elements: list, tuple
+        number of elements for every direction
+
+    backend: str
+        name of the backend
+
+    factorize: bool
+        use of the tensor-product factorization
+
+    name: str
+        name of the generated function, if it is part of the kernel
+
+    The other keyword arguments are code generation options (such as
+    clenshaw) and are part of the key.
+    """
+    if not( degrees is None ):
+        degrees = [int(p) for p in degrees]
+
+    if not( n_elements is None ):
+        n_elements = [int(n) for n in n_elements]
+
+    data = {'form':       srepr(a),
+            'degrees':    degrees,
+            'n_elements': n_elements,
+            'backend':    backend,
+            'factorize':  bool(factorize),
+            'name':       name,
+            'options':    options,
+            'version':    gelato.__version__}
+
+    txt = json.dumps(data, sort_keys=True)
+    return hashlib.sha256(txt.encode('utf-8')).hexdigest()
+# ...
+
+# ...
+class KernelCache(BasicCache):
+    """
+    A LRU cache for the generated kernels, keyed by kernel_key. Every entry is a
+    dictionary with the name of the function, its source code, and the kind
+    and dtype of the symbol.
+
+    maxsize: int
+        maximum number of entries kept in memory
+
+    cache_dir: str
+        directory of the on-disk cache. The disk cache is disabled if None.
+    """
+    _folder = 'kernels'
+
+    def _basename(self, key):
+        return key
+
+    def _dumps(self, value):
+        return value
+
+    def _loads(self, data):
+        return {'name': str(data['name']),
+                'code': str(data['code']),
+                'kind': str(data['kind']),
+                'dtype': str(data['dtype'])}
+
+    def get(self, key, compute):
+        """
+        Returns the entry of key, calling compute() if it is not in the cache.
+        The on-disk entries are only read when requested.
+
+        key: str
+            as returned by kernel_key
+
+        compute: callable
+            function generating the entry
+        """
+        return self._lookup(key, compute)
+# ...
+
+# ... the cache shared by compile_symbol and discretize_symbol
+kernel_cache = KernelCache(cache_dir=os.environ.get('GELATO_CACHE_DIR', None))
+
+def kernel_cache_info():
+    """Returns the hits/misses statistics of the kernels cache."""
+    return kernel_cache.cache_info()
+
+def clear_kernel_cache(disk=False):
+    """Clears the kernels cache."""
+    kernel_cache.clear(disk=disk)
+
+def configure_kernel_cache(maxsize=None, cache_dir=None, disk=None):
+    """Changes the settings of the kernels cache. See BasicCache.configure."""
+    kernel_cache.configure(maxsize=maxsize, cache_dir=cache_dir, disk=disk)
+# ...
@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains the C backend of the symbol kernels. The C99 source is
+generated from the intermediate representation of the symbol, compiled into a
+shared library, cached on disk by a hash of its content, and called through
+ctypes directly on the buffers of the numpy arrays."""
+
+import os
+import ctypes
+import hashlib
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+from sympy import ccode
+from sympy import Symbol
+from sympy import Add, Mul
+from sympy import I as sympy_I
+
+from gelato.core import default_cache_dir
+from gelato.core import atomic_write
+from gelato.core import coordinate_names
+
+from .cache import kernel_cache
+from .utils import _axis_factor_name, _function_name
+
+
+# ... the compiler is given by the environment variable CC if set
+_cflags  = ['-O3', '-std=c99', '-fPIC', '-shared']
+_ldflags = ['-lm']
+
+def c_compiler():
+    return os.environ.get('CC', 'gcc')
+# ...
+
+# ...
+def _c_type(is_complex):
+    if is_complex:
+        return 'double complex'
+    return 'double'
+
+def _is_complex(expr, complex_names):
+    if expr.has(sympy_I):
+        return True
+    return any(s.name in complex_names for s in expr.free_symbols)
+
+def _print_c(expr):
+    return ccode(expr, standard='C99')
+
+def _c_arg_type(dtype):
+    """Returns the C type of a constant, from its datatype."""
+    dtype = str(dtype)
+    if 'complex' in dtype:
+        raise NotImplementedError('> complex constants are not available with '
+                                  'the C backend')
+    if 'int' in dtype:
+        return 'int64_t'
+    return 'double'
+# ...
+
+# ...
+def print_c_kernel(name, ir, constants=None, n_elements=None, openmp=True):
+    """
+    Generates the C99 source of the function evaluating a scalar symbol, given
+    by its intermediate representation. The function has the arguments
+
+        arr_x1, ..., arr_t1, ..., mat, n1, ..., constants, nx, ...
+
+    where n1, ... are the sizes of the 1D arrays, and mat is a C-contiguous
+    array of shape (n1, ...). It returns 0, or -1 if the allocation of the 1D
+    factors failed.
+
+    name: str
+        name of the function
+
+    ir: SymbolIR
+        the intermediate representation, see symbol_ir
+
+    constants: list
+        list of (name, dtype) of the constants of the weak formulation
+
+    n_elements: list, tuple
+        number of elements for every direction. If not given, they become
+        arguments of the function.
+
+    openmp: bool
+        parallelizes the outer loop with OpenMP, when available
+    """
+    dim = ir.dim
+    tab = ' '*4
+
+    if constants is None:
+        constants = []
+
+    xs = coordinate_names(dim)
+    ts = ['t{}'.format(x) for x in xs]
+    ns = ['n{}'.format(i) for i in range(1, dim+1)]
+    indices = ['i{}'.format(i) for i in range(1, dim+1)]
+
+    # ... arguments
+    args  = ['const double *restrict arr_x{}'.format(i) for i in range(1, dim+1)]
+    args += ['const double *restrict arr_t{}'.format(i) for i in range(1, dim+1)]
+    args += ['{} *restrict mat'.format(_c_type(np.dtype(ir.dtype).kind == 'c'))]
+    args += ['int64_t {}'.format(n) for n in ns]
+    args += ['{} {}'.format(_c_arg_type(dtype), c) for c, dtype in constants]
+    if not n_elements:
+        args += ['int64_t n{}'.format(x) for x in xs]
+    # ...
+
+    complex_names = set()
+    def _declare(name, expr, const=True):
+        is_complex = _is_complex(expr, complex_names)
+        if is_complex:
+            complex_names.add(name)
+
+        prefix = 'const ' if const else ''
+        return '{prefix}{t} {name} = {e};'.format(prefix=prefix,
+                                                  t=_c_type(is_complex),
+                                                  name=name, e=_print_c(expr))
+
+    def _coordinates_lines(axis):
+        return ['const double {x} = arr_x{i}[{j}];'.format(x=xs[axis], i=axis+1,
+                                                           j=indices[axis]),
+                'const double {t} = arr_t{i}[{j}];'.format(t=ts[axis], i=axis+1,
+                                                           j=indices[axis])]
+
+    def _loop(axis):
+        return 'for (int64_t {i} = 0; {i} < {n}; {i}++)'.format(i=indices[axis],
+                                                                n=ns[axis])
+
+    body = []
+
+    # ... the 1D factors are computed once per axis
+    factors = []
+    for axis, fs in enumerate(ir.factors):
+        if not fs:
+            continue
+
+        lines = _coordinates_lines(axis)
+        lines += [_declare(w.name, e) for w, e in ir.axis_temporaries[axis]]
+        for j, f in enumerate(fs):
+            name_f = _axis_factor_name(axis, j)
+            is_complex = _is_complex(f, complex_names)
+            if is_complex:
+                complex_names.add(name_f)
+            factors.append((name_f, _c_type(is_complex), ns[axis]))
+            lines += ['{name}[{i}] = {e};'.format(name=name_f, i=indices[axis],
+                                                  e=_print_c(f))]
+
+        body += [_loop(axis), '{']
+        body += [tab + line for line in lines]
+        body += ['}', '']
+
+    # ... accesses to the 1D factors in the main loops
+    accesses = {}
+    for axis, fs in enumerate(ir.factors):
+        for j in range(0, len(fs)):
+            name_f = _axis_factor_name(axis, j)
+            access = Symbol('{f}[{i}]'.format(f=name_f, i=indices[axis]))
+            accesses[Symbol(name_f)] = access
+            if name_f in complex_names:
+                complex_names.add(access.name)
+    # ...
+
+    position = indices[0]
+    for k, (i, n) in enumerate(zip(indices[1:], ns[1:])):
+        if k > 0:
+            position = '({})'.format(position)
+        position = '{p}*{n} + {i}'.format(p=position, n=n, i=i)
+
+    # ... the symbol is computed for every point. The statements of every
+    #     loop level are in levels, the innermost level also holding the
+    #     accumulation
+    levels = [[] for axis in range(0, dim)]
+    inner = []
+    if ir.is_separable:
+        # the functions of the position variables are computed at the level of
+        # the last axis they depend on
+        for j, g in enumerate(ir.functions):
+            axes = [xs.index(v.name) for v in g.free_symbols if v.name in xs]
+            levels[max(axes + [0])] += [_declare(_function_name(j), g)]
+
+        # the partial products of the 1D factors of the axes 1, ..., k are
+        # computed at the level k, and shared by the terms with the same
+        # factors on these axes
+        partials = {}
+        n_partials = [0]*dim
+        products = []
+        for term in ir.terms:
+            product = None
+            for axis, j in enumerate(term.factors):
+                if j is None:
+                    continue
+
+                key = term.factors[:axis+1]
+                if not key in partials:
+                    access = accesses[Symbol(_axis_factor_name(axis, j))]
+                    e = access if product is None else product * access
+                    if axis == dim-1 or product is None:
+                        partials[key] = e
+                    else:
+                        name_p = 'prod{}_{}'.format(axis+1, n_partials[axis])
+                        n_partials[axis] += 1
+                        levels[axis] += [_declare(name_p, e)]
+                        partials[key] = Symbol(name_p)
+                product = partials[key]
+
+            args_term = [term.coeff]
+            if not( term.function is None ):
+                args_term.append(Symbol(_function_name(term.function)))
+            if not( product is None ):
+                args_term.append(product)
+            products.append(Mul(*args_term))
+
+    else:
+        for w, e in ir.temporaries:
+            inner += [_declare(w.name, e.xreplace(accesses))]
+        products = Add.make_args(ir.expr.xreplace(accesses))
+
+    # one statement per term, so that the compiler is not given a single
+    # expression mixing real and complex terms
+    inner += ['{} acc = 0;'.format(_c_type(np.dtype(ir.dtype).kind == 'c'))]
+    inner += ['acc += {};'.format(_print_c(e)) for e in products]
+    inner += ['mat[{p}] = acc;'.format(p=position)]
+    # ...
+
+    # ... nested loops, the coordinates being read at their loop level
+    loops = []
+    for axis in range(dim-1, -1, -1):
+        lines = _coordinates_lines(axis) + levels[axis] + inner
+        inner = [_loop(axis), '{'] + [tab + line for line in lines] + ['}']
+
+    if openmp:
+        loops += ['#ifdef _OPENMP', '#pragma omp parallel for', '#endif']
+    loops += inner
+    body += loops
+    # ...
+
+    # ... allocation of the 1D factors
+    allocs = []
+    frees  = []
+    for name_f, t, n in factors:
+        allocs += ['{t} *{f} = malloc({n} * sizeof({t}));'.format(t=t, f=name_f, n=n)]
+        frees  += ['free({});'.format(name_f)]
+
+    if factors:
+        condition = ' || '.join('!{}'.format(f) for f, t, n in factors)
+        allocs += ['if ({})'.format(condition), '{']
+        allocs += [tab + line for line in frees]
+        allocs += [tab + 'return -1;', '}', '']
+    # ...
+
+    lines = allocs + body + [''] + frees + ['return 0;']
+
+    code = '\n'.join(['#include <stdint.h>',
+                      '#include <stdlib.h>',
+                      '#include <tgmath.h>',
+                      '',
+                      'int {name}({args})'.format(name=name, args=', '.join(args)),
+                      '{'] +
+                     [tab + line if line else '' for line in lines] +
+                     ['}', ''])
+
+    return code
+# ...
+
+# ...
+def c_build_dir():
+    """
+    Returns the directory of the compiled libraries: the folder 'c' of the
+    directory of the kernels cache if its disk tier is enabled, and of the
+    default cache directory otherwise.
+    """
+    cache_dir = kernel_cache.cache_dir
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    return os.path.join(cache_dir, 'c')
+
+def _compile(compiler, flags, source_file, library):
+    folder = os.path.dirname(library)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.so')
+    os.close(fd)
+
+    cmd = [compiler] + flags + [source_file, '-o', tmp] + _ldflags
+    try:
+        p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                           universal_newlines=True)
+        if p.returncode == 0:
+            os.replace(tmp, library)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return p.returncode == 0, p.stderr
+
+def build_c_library(source, build_dir=None, openmp=True):
+    """
+    Compiles a C source into a shared library and returns its path. The
+    library is named after a hash of the source, the compiler and the flags,
+    so that it is only compiled once, and is shared by the processes using the
+    same build directory. If the compilation with OpenMP fails, the library is
+    compiled without it.
+
+    source: str
+        the C source
+
+    build_dir: str
+        directory of the libraries, see c_build_dir
+
+    openmp: bool
+        compiles with -fopenmp
+    """
+    if build_dir is None:
+        build_dir = c_build_dir()
+
+    compiler = c_compiler()
+    flags = list(_cflags)
+    if openmp:
+        flags.append('-fopenmp')
+
+    txt = '\n'.join([compiler, ' '.join(flags), source])
+    key = hashlib.sha256(txt.encode('utf-8')).hexdigest()
+
+    library = os.path.join(build_dir, 'lib{}.so'.format(key))
+    if os.path.exists(library):
+        return library
+
+    source_file = os.path.join(build_dir, '{}.c'.format(key))
+    atomic_write(source_file, source)
+
+    success, errors = _compile(compiler, flags, source_file, library)
+    if not success and openmp:
+        flags.remove('-fopenmp')
+        success, errors = _compile(compiler, flags, source_file, library)
+
+    if not success:
+        raise RuntimeError('> could not compile {}:\n{}'.format(source_file,
+                                                              errors))
+
+    return library
+# ...
+
+# ... the libraries loaded in this process
+_libraries = {}
+_lock = threading.Lock()
+
+_ctypes = {'p': ctypes.c_void_p,
+           'i': ctypes.c_int64,
+           'd': ctypes.c_double}
+
+def load_c_kernel(source, name, argtypes, build_dir=None, openmp=True):
+    """
+    Compiles (if needed) and loads a C kernel, and returns the ctypes function.
+
+    source: str
+        the C source
+
+    name: str
+        name of the C function
+
+    argtypes: str
+        type of every argument: 'p' for a pointer, 'i' for an int64_t and 'd'
+        for a double
+    """
+    with _lock:
+        library = build_c_library(source, build_dir=build_dir, openmp=openmp)
+        lib = _libraries.get(library, None)
+        if lib is None:
+            lib = ctypes.CDLL(library)
+            _libraries[library] = lib
+
+    f = getattr(lib, name)
+    f.argtypes = [_ctypes[t] for t in argtypes]
+    f.restype = ctypes.c_int
+    return f
+
+def _c_array(arr):
+    """Returns arr as a C-contiguous array of float64, without copy if
+    possible."""
+    return np.ascontiguousarray(arr, dtype=np.float64)
+
+def call_c_kernel(kernel, xs, ts, mat, dtype, args=()):
+    """
+    Calls a C kernel, see print_c_kernel. The arrays are passed without copy
+    when they are C-contiguous with the expected dtype; otherwise the 1D
+    arrays are converted, and the values are computed in a temporary array
+    that is then copied into mat.
+
+    kernel: ctypes function
+        as returned by load_c_kernel
+
+    xs, ts: list
+        the position and Fourier arrays of every axis
+
+    mat: numpy.ndarray
+        the output array
+
+    dtype: str, numpy.dtype
+        dtype of the symbol
+
+    args: list, tuple
+        the constants, and the number of elements if they are arguments
+    """
+    xs = [_c_array(x) for x in xs]
+    ts = [_c_array(t) for t in ts]
+    ns = [len(x) for x in xs]
+
+    for x, t in zip(xs, ts):
+        if not( len(x) == len(t) ):
+            raise ValueError('> The position and Fourier arrays of an axis '
+                             'must have the same size')
+
+    if not( mat.shape == tuple(ns) ):
+        raise ValueError('> mat must be of shape {}'.format(tuple(ns)))
+
+    dtype = np.dtype(dtype)
+    if mat.dtype == dtype and mat.flags.c_contiguous:
+        out = mat
+    else:
+        out = np.empty(mat.shape, dtype=dtype)
+
+    pointers = [a.ctypes.data for a in xs + ts + [out]]
+    code = kernel(*pointers, *ns, *args)
+    if not( code == 0 ):
+        raise MemoryError('> could not allocate the 1D factors')
+
+    if not( out is mat ):
+        mat[...] = out
+# ...
+
+# ...
+_c_wrapper = '''# -*- coding: utf-8 -*-
+# the C kernel is compiled (if needed) and loaded when this code is executed
+
+from gelato.codegen.ccode import load_c_kernel, call_c_kernel
+
+_{__SYMBOL_NAME__}_source = r"""
+{__SOURCE__}"""
+
+_{__SYMBOL_NAME__}_kernel = load_c_kernel(_{__SYMBOL_NAME__}_source,
+                                          '{__SYMBOL_NAME__}',
+                                          '{__ARGTYPES__}',
+                                          openmp={__OPENMP__})
+
+def {__SYMBOL_NAME__}({__X_ARGS__}, {__T_ARGS__}, mat{__ARGS__}{__N_ELEMENTS__}):
+    call_c_kernel(_{__SYMBOL_NAME__}_kernel,
+                  [{__X_ARGS__}], [{__T_ARGS__}], mat, '{__DTYPE__}',
+                  [{__EXTRA_ARGS__}])
+'''
+
+def print_c_wrapper(name, ir, d_args=None, n_elements=None, openmp=True):
+    """
+    Generates the python code of a kernel of the C backend: the C source of
+    the symbol, see print_c_kernel, and a function with the same arguments as
+    the kernels of the other backends, calling it with call_c_kernel.
+
+    d_args: dict
+        the datatypes of the constants, as returned by
+        arguments_datatypes_as_dict
+    """
+    dim = ir.dim
+
+    if d_args is None:
+        d_args = {}
+    constants = list(d_args.items())
+
+    source = print_c_kernel(name, ir, constants=constants,
+                            n_elements=n_elements, openmp=openmp)
+
+    # ...
+    extra_args = [c for c, dtype in constants]
+    argtypes = 'p'*(2*dim+1) + 'i'*dim
+    argtypes += ''.join('i' if _c_arg_type(dtype) == 'int64_t' else 'd'
+                        for c, dtype in constants)
+    if not n_elements:
+        ns = ['n{}'.format(x) for x in coordinate_names(dim)]
+        extra_args += ns
+        argtypes += 'i'*dim
+    # ...
+
+    x_args = ', '.join('arr_x{}'.format(i) for i in range(1, dim+1))
+    t_args = ', '.join('arr_t{}'.format(i) for i in range(1, dim+1))
+
+    args_str = ''.join(', {}'.format(c) for c, dtype in constants)
+    n_elements_str = ''
+    if not n_elements:
+        n_elements_str = ''.join(', {}'.format(n) for n in ns)
+
+    return _c_wrapper.format(__SYMBOL_NAME__=name,
+                             __SOURCE__=source,
+                             __ARGTYPES__=argtypes,
+                             __OPENMP__=openmp,
+                             __X_ARGS__=x_args,
+                             __T_ARGS__=t_args,
+                             __ARGS__=args_str,
+                             __N_ELEMENTS__=n_elements_str,
+                             __DTYPE__=np.dtype(ir.dtype).name,
+                             __EXTRA_ARGS__=', '.join(extra_args))
+# ...
@@ -14,76 +14,162 @@ from sympy import Integer, Float
 from numbers import Number
 from collections import OrderedDict
 
-from numpy import unique
-import os
-import importlib
+import numpy as np
+import threading
 
 from symfe.core import gelatize
 from symfe.core import BilinearForm, LinearForm, FunctionForm
 from symfe.core import Constant
 from symfe.core import Field
-from symfe.codegen.utils import arguments_datatypes_as_dict
-from symfe.codegen.utils import arguments_datatypes_split
 
 from spl.fem.splines import SplineSpace
 from spl.fem.tensor  import TensorFemSpace
 
-from .symbol import compile_symbol
-from .utils import (print_position_args, print_fourier_args,
-                    construct_x_args_names,
-                    construct_t_args_names,
-                    print_mat_args,
-                    construct_argument_matrix_name,
-                    print_argument_matrix_kwargs,
-                    construct_matrix_names,
-                    print_matrix_args,
-                    print_define_matrix,
-                    docstring_arguments)
-
-import types
-
-_template ="""
-def {__NAME__}( target, {__X_ARGS__}{__T_ARGS__}{__ARGS__}{__FIELDS__}{__MAT_KWARGS__} ):
-    {__DOCSTRING__}
-    {__MAT_DEC__}
-    {__SYMBOL_NAME__}( {__X_ARGS__}{__T_ARGS__}, {__MAT_ARGS__}{__ARGS__}{__FIELDS__} )
-    return {__MAT_ARGS__}
-"""
-
-_template_docstring = """
-\"\"\"
-Evaluates the GLT symbol.
-
-This method is calling a function that has been automatically generated:
-    - {__SYMBOL_NAME__} low-level symbol evaluation function
-{__PARAMETERS__}
-\"\"\"
-"""
-
-_docstring_header = """
-Parameters
-----------
-"""
-
-_pattern_docstring_argument = """
-{__ARG__} : {__TYPE__}
-   {__LABEL__}
-"""
+from gelato.core import glt_sampling_sizes
 
+from .symbol import compile_symbol
+from .cache import kernel_key
+from .evaluation import evaluate_symbol
+
+# ...
+class DiscreteSymbol(object):
+    """
+    A compiled GLT symbol, as returned by discretize_symbol. It is called as
+    symbol(x1, [x2, [x3,]] t1, [t2, [t3,]] *args, out=None), where args are the
+    constants (and fields) of the weak formulation, and writes the samples in
+    out if given; otherwise, a new array is returned unless reuse is True.
+    With reuse, the kernel also takes the arrays of its 1D factors and
+    functions from the workspace of the grid shape.
+
+    kernel: callable
+        the function generated by compile_symbol
+
+    dim: int
+        dimension of the logical domain
+
+    shape: tuple
+        number of sampling points in every direction (n + p) for the
+        discrete spaces
+
+    arguments: list
+        names of the additional arguments
+    """
+    __slots__ = ('kernel', 'dim', 'shape', 'dtype', 'kind', 'arguments',
+                 '_workspace', '_lock')
+
+    def __init__(self, kernel, dim, shape=None, arguments=()):
+        self.kernel    = kernel
+        self.dim       = dim
+        self.shape     = None if shape is None else tuple(shape)
+        self.dtype     = getattr(kernel, 'dtype', np.dtype(np.float64))
+        self.kind      = getattr(kernel, 'kind', 'real')
+        self.arguments = tuple(arguments)
+
+        self._workspace = {}
+        self._lock      = threading.Lock()
+
+    def __repr__(self):
+        return 'DiscreteSymbol(dim={dim}, shape={shape}, dtype={dtype})'.format(
+            dim=self.dim, shape=self.shape, dtype=self.dtype)
+
+    def workspace(self, shape):
+        """
+        Returns the workspace associated to the grid shape, a dict holding
+        the output buffer (key 'out') and the temporaries of the kernel (see
+        workspace_array), which are allocated on the first request and then
+        reused.
+
+        shape: tuple
+            shape of the grid
+        """
+        shape = tuple(shape)
+        with self._lock:
+            workspace = self._workspace.get(shape, None)
+            if workspace is None:
+                workspace = {'out': np.empty(shape, dtype=self.dtype)}
+                self._workspace[shape] = workspace
+            return workspace
+
+    def clear_workspace(self):
+        """Releases the buffers of the workspace pool."""
+        with self._lock:
+            self._workspace.clear()
+
+    def __call__(self, *args, out=None, reuse=False, n_threads=None,
+                 executor=None):
+        """
+        Evaluates the symbol on the tensor grid of the position and Fourier
+        variables.
+
+        out: numpy.ndarray
+            array where the samples are written
+
+        reuse: bool
+            if True, the temporaries of the kernel are kept in the workspace
+            of the grid shape and reused by the next evaluations. If out is
+            not given, the samples are written in the output buffer of the
+            workspace, which is overwritten by the next evaluation with reuse
+
+        n_threads: int
+            number of threads evaluating slabs of the grid, see
+            evaluate_symbol
+
+        executor: concurrent.futures.Executor
+            an existing pool of threads to use
+        """
+        dim = self.dim
+        if len(args) < 2*dim:
+            raise TypeError('> Expecting {} position and Fourier '
+                            'arrays'.format(2*dim))
+
+        shape = tuple(len(x) for x in args[:dim])
+
+        workspace = None
+        if reuse:
+            workspace = self.workspace(shape)
+
+        if out is None:
+            if reuse:
+                out = workspace['out']
+            else:
+                out = np.empty(shape, dtype=self.dtype)
+
+        else:
+            if not( out.shape == shape ):
+                raise ValueError('> out must be of shape {}'.format(shape))
+
+            if self.dtype.kind == 'c' and not( out.dtype.kind == 'c' ):
+                raise TypeError('> out must be a complex array for a '
+                                '{} symbol'.format(self.kind))
+
+        # the kernels of the C backend do not have temporaries to reuse
+        if not getattr(self.kernel, 'has_workspace', False):
+            workspace = None
+
+        evaluate_symbol(self.kernel, dim, args, out,
+                        n_threads=n_threads, executor=executor,
+                        workspace=workspace)
+
+        return out
+# ...
+
+# ...
 def discretize_symbol(a, spaces,
                       verbose=False,
-                      namespace=globals(),
+                      namespace=None,
                       context=None,
                       name=None,
                       root=None,
                       backend='python',
-                      export_pyfile=True):
-    """."""
+                      export_pyfile=True,
+                      cache=True):
+    """
+    Compiles the GLT symbol of a bilinear form for the given discrete spaces,
+    and binds it to a.symbol as a DiscreteSymbol.
+    """
     # ...
     fields = a.fields
     dim = a.ldim
-
-    n_rows = 1 ; n_cols = 1
     # ...
 
     # ...
@@ -91,14 +177,6 @@ def discretize_symbol(a, spaces,
         root = '.pyccel'
     # ...
 
-    # ...
-    if name is None:
-        name = 'glt_symbol'
-
-    symbol_name = '{name}_{hash}'.format(name=name,
-                                         hash=abs(hash(a)))
-    # ...
-
     # ...
     V = spaces[0]
     if isinstance(V, SplineSpace):
@@ -113,6 +191,14 @@ def discretize_symbol(a, spaces,
         raise NotImplementedError('')
     # ...
 
+    # ... the name of the kernel is a stable hash of its content
+    if name is None:
+        name = 'glt_symbol'
+
+    key = kernel_key(a, degrees, n_elements=n_elements, backend=backend)
+    symbol_name = '{name}_{hash}'.format(name=name, hash=key[:16])
+    # ...
+
     # ...
     symbol = compile_symbol(symbol_name, a, degrees,
                             n_elements=n_elements,
@@ -120,86 +206,16 @@ def discretize_symbol(a, spaces,
                             namespace=namespace,
                             context=context,
                             backend=backend,
-                            export_pyfile=export_pyfile)
+                            export_pyfile=export_pyfile,
+                            cache=cache)
     # ...
 
     # ...
-    spaces_str = 'target.discrete_spaces'
-    # ...
-
-    # ... contants
-    d_args = arguments_datatypes_as_dict(a.constants)
-    args, dtypes = arguments_datatypes_split(d_args)
-    # ...
-
-    # ... fields
-    fields_str = ''
+    shape = glt_sampling_sizes(degrees, n_elements)
+    arguments = [c.name for c in a.constants]
     if fields:
-        fields_str = ', '.join(i.name for i in fields)
-        fields_str = ', {}'.format(fields_str)
-    # ...
-
-    # ...
-    args_docstring = docstring_arguments(a.constants, d_args)
-    # ...
+        arguments += [f.name for f in fields]
 
-    # ...
-    docstring = _template_docstring.format(__SYMBOL_NAME__=symbol_name,
-                                           __PARAMETERS__=args_docstring)
-    # identation (def function body)
-    tab = ' '*4
-
-    lines = []
-    for line in docstring.split('\n'):
-        lines.append(tab + line)
-    docstring = '\n'.join(i for i in lines)
-    # ...
-
-    # ...
-    x_args = construct_x_args_names(dim)
-    t_args = construct_t_args_names(dim)
-
-    x_args_str = print_position_args(x_args)
-    t_args_str = print_fourier_args(t_args)
-    # ...
-
-    # ...
-    mat_args_str = print_mat_args()
-    # ...
-
-    # ...
-    argument_mat = construct_argument_matrix_name(n_rows, n_cols)
-    mat_args = construct_matrix_names(n_rows, n_cols)
-
-    mat_kwargs = print_argument_matrix_kwargs(argument_mat)
-    mat_args_str = print_matrix_args(n_rows, n_cols, mat_args)
-    mat_decs_str = print_define_matrix(n_rows, n_cols, x_args, mat_args, argument_mat, tab)
-    # ...
-
-    # ...
-    code = _template.format(__NAME__=name,
-                            __SYMBOL_NAME__=symbol_name,
-                            __X_ARGS__=x_args_str,
-                            __T_ARGS__=t_args_str,
-                            __MAT_KWARGS__=mat_kwargs,
-                            __MAT_DEC__=mat_decs_str,
-                            __MAT_ARGS__=mat_args_str,
-                            __ARGS__=args,
-                            __FIELDS__=fields_str,
-                            __DOCSTRING__=docstring)
-    # ...
-
-#    print('--------------')
-#    print(code)
-#    print('--------------')
-#    import sys; sys.exit(0)
-
-    # ...
-    exec(code, namespace)
-    _glt_symbol = namespace[name]
-    # ...
-
-    # ...
     setattr(a, 'discrete_spaces', spaces)
-    a.symbol = types.MethodType(_glt_symbol, a)
+    a.symbol = DiscreteSymbol(symbol, dim, shape=shape, arguments=arguments)
     # ...
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains functions to evaluate the generated symbol kernels
+concurrently, by splitting the sampling grid into slabs along the first axis,
+and the dimension-generic evaluation of the symbols, by chunks of bounded size,
+used by the kernels of the domains of dimension larger than 3."""
+
+import os
+from itertools import product
+
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ...
+def slab_bounds(n, n_slabs):
+    """
+    Returns the bounds [(start, stop), ...] of n_slabs contiguous slabs of
+    (almost) equal sizes covering range(n). Empty slabs are discarded.
+    """
+    n_slabs = max(1, min(n_slabs, n))
+    sizes = [n // n_slabs + (1 if i < n % n_slabs else 0) for i in range(0, n_slabs)]
+
+    bounds = []
+    start = 0
+    for size in sizes:
+        if size > 0:
+            bounds.append((start, start + size))
+        start += size
+
+    return bounds
+# ...
+
+# ...
+def workspace_array(workspace, name, shape, dtype=float):
+    """
+    Returns the array of a temporary of a generated kernel, such as a 1D
+    factor: a new one if workspace is None, otherwise the buffer of workspace
+    keyed by (name, shape, dtype), which is allocated on the first request and
+    then reused. The values of the array are not initialized.
+
+    workspace: dict
+        the buffers of the kernel, see evaluate_symbol
+
+    name: str
+        name of the temporary
+
+    shape: tuple
+        shape of the array
+
+    dtype: type
+        float or complex
+    """
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+
+    key = (name, tuple(shape), np.dtype(dtype).name)
+    buf = workspace.get(key, None)
+    if buf is None:
+        buf = np.empty(shape, dtype=dtype)
+        workspace[key] = buf
+    return buf
+# ...
+
+# ...
+def evaluate_symbol(kernel, dim, args, out,
+                    n_threads=None,
+                    executor=None,
+                    n_slabs=None,
+                    workspace=None):
+    """
+    Evaluates a kernel generated by compile_symbol, writing the samples in out.
+    If n_threads (or an executor) is given, the grid is split into slabs along
+    the first axis, x1 (and t1, unless the kernel samples the product of the
+    position and Fourier grids) and out being sliced accordingly, and the
+    slabs are evaluated concurrently. Every point is computed by the same
+    operations whatever the splitting, so the result does not depend on it.
+    Returns the samples.
+
+    Threads only help with kernels that release the GIL, such as the ones of
+    the numpy backend on large enough slabs.
+
+    kernel: callable
+        the generated function
+
+    dim: int
+        dimension of the logical domain
+
+    args: list, tuple
+        arguments of the kernel, except the output array: the dim position
+        arrays, the dim Fourier arrays, then the constants
+
+    out: numpy.ndarray
+        the output array, of shape (n1, ..., nd), or (n1, ..., nd, m1, ...,
+        md) for a kernel compiled with sampling='product'. It may be None
+        for the latter, the samples being then returned as computed by the
+        kernel (or in a new array if the evaluation is concurrent).
+
+    n_threads: int
+        number of threads. The evaluation is sequential if None or 1 and no
+        executor is given. If 0, the number of cpus is used.
+
+    executor: concurrent.futures.Executor
+        an existing pool of threads to use
+
+    n_slabs: int
+        number of slabs, n_threads (or 4 with an executor) by default
+
+    workspace: dict
+        if given, the temporaries of the kernel (its 1D factors and the
+        functions of the separable terms) are taken from this dict, see
+        workspace_array, and reused by the next evaluations. Every slab has
+        its own buffers, keyed by its bounds. Not supported by the kernels of
+        the C backend.
+    """
+    xs = list(args[:dim])
+    ts = list(args[dim:2*dim])
+    others = list(args[2*dim:])
+
+    product_sampling = getattr(kernel, 'sampling', 'diagonal') == 'product'
+    if out is None and not product_sampling:
+        raise ValueError('> out must be given, unless the kernel samples the '
+                         'product grid')
+
+    if n_threads == 0:
+        n_threads = os.cpu_count() or 1
+
+    kwargs = {}
+    if not( workspace is None ):
+        kwargs['workspace'] = workspace
+
+    if executor is None and ( not n_threads or n_threads < 2 ):
+        values = kernel(*xs, *ts, out, *others, **kwargs)
+        if out is None:
+            return values
+        return out
+
+    if n_slabs is None:
+        n_slabs = n_threads if n_threads else 4
+
+    if out is None:
+        shape = [len(x) for x in xs] + [len(t) for t in ts]
+        out = np.empty(shape, dtype=getattr(kernel, 'dtype', np.float64))
+
+    bounds = slab_bounds(len(xs[0]), n_slabs)
+
+    # ... the slabs are evaluated concurrently, hence they do not share
+    #     their temporaries
+    slab_kwargs = {}
+    for b in bounds:
+        slab_kwargs[b] = {}
+        if not( workspace is None ):
+            slab_kwargs[b]['workspace'] = workspace.setdefault(('slab',) + b, {})
+    # ...
+
+    # ... every slab is a view of out. The position and Fourier variables of
+    #     the product grid span different axes, so only x1 is sliced
+    def _evaluate(bounds):
+        start, stop = bounds
+        if product_sampling:
+            t1 = ts[0]
+        else:
+            t1 = ts[0][start:stop]
+
+        kernel(xs[0][start:stop], *xs[1:],
+               t1, *ts[1:],
+               out[start:stop], *others, **slab_kwargs[bounds])
+    # ...
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(_evaluate, bounds))
+
+    else:
+        list(executor.map(_evaluate, bounds))
+
+    return out
+# ...
+
+# ... default maximum number of values computed at once by the
+#     dimension-generic kernels (16 MB of doubles)
+_chunk_size = 2**21
+
+def grid_chunks(shape, chunk_size=None):
+    """
+    Splits a grid of the given shape into chunks of at most chunk_size points,
+    unless the last axis alone is larger. Every chunk is given as a tuple of
+    slices over the leading axes of the grid, the other axes being taken
+    entirely.
+
+    shape: list, tuple
+        the shape of the grid
+
+    chunk_size: int
+        maximum number of points of a chunk
+    """
+    if chunk_size is None:
+        chunk_size = _chunk_size
+
+    dim = len(shape)
+
+    # an empty grid has no chunk
+    if 0 in shape:
+        return
+
+    # ... the chunks are slabs along the axis k, the axes after k holding
+    #     at most chunk_size points
+    k = dim - 1
+    size = 1
+    while k > 0 and size * shape[k] <= chunk_size:
+        size *= shape[k]
+        k -= 1
+
+    step = max(1, chunk_size // size)
+    # ...
+
+    for index in product(*[range(0, n) for n in shape[:k]]):
+        head = tuple(slice(i, i+1) for i in index)
+        for start in range(0, shape[k], step):
+            yield head + (slice(start, min(start + step, shape[k])),)
+
+def _spanned_axes(axes):
+    if isinstance(axes, int):
+        return (axes,)
+    return tuple(axes)
+
+def _grid_view(array, axes, dim, chunk):
+    """Returns the part in a chunk of an array spanning some axes of the grid,
+    as a view that broadcasts along the other axes."""
+    array = np.asarray(array)
+
+    index = tuple(chunk[a] if a < len(chunk) else slice(None) for a in axes)
+    array = array[index]
+
+    shape = [1]*dim
+    for a, n in zip(axes, array.shape):
+        shape[a] = n
+    return array.reshape(shape)
+
+def _assign(out, chunk, values):
+    # a real symbol may be computed from purely imaginary 1D symbols, its
+    # values having then a zero imaginary part (up to round-off errors)
+    if np.iscomplexobj(values) and not np.iscomplexobj(out):
+        scale = max(1., np.max(np.abs(values), initial=0.))
+        if not np.allclose(np.imag(values), 0., rtol=0., atol=1e-10*scale):
+            raise TypeError('> out must be a complex array for a complex '
+                            'symbol')
+        values = np.real(values)
+    out[chunk] = values
+
+def evaluate_pointwise(out, function, arrays, chunk_size=None):
+    """
+    Evaluates a function on a tensor grid of any dimension, by chunks of at
+    most chunk_size points, writing the values in out.
+
+    out: numpy.ndarray
+        the output array
+
+    function: callable
+        called with the views of the arrays on a chunk, in the order of
+        arrays, broadcasting to the shape of the chunk
+
+    arrays: list
+        the arrays the function depends on, given as pairs (array, axes)
+        where axes is the axis (or the tuple of axes) of the grid spanned by
+        the array, such as (arr_x1, 0) for the position array of the first
+        axis
+
+    chunk_size: int
+        maximum number of points of a chunk
+    """
+    dim = out.ndim
+    arrays = [(a, _spanned_axes(axes)) for a, axes in arrays]
+
+    for chunk in grid_chunks(out.shape, chunk_size):
+        args = [_grid_view(a, axes, dim, chunk) for a, axes in arrays]
+        _assign(out, chunk, function(*args))
+
+    return out
+
+def evaluate_separable(out, coeffs, factors,
+                       functions=None,
+                       positions=None,
+                       axes=None,
+                       chunk_size=None):
+    """
+    Evaluates a sum of separable terms
+
+        sum_k coeffs[k] * functions[k](x1, ..., xd) * prod_i factors[k][i]
+
+    on a tensor grid of any dimension, writing the values in out. The terms
+    without function are combined by einsum, as the contraction of the
+    matrices (one per axis) of the 1D factors of all the terms. The grid is
+    processed by chunks, so that the intermediate arrays of einsum hold at
+    most chunk_size values.
+
+    out: numpy.ndarray
+        the output array
+
+    coeffs: list
+        the constant coefficient of every term
+
+    factors: list
+        for every term, the tuple of its 1D factors, given as arrays or None
+        for a factor equal to one
+
+    functions: list
+        for every term, a callable evaluating the function of the position
+        variables coupling several axes, or None for one
+
+    positions: list
+        the 1D position arrays, spanning the first axes of the grid, required
+        by the functions
+
+    axes: list
+        for every axis i of the factors, the axis (or the tuple of axes) of
+        the grid spanned by its factors, i by default. When sampling the
+        product of the position and Fourier domains, a factor of the axis i
+        spans the axes (i, d+i), or only d+i if it does not depend on x_i.
+
+    chunk_size: int
+        maximum number of values of the intermediate arrays
+    """
+    if chunk_size is None:
+        chunk_size = _chunk_size
+
+    dim = out.ndim
+    shape = out.shape
+
+    if functions is None:
+        functions = [None]*len(coeffs)
+
+    n_axes = len(factors[0]) if factors else 0
+    if axes is None:
+        axes = list(range(0, n_axes))
+    axes = [_spanned_axes(i) for i in axes]
+
+    arrays = [f for fs in factors for f in fs if not( f is None )]
+    dtype = np.result_type(out.dtype, *[np.asarray(c).dtype for c in coeffs],
+                           *[np.asarray(f).dtype for f in arrays])
+
+    # ... the matrices of the 1D factors of the terms without function, the
+    #     coefficients being applied to the first axis
+    ks = [k for k, g in enumerate(functions) if g is None]
+
+    mats = []
+    for i, spanned in enumerate(axes):
+        m = np.ones((len(ks),) + tuple(shape[a] for a in spanned), dtype=dtype)
+        for row, k in enumerate(ks):
+            f = factors[k][i]
+            if not( f is None ):
+                m[row] = f
+        mats.append(m)
+
+    if ks and mats:
+        c = np.array([coeffs[k] for k in ks], dtype=dtype)
+        mats[0] *= c.reshape((-1,) + (1,)*(mats[0].ndim - 1))
+    # ...
+
+    # the axes of the grid that the factors depend on
+    covered = sorted(set(a for spanned in axes for a in spanned))
+
+    for chunk in grid_chunks(shape, max(1, chunk_size // max(1, len(ks)))):
+        values = 0.
+        if ks:
+            operands = []
+            for m, spanned in zip(mats, axes):
+                index = tuple(chunk[a] if a < len(chunk) else slice(None)
+                              for a in spanned)
+                operands += [m[(slice(None),) + index], [dim] + list(spanned)]
+
+            if operands:
+                values = np.einsum(*operands, covered, optimize=True)
+                values = _grid_view(values, covered, dim, ())
+
+            else:
+                values = sum(coeffs[k] for k in ks)
+
+        for k, g in enumerate(functions):
+            if g is None:
+                continue
+
+            xs = [_grid_view(x, (axis,), dim, chunk)
+                  for axis, x in enumerate(positions)]
+            v = coeffs[k] * g(*xs)
+            for f, spanned in zip(factors[k], axes):
+                if not( f is None ):
+                    v = v * _grid_view(f, spanned, dim, chunk)
+
+            values = values + v
+
+        _assign(out, chunk, values)
+
+    return out
+
+def product_values(values, shape, out=None):
+    """
+    Returns the samples of a symbol on the product grid of the given shape,
+    from its values computed for a single position along the axes the symbol
+    does not depend on (the axes of size one of values).
+
+    values: numpy.ndarray
+        the computed values, broadcasting to shape
+
+    shape: tuple
+        the shape (n1, ..., nd, m1, ..., md) of the product grid
+
+    out: numpy.ndarray
+        if given, the samples are written in out, which is returned.
+        Otherwise, a read-only view broadcasting values is returned, without
+        copying them.
+    """
+    if out is None:
+        if values.shape == tuple(shape):
+            return values
+        return np.broadcast_to(values, shape)
+
+    if not( out is values ):
+        _assign(out, (), values)
+    return out
+# ...
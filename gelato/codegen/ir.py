@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains the intermediate representation (IR) of a GLT symbol,
+from which every backend generates its code. A separable symbol is stored as
+a sum of terms coeff * function(x) * prod_i f_i(x_i, t_i), where the distinct
+1D factors f_i of every axis and the functions coupling several position
+variables are shared by all the terms."""
+
+from collections import namedtuple
+
+from sympy import Symbol
+from sympy import Mul
+from sympy import cse as sympy_cse
+from sympy import numbered_symbols
+
+from symfe.codegen.utils import _convert_int_to_float
+
+from gelato.core import separate_terms
+from gelato.core import symbol_kind, symbol_dtype
+from gelato.core import coordinate_names
+
+from .utils import clenshaw_expr
+from .utils import _axis_factor_name
+
+
+# ... a term of the IR: coeff is a sympy expression of the constants, function
+#     is the index of a function of ir.functions (or None for one), and factors
+#     holds, for every axis, the index of a factor of ir.factors[axis] (or None
+#     for one)
+SeparableTerm = namedtuple('SeparableTerm', ['coeff', 'function', 'factors'])
+# ...
+
+# ...
+def _index(ls, f):
+    if not f in ls:
+        ls.append(f)
+    return ls.index(f)
+
+def construct_axis_factors(terms, dim):
+    """
+    Collects the distinct 1D factors of every axis, for a list of separable
+    terms as returned by separate_axes. Returns the factors of every axis and,
+    for every term, the index of its factor on every axis (None for a factor
+    equal to one).
+    """
+    factors = [[] for i in range(0, dim)]
+    indices = []
+    for term in terms:
+        ls = []
+        for i, f in enumerate(term[-1]):
+            if f == 1:
+                ls.append(None)
+            else:
+                ls.append(_index(factors[i], f))
+        indices.append(ls)
+
+    return factors, indices
+# ...
+
+# ...
+class SymbolIR(object):
+    """
+    The intermediate representation of a scalar GLT symbol.
+
+    dim: int
+        dimension of the logical domain
+
+    expr: sympy.Expression
+        the symbol, with floating point numbers
+
+    terms: list
+        the SeparableTerm of the symbol, or None if it is not separable (or
+        the factorization is disabled); the backends then evaluate expr
+
+    factors: list
+        the distinct 1D factors of every axis
+
+    functions: list
+        the distinct functions coupling several position variables
+
+    After the common subexpression elimination (see symbol_ir), the 1D
+    factors of an axis are written in terms of the temporaries
+    axis_temporaries[axis], that only depend on this axis, and a non separable
+    expr is written in terms of the hoisted 1D factors (the symbols f1_0, ...)
+    and of the temporaries, computed for every point before expr.
+    """
+    def __init__(self, dim, expr, terms=None, factors=None, functions=None):
+        self.dim       = dim
+        self.expr      = expr
+        self.terms     = terms
+        self.factors   = factors if factors else [[] for i in range(0, dim)]
+        self.functions = functions if functions else []
+
+        self.axis_temporaries = [[] for i in range(0, dim)]
+        self.temporaries      = []
+
+        self.kind  = symbol_kind(expr)
+        self.dtype = symbol_dtype(expr)
+
+        # names of the position variables the symbol depends on
+        names = coordinate_names(dim)
+        self.positions = sorted(set(s.name for s in expr.free_symbols
+                                    if s.name in names))
+
+    @property
+    def is_separable(self):
+        return not( self.terms is None )
+
+    @property
+    def is_x_independent(self):
+        """True if the symbol does not depend on the position variables."""
+        return not self.positions
+
+    def __repr__(self):
+        n_terms = len(self.terms) if self.is_separable else None
+        return ('SymbolIR(dim={dim}, kind={kind}, n_terms={n_terms}, '
+                'n_factors={n_factors}, n_functions={n_functions})'.format(
+                    dim=self.dim, kind=self.kind, n_terms=n_terms,
+                    n_factors=[len(fs) for fs in self.factors],
+                    n_functions=len(self.functions)))
+# ...
+
+# ...
+def _axes(expr, names):
+    return set(names[s.name] for s in expr.free_symbols if s.name in names)
+
+def _hoist(expr, names, factors):
+    """Replaces the subexpressions of expr that only depend on one axis by the
+    symbols of 1D factors, that are appended to factors."""
+    axes = _axes(expr, names)
+    if not axes or expr.is_Atom:
+        return expr
+
+    if len(axes) == 1:
+        axis = axes.pop()
+        j = _index(factors[axis], expr)
+        return Symbol(_axis_factor_name(axis, j))
+
+    if expr.is_Mul:
+        # the factors of the same axis are grouped
+        groups = {}
+        args = []
+        for i in expr.args:
+            ls = _axes(i, names)
+            if len(ls) == 1:
+                groups.setdefault(ls.pop(), []).append(i)
+            else:
+                args.append(i)
+
+        args += [_hoist(Mul(*ls), names, factors) for ls in groups.values()]
+        args = [_hoist(i, names, factors) if len(_axes(i, names)) > 1 else i
+                for i in args]
+        return Mul(*args)
+
+    return expr.func(*[_hoist(i, names, factors) for i in expr.args])
+
+def _cse(exprs, prefix):
+    temporaries, exprs = sympy_cse(exprs, symbols=numbered_symbols(prefix),
+                                   optimizations='basic')
+    return temporaries, exprs
+
+def hoist_axis_factors(ir):
+    """
+    Replaces the subexpressions of a non separable symbol IR that only depend
+    on one axis by 1D factors, evaluated once per axis instead of once per
+    point.
+    """
+    names = {}
+    for i, x in enumerate(coordinate_names(ir.dim)):
+        names[x] = i
+        names['t{}'.format(x)] = i
+
+    ir.expr = _hoist(ir.expr, names, ir.factors)
+    return ir
+
+def common_subexpressions(ir):
+    """
+    Eliminates the common subexpressions of a symbol IR: the 1D factors of
+    every axis share their temporaries, and the common subexpressions of a non
+    separable symbol become temporaries computed once per point.
+    """
+    if not ir.is_separable:
+        ir.temporaries, exprs = _cse([ir.expr], 'w_')
+        ir.expr = exprs[0]
+
+    for axis, fs in enumerate(ir.factors):
+        if fs:
+            prefix = 'w{}_'.format(axis+1)
+            ir.axis_temporaries[axis], ir.factors[axis] = _cse(fs, prefix)
+
+    return ir
+# ...
+
+# ...
+def symbol_ir(expr, dim, factorize=True, clenshaw=True, cse=True):
+    """
+    Builds the intermediate representation of a scalar symbol.
+
+    expr: sympy.Expression
+        a scalar symbol, as returned by gelatize for given degrees and
+        number of elements
+
+    dim: int
+        dimension of the logical domain
+
+    factorize: bool
+        splits the symbol into separable terms if possible
+
+    clenshaw: bool
+        rewrites the trigonometric polynomials as calls to trig_clenshaw,
+        see clenshaw_expr
+
+    cse: bool
+        hoists the subexpressions of one axis of a non separable symbol, see
+        hoist_axis_factors, and eliminates the common subexpressions, see
+        common_subexpressions
+    """
+    # we call evalf to avoid having fortran doing the evaluation of rational
+    # division
+    e = _convert_int_to_float(expr.evalf())
+
+    ir = SymbolIR(dim, e)
+
+    # ... every term is split into its constant coefficient, a function of the
+    #     position variables and 1D factors
+    terms = None
+    if factorize and dim > 1:
+        terms = separate_terms(e.evalf(), dim)
+    # ...
+
+    if terms is None:
+        # the subexpressions of one axis are evaluated once per axis
+        if cse and dim > 1:
+            hoist_axis_factors(ir)
+
+    else:
+        ir.factors, indices = construct_axis_factors(terms, dim)
+
+        ir.terms = []
+        for (coeff, function, factors), ls in zip(terms, indices):
+            i = None
+            if not( function == 1 ):
+                i = _index(ir.functions, function)
+
+            ir.terms.append(SeparableTerm(coeff, i, tuple(ls)))
+
+    if clenshaw:
+        ir.factors = [[clenshaw_expr(f) for f in fs] for fs in ir.factors]
+        if not ir.is_separable:
+            ir.expr = clenshaw_expr(ir.expr)
+
+    if cse:
+        common_subexpressions(ir)
+
+    return ir
+# ...
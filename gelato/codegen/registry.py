@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains a thread-safe registry that owns the compiled symbol
+kernels. Every kernel is executed in its own namespace, and concurrent requests
+for the same kernel only trigger one compilation."""
+
+import threading
+from time import time
+from collections import OrderedDict
+from collections import namedtuple
+
+
+RegistryInfo = namedtuple('RegistryInfo', ['hits', 'compiled', 'currsize',
+                                           'total_time', 'max_time'])
+
+# ...
+def exec_in_namespace(code, name, namespace=None):
+    """
+    Executes the source code of a generated function in a private namespace
+    (a new dictionary, updated with namespace if given) and returns the
+    function.
+
+    code: str
+        source code
+
+    name: str
+        name of the function defined by code
+
+    namespace: dict
+        additional names, such as functions called by the generated code
+    """
+    d = {}
+    if namespace:
+        d.update(namespace)
+
+    exec(code, d)
+    return d[name]
+# ...
+
+# ...
+class KernelRegistry(object):
+    """
+    A registry of compiled kernels, keyed by a hashable key such as the one
+    returned by kernel_key. Kernels are compiled once: concurrent requests for
+    the same key wait for the first compilation, while different keys are
+    compiled concurrently.
+    """
+    def __init__(self):
+        self._kernels = OrderedDict()
+        self._locks   = {}
+        self._times   = OrderedDict()
+        self._lock    = threading.Lock()
+        self._hits    = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._kernels
+
+    def __len__(self):
+        with self._lock:
+            return len(self._kernels)
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._locks.get(key, None)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+    def get(self, key, compile):
+        """
+        Returns the kernel of key, calling compile() if it is not registered.
+
+        key: str
+            the kernel key
+
+        compile: callable
+            function returning the compiled kernel
+        """
+        with self._lock:
+            if key in self._kernels:
+                self._hits += 1
+                return self._kernels[key]
+
+        # ... one compilation per key, the other requests wait for it
+        with self._key_lock(key):
+            with self._lock:
+                if key in self._kernels:
+                    self._hits += 1
+                    return self._kernels[key]
+
+            tb = time()
+            kernel = compile()
+            te = time()
+
+            with self._lock:
+                self._kernels[key] = kernel
+                self._times[key] = te - tb
+        # ...
+
+        return kernel
+
+    def compile_time(self, key):
+        """Returns the compilation time of a registered kernel."""
+        with self._lock:
+            return self._times[key]
+
+    def info(self):
+        """Returns the hits and compilation statistics of the registry."""
+        with self._lock:
+            times = list(self._times.values())
+            return RegistryInfo(self._hits, len(times), len(self._kernels),
+                                sum(times), max(times + [0.]))
+
+    def clear(self):
+        """Removes all the kernels and resets the statistics."""
+        with self._lock:
+            self._kernels.clear()
+            self._locks.clear()
+            self._times.clear()
+            self._hits = 0
+# ...
+
+# ... the registry used by compile_symbol when no namespace is given
+kernel_registry = KernelRegistry()
+# ...
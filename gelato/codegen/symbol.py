@@ -2,31 +2,263 @@
 
 import importlib
 
+import numpy as np
+
 from symfe.core import BilinearForm
 from symfe.codegen import arguments_datatypes_as_dict
 from symfe.codegen import arguments_datatypes_split
-from symfe.codegen.utils import _convert_int_to_float
 from symfe.codegen.utils import write_code
 
 from gelato.core import gelatize
+from gelato.core import symbol_kind, symbol_dtype
+from gelato.core import coordinate_names
 
+from .cache import kernel_key, kernel_cache
+from .registry import exec_in_namespace, kernel_registry
+from .ir import symbol_ir
+from .ccode import print_c_wrapper
 from .utils import (print_position_args, print_fourier_args,
                     construct_x_args_names,
                     construct_t_args_names,
-                    print_mat_args)
+                    print_mat_args,
+                    print_axis_factors,
+                    print_functions,
+                    print_temporaries,
+                    print_symbol_expr,
+                    print_separable_expr,
+                    print_n_points,
+                    print_pointwise_args,
+                    print_pointwise_arrays,
+                    print_pointwise_temporaries,
+                    print_separable_terms,
+                    product_axis_spans,
+                    print_product_n_points,
+                    print_product_axis_factors,
+                    print_product_values,
+                    print_expr)
+
+# ... available backends and the suffix of their templates (the C backend
+#     generates its code from the IR only)
+_backends = {'python': '',
+             'numpy':  '_numpy',
+             'c':      None}
+
+# ... the templates of the python and numpy backends are written for the
+#     dimensions 1 to 3. Beyond, both backends generate the dimension-generic
+#     kernel, evaluating the symbol by chunks (see evaluate_separable and
+#     evaluate_pointwise)
+_max_template_dim = 3
+# ...
 
 def compile_symbol(name, a,
                    degrees,
                    n_elements=None,
                    verbose=False,
-                   namespace=globals(),
+                   namespace=None,
                    context=None,
                    backend='python',
-                   export_pyfile=True):
-    """."""
+                   export_pyfile=True,
+                   factorize=True,
+                   clenshaw=True,
+                   cse=True,
+                   cache=True,
+                   registry=None,
+                   sampling='diagonal'):
+    """
+    Generates and compiles a function that evaluates the GLT symbol of a
+    bilinear form.
+
+    name: str
+        name of the generated function
+
+    a: BilinearForm
+        the weak formulation
+
+    degrees: list, tuple
+        spline degrees for every direction. If None, they become arguments
+        (px, py, ...) of the generated function, after the number of elements:
+        the 1D symbols are then evaluated from the tables of their
+        coefficients (see glt_symbol), and the same kernel serves every
+        degree.
+
+    n_elements: list, tuple
+        number of elements for every direction. If not given, they become
+        arguments of the generated function.
+
+    backend: str
+        'python' evaluates the symbol point by point in nested loops, while
+        'numpy' evaluates it on the whole grid using broadcasting. 'c'
+        generates a C99 function, compiled into a shared library (see
+        build_c_library) and called on the buffers of the numpy arrays; the
+        outer loop is parallelized with OpenMP when available.
+
+        For a domain of dimension larger than 3, such as a space-time
+        domain, the python and numpy backends generate a dimension-generic
+        kernel: the 1D factors of every axis are computed once, and the
+        separable terms are combined with einsum (the other symbols being
+        evaluated with broadcasting), by chunks of the grid. The kernel then
+        has the keyword argument chunk_size, the maximum number of values
+        computed at once, which bounds the memory used.
+
+    factorize: bool
+        if True and the symbol is a sum of products of 1D factors, every 1D
+        factor is evaluated once per axis and the symbol is obtained as a sum
+        of outer products.
+
+    clenshaw: bool
+        if True, the trigonometric polynomials of degree at least 2 in one
+        Fourier variable, such as the 1D symbols, are evaluated by the Clenshaw
+        recurrence, with one cosine and one sine per point.
+
+    cse: bool
+        if True, the subexpressions that only depend on one axis are evaluated
+        once per axis, and the common subexpressions are computed once, as
+        temporaries.
+
+    cache: bool
+        if True, the generated code is looked up in (and added to) the kernels
+        cache, keyed by a hash of the weak formulation, the discretization, the
+        backend and the GeLaTo version. On a hit, gelatize and the code
+        generation are skipped.
+
+    namespace: dict
+        if given, the generated function is also defined in namespace.
+        Otherwise, it is compiled in a private namespace and owned by the
+        registry.
+
+    registry: KernelRegistry
+        the registry owning the kernel, kernel_registry by default. The
+        kernel is compiled once per registry, even when requested from
+        several threads.
+
+    sampling: str
+        'diagonal' samples the position and Fourier variables of every axis
+        on the same index: mat has the shape (n1, ..., nd) of the arrays.
+        'product' samples the product domain [0,1]^d x [-pi,pi]^d: mat has
+        the shape (n1, ..., nd, m1, ..., md), where m1, ... are the sizes of
+        the Fourier arrays, and the kernel (a dimension-generic one, see
+        backend) returns the samples. mat may then be None: if the symbol
+        does not depend on some position variables, it is only computed for
+        one position along these axes, and the kernel returns a read-only
+        view broadcasting the values, so that the cost of a symbol with
+        constant coefficients only depends on the Fourier grid. Not
+        available with the C backend.
+
+    The returned function has the attributes kind ('real', 'imaginary' or
+    'complex'), dtype and sampling; mat must be a complex array unless the
+    symbol is real. Unless has_workspace is False (C backend), it also has
+    the keyword argument workspace, a dict where the arrays of its 1D
+    factors are kept between calls, see workspace_array.
+    """
     if not isinstance(a, BilinearForm):
            raise TypeError('Expecting a BilinearForm')
 
+    if not backend in _backends:
+        raise ValueError('> Unknown backend {}'.format(backend))
+
+    if degrees is None and backend == 'c':
+        raise NotImplementedError('> The C backend requires the degrees')
+
+    if not sampling in ['diagonal', 'product']:
+        raise ValueError('> Unknown sampling {}'.format(sampling))
+
+    if sampling == 'product' and backend == 'c':
+        raise NotImplementedError('> The product sampling is not available '
+                                  'with the C backend')
+
+    # ... functions provided by the pyccel contexts
+    functions = {}
+    if context:
+        from pyccel.epyccel import ContextPyccel
+
+        if isinstance(context, ContextPyccel):
+            context = [context]
+        elif isinstance(context, (list, tuple)):
+            for i in context:
+                assert(isinstance(i, ContextPyccel))
+        else:
+            raise TypeError('Expecting a ContextPyccel or list/tuple of ContextPyccel')
+
+        for c in context:
+            for k,v in list(c.functions.items()):
+                functions[k] = v[0]
+    # ...
+
+    # ...
+    key = kernel_key(a, degrees, n_elements=n_elements, backend=backend,
+                     factorize=factorize, name=name, clenshaw=clenshaw,
+                     cse=cse, sampling=sampling)
+
+    generated = []
+    def _generate():
+        generated.append(name)
+
+        code, kind, dtype = _generate_symbol_code(name, a, degrees,
+                                                  n_elements=n_elements,
+                                                  verbose=verbose,
+                                                  backend=backend,
+                                                  factorize=factorize,
+                                                  clenshaw=clenshaw,
+                                                  cse=cse,
+                                                  sampling=sampling)
+
+        return {'name': name, 'code': code, 'kind': kind,
+                'dtype': np.dtype(dtype).name}
+
+    def _compile():
+        if cache:
+            entry = kernel_cache.get(key, _generate)
+        else:
+            entry = _generate()
+
+        kernel = exec_in_namespace(entry['code'], name, namespace=functions)
+        kernel.kind     = entry['kind']
+        kernel.dtype    = np.dtype(entry['dtype'])
+        kernel.sampling = sampling
+        kernel.has_workspace = not( backend == 'c' )
+
+        # ... export the python code of the module, only when it was generated
+        if export_pyfile and generated:
+            write_code(name, entry['code'], ext='py', folder='.pyccel')
+        # ...
+
+        return kernel
+    # ...
+
+    # ...
+    if not( namespace is None ):
+        # the function is also defined in the given namespace
+        kernel = _compile()
+
+        namespace.update(functions)
+        namespace[name] = kernel
+
+    elif cache:
+        if registry is None:
+            registry = kernel_registry
+
+        kernel = registry.get((key, tuple(sorted(functions))), _compile)
+
+    else:
+        kernel = _compile()
+    # ...
+
+    return kernel
+
+def _generate_symbol_code(name, a, degrees,
+                          n_elements=None,
+                          verbose=False,
+                          backend='python',
+                          factorize=True,
+                          clenshaw=True,
+                          cse=True,
+                          sampling='diagonal'):
+    """
+    Generates the source code of the function that evaluates the GLT symbol of
+    a bilinear form. Returns the code, and the kind and dtype of the symbol.
+    See compile_symbol for the arguments.
+    """
+
     # TODO: nderiv must be computed from the weak form
     nderiv = 1
 
@@ -69,7 +301,14 @@ def compile_symbol(name, a,
     # ...
 
     # ... get name of the template to be used
-    template_str = '_symbol_{dim}d_{pattern}'.format(dim=dim, pattern=pattern)
+    generic = dim > _max_template_dim or sampling == 'product'
+    if generic:
+        template_str = '_symbol_nd_{pattern}'.format(pattern=pattern)
+
+    else:
+        template_str = '_symbol_{dim}d_{pattern}{suffix}'.format(dim=dim,
+                                                                pattern=pattern,
+                                                                suffix=_backends[backend])
     # ...
 
     # ... import the variable from the templates module
@@ -80,13 +319,21 @@ def compile_symbol(name, a,
     except:
         raise ImportError('could not import {0}'.format(name))
 
-    template = getattr(package, template_str)
+    if backend == 'c':
+        template = None
+    else:
+        template = getattr(package, template_str)
     # ...
 
     # ...
     expr = gelatize(a, degrees=degrees, n_elements=n_elements)
     # ...
 
+    # ... static classification of the symbol
+    kind  = symbol_kind(expr)
+    dtype = symbol_dtype(expr)
+    # ...
+
     # ... TODO add an attribute called symbol_expr to the BilinearForm?
 #    setattr(a, 'symbol_expr', expr)
     # ...
@@ -102,7 +349,7 @@ def compile_symbol(name, a,
         n_elements_types_str = ''
 
     else:
-        ns = ['nx', 'ny', 'nz'][:dim]
+        ns = ['n{}'.format(x) for x in coordinate_names(dim)]
         n_elements_str = ', '.join(n for n in ns)
         n_elements_str = ', {}'.format(n_elements_str)
 
@@ -110,6 +357,13 @@ def compile_symbol(name, a,
         n_elements_types_str = ', {}'.format(n_elements_types_str)
     # ...
 
+    # ... append the degrees as arguments of the generated symbol function
+    if degrees is None:
+        ps = ['p{}'.format(x) for x in coordinate_names(dim)]
+        n_elements_str += ''.join(', {}'.format(p) for p in ps)
+        n_elements_types_str += ''.join(', int' for p in ps)
+    # ...
+
     # ... field coeffs
     if fields:
         raise NotImplementedError()
@@ -258,12 +512,68 @@ def compile_symbol(name, a,
                                __ARGS__=args)
 
     else:
-        # we call evalf to avoid having fortran doing the evaluation of rational
-        # division
+        # ... the code is generated from the intermediate representation: a
+        #     separable symbol is evaluated through its 1D factors, computed
+        #     once per axis, and then combined as a sum of outer products
+        if backend == 'c':
+            # the 1D factors are already evaluated once per axis, hence the
+            # Clenshaw recurrence is not used in C
+            ir = symbol_ir(expr, dim, factorize=factorize, clenshaw=False,
+                           cse=cse)
+
+            code = print_c_wrapper(name, ir, d_args=d_args,
+                                   n_elements=n_elements)
+
+            return code, kind, dtype
+
+        ir = symbol_ir(expr, dim, factorize=factorize, clenshaw=clenshaw,
+                       cse=cse)
+
+        if generic:
+            code = _print_generic_code(name, ir, package, template_str,
+                                       sampling=sampling,
+                                       x_args_str=x_args_str,
+                                       t_args_str=t_args_str,
+                                       mat_args_str=mat_args_str,
+                                       n_elements_str=n_elements_str,
+                                       field_coeffs_str=field_coeffs_str,
+                                       eval_field_str=eval_field_str,
+                                       field_value_str=field_value_str,
+                                       args=args)
+
+            return code, kind, dtype
+
+        axis_factors_str = print_axis_factors(ir.factors, backend, tab,
+                                              temporaries=ir.axis_temporaries)
+
+        if not ir.is_separable:
+            # the temporaries are computed in the innermost loop
+            if backend == 'numpy':
+                temporaries_tab = tab
+            else:
+                temporaries_tab = tab + ' '*4*dim
+
+            temporaries_str = print_temporaries(ir, backend, temporaries_tab)
+            symbol_expr_str = print_symbol_expr(ir, backend)
+
+        else:
+            template_str = '{template}_separable{suffix}'.format(
+                template='_symbol_{dim}d_{pattern}'.format(dim=dim, pattern=pattern),
+                suffix=_backends[backend])
+            template = getattr(package, template_str)
+
+            temporaries_str = ''
+            functions_str = print_functions(ir.functions, dim, backend, tab)
+            if functions_str:
+                axis_factors_str = '\n'.join([axis_factors_str, functions_str])
+
+            symbol_expr_str = print_separable_expr(ir, backend)
+        # ...
 
-        e = _convert_int_to_float(expr.evalf())
         code = template.format(__SYMBOL_NAME__=name,
-                               __SYMBOL_EXPR__=e.evalf(),
+                               __SYMBOL_EXPR__=symbol_expr_str,
+                               __AXIS_FACTORS__=axis_factors_str,
+                               __TEMPORARIES__=temporaries_str,
                                __X_ARGS__=x_args_str,
                                __T_ARGS__=t_args_str,
                                __MAT_ARGS__=mat_args_str,
@@ -279,32 +589,59 @@ def compile_symbol(name, a,
 #    print('--------------')
 #    import sys; sys.exit(0)
 
-    # ...
-    if context:
-        from pyccel.epyccel import ContextPyccel
+    return code, kind, dtype
 
-        if isinstance(context, ContextPyccel):
-            context = [context]
-        elif isinstance(context, (list, tuple)):
-            for i in context:
-                assert(isinstance(i, ContextPyccel))
-        else:
-            raise TypeError('Expecting a ContextPyccel or list/tuple of ContextPyccel')
+def _print_generic_code(name, ir, package, template_str,
+                        sampling='diagonal', **kwargs):
+    """
+    Prints the dimension-generic kernel of a scalar symbol IR, see
+    compile_symbol. The 1D factors of every axis are computed once, then the
+    separable terms are given to evaluate_separable, or the symbol is
+    evaluated by evaluate_pointwise on the chunks of the grid. For the product
+    sampling, the grid has the position axes followed by the Fourier axes,
+    and the positions the symbol does not depend on are reduced to one point.
+    """
+    tab = ' '*4
 
-        # append functions to the namespace
-        for c in context:
-            for k,v in list(c.functions.items()):
-                namespace[k] = v[0]
-    # ...
+    if sampling == 'product':
+        spans = product_axis_spans(ir)
+        suffix = '_product'
 
-    # ...
-    exec(code, namespace)
-    kernel = namespace[name]
-    # ...
+        n_points_str = print_product_n_points(ir, tab)
+        axis_factors_str = print_product_axis_factors(ir, spans, tab)
+        extra = {'__VALUES__': print_product_values(ir, tab)}
 
-    # ... export the python code of the module
-    if export_pyfile:
-        write_code(name, code, ext='py', folder='.pyccel')
-    # ...
+    else:
+        spans = None
+        suffix = ''
 
-    return kernel
+        n_points_str = print_n_points(ir.dim, tab)
+        axis_factors_str = print_axis_factors(ir.factors, 'numpy', tab,
+                                              temporaries=ir.axis_temporaries)
+        extra = {}
+
+    if ir.is_separable:
+        template = getattr(package, '{}_separable{}'.format(template_str, suffix))
+        extra['__TERMS__'] = print_separable_terms(ir, tab)
+        if not( spans is None ):
+            extra['__AXES__'] = '[{}]'.format(', '.join(str(i) for i in spans))
+
+    else:
+        template = getattr(package, '{}{}'.format(template_str, suffix))
+        extra['__POINT_ARGS__']  = print_pointwise_args(ir)
+        extra['__TEMPORARIES__'] = print_pointwise_temporaries(ir, tab*2)
+        extra['__SYMBOL_EXPR__'] = print_expr(ir.expr)
+        extra['__ARRAYS__']      = print_pointwise_arrays(ir, spans=spans)
+
+    return template.format(__SYMBOL_NAME__=name,
+                           __N_POINTS__=n_points_str,
+                           __AXIS_FACTORS__=axis_factors_str,
+                           __X_ARGS__=kwargs['x_args_str'],
+                           __T_ARGS__=kwargs['t_args_str'],
+                           __MAT_ARGS__=kwargs['mat_args_str'],
+                           __N_ELEMENTS__=kwargs['n_elements_str'],
+                           __FIELD_COEFFS__=kwargs['field_coeffs_str'],
+                           __FIELD_EVALUATION__=kwargs['eval_field_str'],
+                           __FIELD_VALUE__=kwargs['field_value_str'],
+                           __ARGS__=kwargs['args'],
+                           **extra)
@@ -6,16 +6,21 @@
 #          SYMBOL     1D case - scalar
 # .............................................
 _symbol_1d_scalar ="""
-def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}):
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
     from numpy import sin
     from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
 {__FIELD_EVALUATION__}
     n1 = len(arr_x1)
+{__AXIS_FACTORS__}
     mat[:] = 0.
     for i1 in range(0, n1):
         x = arr_x1[i1]
         tx = arr_t1[i1]
 {__FIELD_VALUE__}
+{__TEMPORARIES__}
         mat[i1] = {__SYMBOL_EXPR__}
 """
 
@@ -26,12 +31,16 @@ _symbol_header_1d_scalar = '#$ header procedure {__SYMBOL_NAME__}(double [:], do
 #          SYMBOL     2D case - scalar
 # .............................................
 _symbol_2d_scalar ="""
-def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}):
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
     from numpy import sin
     from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
 {__FIELD_EVALUATION__}
     n1 = len(arr_x1)
     n2 = len(arr_x2)
+{__AXIS_FACTORS__}
     mat[:,:] = 0.
     for i1 in range(0, n1):
         for i2 in range(0, n2):
@@ -40,6 +49,7 @@ def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_C
             tx = arr_t1[i1]
             ty = arr_t2[i2]
 {__FIELD_VALUE__}
+{__TEMPORARIES__}
             mat[i1, i2] = {__SYMBOL_EXPR__}
 """
 
@@ -50,13 +60,17 @@ _symbol_header_2d_scalar = '#$ header procedure {__SYMBOL_NAME__}(double [:], do
 #          SYMBOL     3D case - scalar
 # .............................................
 _symbol_3d_scalar ="""
-def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}):
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
     from numpy import sin
     from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
 {__FIELD_EVALUATION__}
     n1 = len(arr_x1)
     n2 = len(arr_x2)
     n3 = len(arr_x3)
+{__AXIS_FACTORS__}
     mat[:,:,:] = 0.
     for i1 in range(0, n1):
         for i2 in range(0, n2):
@@ -68,12 +82,263 @@ def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_C
                 ty = arr_t2[i2]
                 tz = arr_t3[i3]
 {__FIELD_VALUE__}
+{__TEMPORARIES__}
                 mat[i1, i2, i3] = {__SYMBOL_EXPR__}
 """
 
 _symbol_header_3d_scalar = '#$ header procedure {__SYMBOL_NAME__}(double [:], double [:], double [:], double [:], double [:], double [:], double [:,:,:]{__TYPES__}{__FIELD_TYPES__}{__N_ELEMENTS_TYPES__})'
 # .............................................
 
+# .............................................
+#          SYMBOL     1D case - scalar - numpy backend
+# .............................................
+_symbol_1d_scalar_numpy ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+{__AXIS_FACTORS__}
+    x = arr_x1
+    tx = arr_t1
+{__FIELD_VALUE__}
+{__TEMPORARIES__}
+    mat[:] = {__SYMBOL_EXPR__}
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     2D case - scalar - numpy backend
+# .............................................
+_symbol_2d_scalar_numpy ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+    n2 = len(arr_x2)
+{__AXIS_FACTORS__}
+    x = arr_x1[:,None]
+    y = arr_x2[None,:]
+    tx = arr_t1[:,None]
+    ty = arr_t2[None,:]
+{__FIELD_VALUE__}
+{__TEMPORARIES__}
+    mat[:,:] = {__SYMBOL_EXPR__}
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     3D case - scalar - numpy backend
+# .............................................
+_symbol_3d_scalar_numpy ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+    n2 = len(arr_x2)
+    n3 = len(arr_x3)
+{__AXIS_FACTORS__}
+    x = arr_x1[:,None,None]
+    y = arr_x2[None,:,None]
+    z = arr_x3[None,None,:]
+    tx = arr_t1[:,None,None]
+    ty = arr_t2[None,:,None]
+    tz = arr_t3[None,None,:]
+{__FIELD_VALUE__}
+{__TEMPORARIES__}
+    mat[:,:,:] = {__SYMBOL_EXPR__}
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     2D case - scalar - separable
+# .............................................
+_symbol_2d_scalar_separable ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+    n2 = len(arr_x2)
+{__AXIS_FACTORS__}
+    mat[:,:] = 0.
+    for i1 in range(0, n1):
+        for i2 in range(0, n2):
+{__FIELD_VALUE__}
+            mat[i1, i2] = {__SYMBOL_EXPR__}
+"""
+
+_symbol_2d_scalar_separable_numpy ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+    n2 = len(arr_x2)
+{__AXIS_FACTORS__}
+{__FIELD_VALUE__}
+    mat[:,:] = {__SYMBOL_EXPR__}
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     3D case - scalar - separable
+# .............................................
+_symbol_3d_scalar_separable ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+    n2 = len(arr_x2)
+    n3 = len(arr_x3)
+{__AXIS_FACTORS__}
+    mat[:,:,:] = 0.
+    for i1 in range(0, n1):
+        for i2 in range(0, n2):
+            for i3 in range(0, n3):
+{__FIELD_VALUE__}
+                mat[i1, i2, i3] = {__SYMBOL_EXPR__}
+"""
+
+_symbol_3d_scalar_separable_numpy ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+    n1 = len(arr_x1)
+    n2 = len(arr_x2)
+    n3 = len(arr_x3)
+{__AXIS_FACTORS__}
+{__FIELD_VALUE__}
+    mat[:,:,:] = {__SYMBOL_EXPR__}
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     any dimension - scalar
+# .............................................
+_symbol_nd_scalar ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, chunk_size=None,
+    workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import evaluate_pointwise
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+{__N_POINTS__}
+{__AXIS_FACTORS__}
+{__FIELD_VALUE__}
+    def _symbol({__POINT_ARGS__}):
+{__TEMPORARIES__}
+        return {__SYMBOL_EXPR__}
+
+    evaluate_pointwise(mat, _symbol, {__ARRAYS__}, chunk_size=chunk_size)
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     any dimension - scalar - separable
+# .............................................
+_symbol_nd_scalar_separable ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, chunk_size=None,
+    workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import evaluate_separable
+    from gelato.codegen.evaluation import workspace_array
+{__FIELD_EVALUATION__}
+{__N_POINTS__}
+{__AXIS_FACTORS__}
+{__FIELD_VALUE__}
+{__TERMS__}
+    evaluate_separable(mat, coeffs, factors, functions=functions,
+                       positions=[{__X_ARGS__}], chunk_size=chunk_size)
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     any dimension - scalar - product grid
+# .............................................
+_symbol_nd_scalar_product ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, chunk_size=None,
+    workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import evaluate_pointwise
+    from gelato.codegen.evaluation import product_values
+    from gelato.codegen.evaluation import workspace_array
+    from numpy import zeros
+{__FIELD_EVALUATION__}
+{__N_POINTS__}
+{__AXIS_FACTORS__}
+{__FIELD_VALUE__}
+    def _symbol({__POINT_ARGS__}):
+{__TEMPORARIES__}
+        return {__SYMBOL_EXPR__}
+
+{__VALUES__}
+    evaluate_pointwise(values, _symbol, {__ARRAYS__}, chunk_size=chunk_size)
+    return product_values(values, shape, mat)
+"""
+# .............................................
+
+# .............................................
+#          SYMBOL     any dimension - scalar - separable - product grid
+# .............................................
+_symbol_nd_scalar_separable_product ="""
+def {__SYMBOL_NAME__}({__X_ARGS__}{__T_ARGS__}{__MAT_ARGS__}{__ARGS__}{__FIELD_COEFFS__}{__N_ELEMENTS__}, chunk_size=None,
+    workspace=None):
+    from numpy import sin
+    from numpy import cos
+    from gelato.core import trig_clenshaw
+    from gelato.core import glt_symbol
+    from gelato.codegen.evaluation import evaluate_separable
+    from gelato.codegen.evaluation import product_values
+    from gelato.codegen.evaluation import workspace_array
+    from numpy import zeros
+{__FIELD_EVALUATION__}
+{__N_POINTS__}
+{__AXIS_FACTORS__}
+{__FIELD_VALUE__}
+{__TERMS__}
+{__VALUES__}
+    evaluate_separable(values, coeffs, factors, functions=functions,
+                       positions=[{__X_ARGS__}], axes={__AXES__},
+                       chunk_size=chunk_size)
+    return product_values(values, shape, mat)
+"""
+# .............................................
+
 # .............................................
 #          SYMBOL     1D case - block
 # .............................................
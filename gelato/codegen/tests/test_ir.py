@@ -0,0 +1,163 @@
+# coding: utf-8
+
+from sympy import symbols
+from sympy import sin, cos
+from sympy import I
+from sympy import lambdify
+
+import numpy as np
+
+from gelato.core import Mass, Stiffness, Advection
+from gelato.codegen import symbol_ir
+from gelato.codegen import grid_chunks
+from gelato.codegen import evaluate_separable, evaluate_pointwise
+
+# ...
+def test_ir_2d_1():
+    print('============ test_ir_2d_1 =============')
+
+    x, y = symbols('x y')
+    tx, ty = symbols('tx ty')
+
+    # ... the 1D factors are shared by the terms
+    expr = 8*Stiffness(3,tx)*Mass(2,ty) + 2*Mass(3,tx)*Stiffness(2,ty)
+    ir = symbol_ir(expr, 2)
+
+    assert(ir.is_separable)
+    assert(ir.is_x_independent)
+    assert(ir.kind == 'real')
+    assert(len(ir.terms) == 2)
+    assert([len(fs) for fs in ir.factors] == [2, 2])
+    assert(ir.functions == [])
+    # ...
+
+    # ... the 1D factors are evaluated by the Clenshaw recurrence, although
+    #     the integers of the symbol (such as in cos(2*tx)) became floats
+    names = [str(f) for fs in ir.factors for f in fs]
+    assert(all(name.startswith('trig_clenshaw(') for name in names))
+
+    ir = symbol_ir(expr, 2, clenshaw=False)
+    names = [str(f) for fs in ir.factors for f in fs]
+    assert(not any('trig_clenshaw' in name for name in names))
+    # ...
+
+    # ... variable coefficients coupling the position variables
+    expr = (sin(x*y)*Stiffness(3,tx)*Mass(2,ty) + (1 + x**2)*Mass(3,tx)*Stiffness(2,ty)
+            + I*sin(x*y)*Advection(3,tx)*Mass(2,ty))
+    ir = symbol_ir(expr, 2)
+
+    assert(ir.is_separable)
+    assert(ir.positions == ['x', 'y'])
+    assert(ir.kind == 'complex')
+    assert(len(ir.terms) == 3)
+    assert(len(ir.functions) == 1)
+    assert(sorted(str(term.function) for term in ir.terms) == ['0', '0', 'None'])
+    # ...
+
+    # ... coupled Fourier variables
+    ir = symbol_ir(cos(tx + ty)*Mass(3,tx), 2)
+    assert(not ir.is_separable)
+
+    ir = symbol_ir(expr, 2, factorize=False)
+    assert(not ir.is_separable)
+    # ...
+
+    # ... the subexpressions of one axis are hoisted as 1D factors
+    expr = (Stiffness(3,tx)*Mass(2,ty) + Mass(3,tx)*Stiffness(2,ty)
+            + Mass(3,tx)*Mass(2,ty))
+    ir = symbol_ir(expr, 2, factorize=False)
+    assert([len(fs) for fs in ir.factors] == [2, 2])
+    assert(ir.expr.free_symbols <= set(symbols('f1_0 f1_1 f2_0 f2_1 w_0')))
+
+    ir = symbol_ir(expr, 2, factorize=False, cse=False)
+    assert([len(fs) for fs in ir.factors] == [0, 0])
+    assert(ir.temporaries == [])
+    # ...
+# ...
+
+# ...
+def test_ir_4d_1():
+    print('============ test_ir_4d_1 =============')
+
+    # ... space-time symbol, the position variables are x1, ..., x4
+    xs = symbols('x1 x2 x3 x4')
+    ts = symbols('tx1 tx2 tx3 tx4')
+
+    expr = ((1 + xs[0]**2)*Stiffness(2,ts[0])*Mass(2,ts[1])*Mass(2,ts[2])*Mass(2,ts[3])
+            + sin(xs[1]*xs[3])*Mass(2,ts[0])*Mass(2,ts[1])*Stiffness(2,ts[2])*Mass(2,ts[3])
+            + I*Mass(2,ts[0])*Mass(2,ts[1])*Mass(2,ts[2])*Advection(2,ts[3]))
+    ir = symbol_ir(expr, 4, clenshaw=False, cse=False)
+
+    assert(ir.is_separable)
+    assert(ir.positions == ['x1', 'x2', 'x4'])
+    assert(len(ir.terms) == 3)
+    assert(len(ir.functions) == 1)
+    # ...
+
+    # ... the chunks cover the grid once
+    shape = (3, 4, 5, 6)
+    count = np.zeros(shape, dtype=int)
+    for chunk in grid_chunks(shape, chunk_size=7):
+        assert(count[chunk].size <= 7)
+        count[chunk] += 1
+    assert((count == 1).all())
+
+    # an empty grid has no chunk, whatever its empty axis
+    for empty in [(0, 4, 5), (3, 0, 4), (3, 4, 0)]:
+        assert(list(grid_chunks(empty, chunk_size=7)) == [])
+    # ...
+
+    # ... evaluation of the separable terms, by chunks
+    arr_x = [np.linspace(0., 1., n) for n in shape]
+    arr_t = [np.linspace(-np.pi, np.pi, n) for n in shape]
+
+    factors = []
+    for axis, fs in enumerate(ir.factors):
+        args = [xs[axis], ts[axis]]
+        factors.append([lambdify(args, f, 'numpy')(arr_x[axis], arr_t[axis])
+                         + np.zeros(shape[axis]) for f in fs])
+
+    coeffs    = [complex(term.coeff) for term in ir.terms]
+    functions = [None if term.function is None else
+                 lambdify(xs, ir.functions[term.function], 'numpy')
+                 for term in ir.terms]
+    terms     = [tuple(None if j is None else factors[axis][j]
+                       for axis, j in enumerate(term.factors))
+                 for term in ir.terms]
+
+    f = lambdify(xs + ts, expr, 'numpy')
+    expected = f(*np.meshgrid(*arr_x, indexing='ij'),
+                 *np.meshgrid(*arr_t, indexing='ij'))
+
+    arrays = [(x, axis) for axis, x in enumerate(arr_x)]
+    arrays += [(t, axis) for axis, t in enumerate(arr_t)]
+
+    for chunk_size in [None, 7, 1]:
+        out = np.zeros(shape, dtype=complex)
+        evaluate_separable(out, coeffs, terms, functions=functions,
+                           positions=arr_x, chunk_size=chunk_size)
+        assert(np.allclose(out, expected))
+
+        out = np.zeros(shape, dtype=complex)
+        evaluate_pointwise(out, f, arrays, chunk_size=chunk_size)
+        assert(np.allclose(out, expected))
+    # ...
+
+    # ... complex values are only written in a real array if their imaginary
+    #     part vanishes
+    out = np.zeros(shape)
+    evaluate_pointwise(out, lambda x: x*(1 + 0j), arrays[:1])
+    assert(np.allclose(out, arr_x[0][:,None,None,None]))
+
+    try:
+        evaluate_pointwise(out, f, arrays)
+        assert(False)
+    except TypeError:
+        pass
+    # ...
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_ir_2d_1()
+    test_ir_4d_1()
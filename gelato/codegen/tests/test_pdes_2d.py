@@ -1,6 +1,7 @@
 # coding: utf-8
 
 from numpy import linspace, zeros, pi
+from numpy import allclose, float64
 
 from sympy import Symbol
 from sympy.core.containers import Tuple
@@ -18,6 +19,7 @@ from symfe.core import BilinearForm
 
 from gelato.codegen import compile_symbol
 from gelato.codegen import discretize_symbol
+from gelato.codegen import DiscreteSymbol
 
 from spl.fem.splines import SplineSpace
 from spl.fem.tensor  import TensorFemSpace
@@ -129,7 +131,70 @@ def test_pdes_2d_2():
     # ...
 # ...
 
+# ...
+def test_pdes_2d_3():
+    print('============ test_pdes_2d_3 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + v*u)
+    # ...
+
+    # ... discretization
+    p1  = 2 ; p2 = 2
+    ne1 = 8 ; ne2 = 4
+
+    grid_1 = linspace( 0., 1., num=ne1+1 )
+    grid_2 = linspace( 0., 1., num=ne2+1 )
+
+    V1 = SplineSpace( p1, grid=grid_1 ); V1.init_fem()
+    V2 = SplineSpace( p2, grid=grid_2 ); V2.init_fem()
+
+    V = TensorFemSpace( V1, V2 )
+    # ...
+
+    # ...
+    discretize_symbol( a, [V,V] )
+
+    assert(isinstance(a.symbol, DiscreteSymbol))
+    assert(a.symbol.shape == (ne1+p1, ne2+p2))
+    assert(a.symbol.dtype == float64)
+    # ...
+
+    # ...
+    n1 = 21 ; n2 = 11
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+
+    e = a.symbol(*xs, *ts)
+
+    # the samples are written in the given buffer
+    out = zeros((n1, n2))
+    r = a.symbol(*xs, *ts, out=out)
+    assert(r is out)
+    assert(allclose(out, e))
+
+    # or in the workspace output buffer, which is reused, as the arrays of
+    # the 1D factors of the kernel
+    w1 = a.symbol(*xs, *ts, reuse=True)
+    workspace = a.symbol.workspace((n1, n2))
+    buffers = dict(workspace)
+    w2 = a.symbol(*xs, *ts, reuse=True)
+    assert(w1 is w2)
+    assert(w2 is workspace['out'])
+    assert(len(buffers) > 1)
+    assert(all(workspace[k] is v for k, v in buffers.items()))
+    assert(allclose(w2, e))
+    # ...
+# ...
+
 # .....................................................
 if __name__ == '__main__':
     test_pdes_2d_1()
     test_pdes_2d_2()
+    test_pdes_2d_3()
@@ -1,11 +1,17 @@
 # coding: utf-8
 
 from numpy import linspace, zeros, pi
+from numpy import allclose, array_equal
+from numpy import meshgrid
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 from sympy import Symbol
 from sympy.core.containers import Tuple
 from sympy import symbols
 from sympy import srepr
+from sympy import sin
+from sympy import lambdify
 
 from symfe.core import dx, dy, dz
 from symfe.core import Constant
@@ -16,7 +22,14 @@ from symfe.core import TestFunction
 from symfe.core import VectorTestFunction
 from symfe.core import BilinearForm
 
+from gelato.core import gelatize
 from gelato.codegen import compile_symbol
+from gelato.codegen import kernel_key
+from gelato.codegen import kernel_cache_info
+from gelato.codegen import clear_kernel_cache
+from gelato.codegen import configure_kernel_cache
+from gelato.codegen import KernelRegistry
+from gelato.codegen import evaluate_symbol
 
 # ...
 def test_symbol_2d_1():
@@ -105,7 +118,484 @@ def test_symbol_2d_2():
 
 # ...
 
+# ...
+def test_symbol_2d_3():
+    print('============ test_symbol_2d_3 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [2,3]
+    n_elements = [8,16]
+
+    symbol_py = compile_symbol('symbol_2d_3_py', a, degrees,
+                               n_elements=n_elements, backend='python')
+    symbol_np = compile_symbol('symbol_2d_3_np', a, degrees,
+                               n_elements=n_elements, backend='numpy')
+    # ...
+
+    # ...
+    n1 = 41 ; n2 = 31
+
+    t1 = linspace(-pi, pi, n1)
+    t2 = linspace(-pi, pi, n2)
+    x1 = linspace(0.,1., n1)
+    x2 = linspace(0.,1., n2)
+
+    xs = [x1, x2]
+    ts = [t1, t2]
+
+    e_py = zeros((n1, n2))
+    e_np = zeros((n1, n2))
+    symbol_py(*xs, *ts, e_py)
+    symbol_np(*xs, *ts, e_np)
+    assert(allclose(e_py, e_np))
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_4():
+    print('============ test_symbol_2d_4 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v)
+    # ...
+
+    # ...
+    degrees = [2,2]
+    n_elements = [8,8]
+
+    symbols = [compile_symbol('symbol_2d_4_{}'.format(backend), a, degrees,
+                              n_elements=n_elements, backend=backend)
+               for backend in ['python', 'numpy']]
+    assert(symbols[0].kind == 'complex')
+    assert(symbols[0].dtype.kind == 'c')
+    # ...
+
+    # ...
+    n1 = 21 ; n2 = 21
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+
+    es = []
+    for symbol in symbols:
+        e = zeros((n1, n2), dtype=symbol.dtype)
+        symbol(*xs, *ts, e)
+        es.append(e)
+
+    assert(allclose(es[0], es[1]))
+    assert(abs(es[0].imag).max() > 0.)
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_5():
+    print('============ test_symbol_2d_5 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [2,2]
+    n_elements = [8,8]
+
+    key = kernel_key(a, degrees, n_elements=n_elements)
+    assert(key == kernel_key(a, degrees, n_elements=n_elements))
+    assert(not( key == kernel_key(a, degrees, n_elements=[8,16]) ))
+    assert(not( key == kernel_key(a, degrees, n_elements=n_elements,
+                                  backend='numpy') ))
+    # ...
+
+    # ... the second compilation is an in-memory hit, then the entry is
+    #     read from the disk after clearing the memory tier
+    folder = tempfile.mkdtemp()
+    configure_kernel_cache(cache_dir=folder)
+    clear_kernel_cache()
+
+    n1 = 11 ; n2 = 11
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+
+    es = []
+    for i in range(0, 3):
+        if i == 2:
+            clear_kernel_cache()
+
+        # a new registry, so that the kernels cache is used every time
+        symbol = compile_symbol('symbol_2d_5', a, degrees,
+                                n_elements=n_elements,
+                                export_pyfile=False,
+                                registry=KernelRegistry())
+
+        e = zeros((n1, n2))
+        symbol(*xs, *ts, e)
+        es.append(e)
+
+    info = kernel_cache_info()
+    assert(info.misses == 0)
+    assert(info.disk_hits == 1)
+
+    assert(allclose(es[0], es[1]))
+    assert(allclose(es[0], es[2]))
+
+    configure_kernel_cache(disk=False)
+    clear_kernel_cache()
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_6():
+    print('============ test_symbol_2d_6 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)))
+    # ...
+
+    # ... concurrent requests of the same kernel compile it once
+    degrees = [3,3]
+    n_elements = [8,8]
+
+    registry = KernelRegistry()
+    def _compile(i):
+        return compile_symbol('symbol_2d_6', a, degrees,
+                              n_elements=n_elements,
+                              export_pyfile=False,
+                              cache=True,
+                              registry=registry)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        symbols = list(executor.map(_compile, range(0, 8)))
+
+    assert(all(symbol is symbols[0] for symbol in symbols))
+
+    info = registry.info()
+    assert(info.compiled == 1)
+    assert(info.hits == 7)
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_7():
+    print('============ test_symbol_2d_7 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [2,2]
+    n_elements = [8,8]
+
+    n1 = 37 ; n2 = 21
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+    # ...
+
+    # ... the slab evaluation gives the same result as the sequential one
+    for backend in ['python', 'numpy']:
+        symbol = compile_symbol('symbol_2d_7_{}'.format(backend), a, degrees,
+                                n_elements=n_elements, backend=backend,
+                                export_pyfile=False)
+
+        e = zeros((n1, n2))
+        evaluate_symbol(symbol, 2, xs + ts, e)
+
+        for n_threads in [2, 3, 8]:
+            f = zeros((n1, n2))
+            evaluate_symbol(symbol, 2, xs + ts, f, n_threads=n_threads)
+            assert(array_equal(e, f))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            f = zeros((n1, n2))
+            evaluate_symbol(symbol, 2, xs + ts, f, executor=executor, n_slabs=5)
+            assert(array_equal(e, f))
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_8():
+    print('============ test_symbol_2d_8 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v)
+    # ...
+
+    # ...
+    degrees = [5,4]
+    n_elements = [8,8]
+
+    n1 = 21 ; n2 = 17
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+    # ...
+
+    # ... the Clenshaw evaluation agrees with the direct one
+    for backend in ['python', 'numpy']:
+        for factorize in [True, False]:
+            es = []
+            for clenshaw in [True, False]:
+                symbol = compile_symbol('symbol_2d_8', a, degrees,
+                                        n_elements=n_elements,
+                                        backend=backend,
+                                        factorize=factorize,
+                                        clenshaw=clenshaw,
+                                        export_pyfile=False)
+
+                e = zeros((n1, n2), dtype=symbol.dtype)
+                symbol(*xs, *ts, e)
+                es.append(e)
+
+            assert(allclose(es[0], es[1]))
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_9():
+    print('============ test_symbol_2d_9 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v)
+    # ...
+
+    # ...
+    degrees = [3,3]
+
+    n1 = 21 ; n2 = 17
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+    # ...
+
+    # ... the C backend agrees with the python one
+    for n_elements in [[8,4], None]:
+        args = [] if n_elements else [8, 4]
+        for factorize in [True, False]:
+            es = []
+            for backend in ['python', 'c']:
+                symbol = compile_symbol('symbol_2d_9', a, degrees,
+                                        n_elements=n_elements,
+                                        backend=backend,
+                                        factorize=factorize,
+                                        export_pyfile=False)
+
+                e = zeros((n1, n2), dtype=symbol.dtype)
+                symbol(*xs, *ts, e, *args)
+                es.append(e)
+
+            assert(allclose(es[0], es[1]))
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_10():
+    print('============ test_symbol_2d_10 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v)
+    # ...
+
+    # ...
+    n_elements = [8,4]
+
+    n1 = 21 ; n2 = 17
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2)]
+    # ...
+
+    # ... one kernel, with the degrees as arguments, serves every degree
+    for backend in ['python', 'numpy']:
+        symbol = compile_symbol('symbol_2d_10', a, None,
+                                n_elements=n_elements,
+                                backend=backend,
+                                export_pyfile=False)
+
+        for p in range(1, 6):
+            degrees = [p, p+1]
+            expected = compile_symbol('symbol_2d_10_{}'.format(p), a, degrees,
+                                      n_elements=n_elements,
+                                      backend=backend,
+                                      export_pyfile=False)
+
+            e = zeros((n1, n2), dtype=symbol.dtype)
+            symbol(*xs, *ts, e, *degrees)
+
+            f = zeros((n1, n2), dtype=expected.dtype)
+            expected(*xs, *ts, f)
+
+            assert(allclose(e, f))
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_11():
+    print('============ test_symbol_2d_11 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v)
+    # ...
+
+    # ...
+    degrees = [2, 3]
+    n_elements = [8, 4]
+
+    n1 = 5 ; n2 = 7
+    m1 = 21 ; m2 = 17
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, m1), linspace(-pi, pi, m2)]
+    # ...
+
+    # ... the symbol does not depend on x: it is computed once on the Fourier
+    #     grid, and broadcast along the position axes
+    expected = compile_symbol('symbol_2d_11_diagonal', a, degrees,
+                              n_elements=n_elements,
+                              backend='numpy',
+                              export_pyfile=False)
+
+    f = zeros((m1, m2), dtype=expected.dtype)
+    expected(*ts, *ts, f)
+
+    for backend in ['python', 'numpy']:
+        symbol = compile_symbol('symbol_2d_11', a, degrees,
+                                n_elements=n_elements,
+                                backend=backend,
+                                export_pyfile=False,
+                                sampling='product')
+
+        e = symbol(*xs, *ts, None)
+        assert(e.shape == (n1, n2, m1, m2))
+        assert(e.strides[:2] == (0, 0))
+        assert(allclose(e, f[None,None,:,:]))
+
+        e = zeros((n1, n2, m1, m2), dtype=symbol.dtype)
+        symbol(*xs, *ts, e, chunk_size=100)
+        assert(allclose(e, f[None,None,:,:]))
+    # ...
+# ...
+
+# ...
+def test_symbol_2d_12():
+    print('============ test_symbol_2d_12 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=2)
+    x, y = V.coordinates
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), (1 + x**2)*dx(u)*dx(v) + sin(x*y)*dy(u)*dy(v))
+    # ...
+
+    # ...
+    degrees = [2, 3]
+    n_elements = [8, 4]
+
+    n1 = 5 ; n2 = 3
+    m1 = 9 ; m2 = 7
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2)]
+    ts = [linspace(-pi, pi, m1), linspace(-pi, pi, m2)]
+    # ...
+
+    # ... the symbol depends on x: it is compared to its values on the whole
+    #     product grid
+    tx, ty = symbols('tx ty')
+    expr = gelatize(a, degrees=degrees, n_elements=n_elements)
+    f = lambdify((x, y, tx, ty), expr, 'numpy')
+    expected = f(*meshgrid(*xs, *ts, indexing='ij'))
+
+    for backend in ['python', 'numpy']:
+        symbol = compile_symbol('symbol_2d_12', a, degrees,
+                                n_elements=n_elements,
+                                backend=backend,
+                                export_pyfile=False,
+                                sampling='product')
+
+        e = symbol(*xs, *ts, None)
+        assert(e.shape == (n1, n2, m1, m2))
+        assert(allclose(e, expected))
+
+        e = zeros((n1, n2, m1, m2), dtype=symbol.dtype)
+        symbol(*xs, *ts, e, chunk_size=20)
+        assert(allclose(e, expected))
+
+        # ... the slabs only split the position axis
+        for n_threads in [None, 2, 3]:
+            e = evaluate_symbol(symbol, 2, xs + ts, None, n_threads=n_threads)
+            assert(allclose(e, expected))
+
+            e = zeros((n1, n2, m1, m2), dtype=symbol.dtype)
+            evaluate_symbol(symbol, 2, xs + ts, e, n_threads=n_threads)
+            assert(allclose(e, expected))
+        # ...
+    # ...
+# ...
+
 # .....................................................
 if __name__ == '__main__':
     test_symbol_2d_1()
     test_symbol_2d_2()
+    test_symbol_2d_3()
+    test_symbol_2d_4()
+    test_symbol_2d_5()
+    test_symbol_2d_6()
+    test_symbol_2d_7()
+    test_symbol_2d_8()
+    test_symbol_2d_9()
+    test_symbol_2d_10()
+    test_symbol_2d_11()
+    test_symbol_2d_12()
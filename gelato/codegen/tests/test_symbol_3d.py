@@ -1,11 +1,13 @@
 # coding: utf-8
 
 from numpy import linspace, zeros, pi
+from numpy import allclose
 
 from sympy import Symbol
 from sympy.core.containers import Tuple
 from sympy import symbols
 from sympy import srepr
+from sympy import sin
 
 from symfe.core import dx, dy, dz
 from symfe.core import Constant
@@ -109,7 +111,227 @@ def test_symbol_3d_2():
 
 # ...
 
+# ...
+def test_symbol_3d_3():
+    print('============ test_symbol_3d_3 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=3)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [1,2,3]
+
+    symbol_py = compile_symbol('symbol_3d_3_py', a, degrees, backend='python')
+    symbol_np = compile_symbol('symbol_3d_3_np', a, degrees, backend='numpy')
+    # ...
+
+    # ...
+    n1 = 11 ; n2 = 13 ; n3 = 15
+
+    t1 = linspace(-pi, pi, n1)
+    t2 = linspace(-pi, pi, n2)
+    t3 = linspace(-pi, pi, n3)
+    x1 = linspace(0.,1., n1)
+    x2 = linspace(0.,1., n2)
+    x3 = linspace(0.,1., n3)
+
+    xs = [x1, x2, x3]
+    ts = [t1, t2, t3]
+
+    n_elements = [4, 8, 16]
+
+    e_py = zeros((n1, n2, n3))
+    e_np = zeros((n1, n2, n3))
+    symbol_py(*xs, *ts, e_py, *n_elements)
+    symbol_np(*xs, *ts, e_np, *n_elements)
+    assert(allclose(e_py, e_np))
+    # ...
+# ...
+
+# ...
+def test_symbol_3d_4():
+    print('============ test_symbol_3d_4 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=3)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [2,2,3]
+    n_elements = [8,8,16]
+
+    n1 = 11 ; n2 = 13 ; n3 = 15
+
+    t1 = linspace(-pi, pi, n1)
+    t2 = linspace(-pi, pi, n2)
+    t3 = linspace(-pi, pi, n3)
+    x1 = linspace(0.,1., n1)
+    x2 = linspace(0.,1., n2)
+    x3 = linspace(0.,1., n3)
+
+    xs = [x1, x2, x3]
+    ts = [t1, t2, t3]
+    # ...
+
+    # ... the factorized kernels must give the same values as the point-wise
+    #     evaluation
+    symbol = compile_symbol('symbol_3d_4', a, degrees,
+                            n_elements=n_elements, factorize=False)
+    e_ref = zeros((n1, n2, n3))
+    symbol(*xs, *ts, e_ref)
+
+    for backend in ['python', 'numpy']:
+        symbol = compile_symbol('symbol_3d_4_{}'.format(backend), a, degrees,
+                                n_elements=n_elements, backend=backend,
+                                factorize=True)
+        e = zeros((n1, n2, n3))
+        symbol(*xs, *ts, e)
+        assert(allclose(e, e_ref))
+    # ...
+# ...
+
+# ...
+def test_symbol_3d_5():
+    print('============ test_symbol_3d_5 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=3)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [3,3,2]
+    n_elements = [8,8,4]
+
+    n1 = 11 ; n2 = 9 ; n3 = 7
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2), linspace(0.,1., n3)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2), linspace(-pi, pi, n3)]
+    # ...
+
+    # ... the hoisted and common subexpressions do not change the samples
+    for backend in ['python', 'numpy']:
+        es = []
+        for cse in [True, False]:
+            symbol = compile_symbol('symbol_3d_5', a, degrees,
+                                    n_elements=n_elements,
+                                    backend=backend,
+                                    factorize=False,
+                                    cse=cse,
+                                    export_pyfile=False)
+
+            e = zeros((n1, n2, n3))
+            symbol(*xs, *ts, e)
+            es.append(e)
+
+        assert(allclose(es[0], es[1]))
+    # ...
+# ...
+
+# ...
+def test_symbol_3d_6():
+    print('============ test_symbol_3d_6 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=3)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), dot(grad(v), grad(u)) + u*v)
+    # ...
+
+    # ...
+    degrees = [3,3,2]
+    n_elements = [8,8,4]
+
+    n1 = 11 ; n2 = 9 ; n3 = 7
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2), linspace(0.,1., n3)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2), linspace(-pi, pi, n3)]
+    # ...
+
+    # ... the C backend agrees with the python one
+    for factorize in [True, False]:
+        es = []
+        for backend in ['python', 'c']:
+            symbol = compile_symbol('symbol_3d_6', a, degrees,
+                                    n_elements=n_elements,
+                                    backend=backend,
+                                    factorize=factorize,
+                                    export_pyfile=False)
+
+            e = zeros((n1, n2, n3))
+            symbol(*xs, *ts, e)
+            es.append(e)
+
+        assert(allclose(es[0], es[1]))
+    # ...
+# ...
+
+# ...
+def test_symbol_3d_7():
+    print('============ test_symbol_3d_7 =============')
+
+    # ... abstract model
+    V = H1Space('V', ldim=3)
+    x, y, z = V.coordinates
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    a = BilinearForm((v,u), (1 + x*z)*dot(grad(v), grad(u)) + sin(y)*dx(u)*v)
+    # ...
+
+    # ...
+    degrees = [4,5,4]
+    n_elements = [8,4,6]
+
+    n1 = 7 ; n2 = 5 ; n3 = 6
+
+    xs = [linspace(0.,1., n1), linspace(0.,1., n2), linspace(0.,1., n3)]
+    ts = [linspace(-pi, pi, n1), linspace(-pi, pi, n2), linspace(-pi, pi, n3)]
+    # ...
+
+    # ... a complex symbol with variable coefficients, for which the C backend
+    #     accumulates the terms one by one
+    es = []
+    for backend in ['python', 'c']:
+        symbol = compile_symbol('symbol_3d_7', a, degrees,
+                                n_elements=n_elements,
+                                backend=backend,
+                                export_pyfile=False)
+        assert(symbol.kind == 'complex')
+
+        e = zeros((n1, n2, n3), dtype=symbol.dtype)
+        symbol(*xs, *ts, e)
+        es.append(e)
+
+    assert(allclose(es[0], es[1]))
+    # ...
+# ...
+
 # .....................................................
 if __name__ == '__main__':
     test_symbol_3d_1()
     test_symbol_3d_2()
+    test_symbol_3d_3()
+    test_symbol_3d_4()
+    test_symbol_3d_5()
+    test_symbol_3d_6()
+    test_symbol_3d_7()
@@ -1,5 +1,17 @@
 # -*- coding: utf-8 -*-
 
+import numpy as np
+
+from sympy import Symbol
+from sympy import I as sympy_I
+
+from gelato.core import trig_coefficients
+from gelato.core import BasicGlt
+from gelato.core import DerivativeSymbol
+from gelato.core import symbol_kind
+from gelato.core import coordinate_names, coordinate_axis
+
+
 def _matrix_name(i,j):
     return 'M_{i}{j}'.format(i=i,j=j)
 
@@ -31,6 +43,510 @@ def print_fourier_args(t_args):
 def print_mat_args():
     return ', mat'
 
+def _is_fourier_name(name):
+    return name.startswith('t') and not( coordinate_axis(name[1:]) is None )
+
+def _print_number(v):
+    if np.iscomplexobj(v):
+        return repr(complex(v))
+    return repr(float(v))
+
+def print_clenshaw(a, b, t):
+    """
+    Prints the call to trig_clenshaw that evaluates the trigonometric
+    polynomial of cosine coefficients a and sine coefficients b in t.
+    """
+    def _print_coeffs(c):
+        if all(v == 0 for v in c):
+            return 'None'
+        return '({},)'.format(', '.join(_print_number(v) for v in c))
+
+    return 'trig_clenshaw({a}, {b}, {t})'.format(a=_print_coeffs(a),
+                                                 b=_print_coeffs(b), t=t)
+
+def clenshaw_expr(expr, min_degree=2):
+    """
+    Replaces every trigonometric polynomial of degree at least min_degree in
+    one Fourier variable (tx, ty, ...), with numerical coefficients, by a
+    symbol printed as a call to trig_clenshaw. The polynomial is then evaluated
+    by the Clenshaw recurrence, with one cosine and one sine per point,
+    instead of one cosine (or sine) per mode.
+    """
+    if expr.is_Atom:
+        return expr
+
+    if expr.is_Add:
+        names = set(s.name for s in expr.free_symbols)
+        if len(names) == 1 and _is_fourier_name(names.pop()):
+            t = list(expr.free_symbols)[0]
+            try:
+                a, b = trig_coefficients(expr, t)
+            except ValueError:
+                a = None
+
+            if not( a is None ) and len(a) - 1 >= min_degree:
+                return Symbol(print_clenshaw(a, b, t.name))
+
+    args = [clenshaw_expr(i, min_degree=min_degree) for i in expr.args]
+    return expr.func(*args)
+
+def print_glt_symbol(symbol):
+    """Prints the call to glt_symbol that evaluates a 1D GLT symbol whose
+    degree is only known at runtime. A DerivativeSymbol is given by the
+    orders of its derivatives."""
+    if isinstance(symbol, DerivativeSymbol) and symbol._orders is None:
+        name = '({}, {})'.format(*symbol.orders)
+    else:
+        name = "'{}'".format(symbol.name)
+
+    p = symbol.args[0]
+    t = symbol.args[-1]
+    return 'glt_symbol({name}, {p}, {t})'.format(name=name, p=p, t=t)
+
+def print_expr(expr):
+    """Prints a sympy expression, the imaginary unit being printed as the
+    python literal 1j, and the unevaluated 1D GLT symbols as calls to
+    glt_symbol."""
+    d = {sympy_I: Symbol('1j')}
+    for i in expr.atoms(BasicGlt):
+        d[i] = Symbol(print_glt_symbol(i))
+    return str(expr.xreplace(d))
+
+def _axis_factor_name(axis, j):
+    return 'f{axis}_{j}'.format(axis=axis+1, j=j)
+
+def _function_name(j):
+    return 'g_{j}'.format(j=j)
+
+def _axis_factor_access(axis, j, dim, backend):
+    """Prints the value of a 1D factor at the current point: an element in the
+    loops of the python backend, a broadcast view for the numpy backend."""
+    name = _axis_factor_name(axis, j)
+    if backend == 'numpy':
+        if dim > 1:
+            slices = ['None']*dim
+            slices[axis] = ':'
+            name = '{name}[{slices}]'.format(name=name, slices=','.join(slices))
+
+    else:
+        name = '{name}[i{axis}]'.format(name=name, axis=axis+1)
+
+    return name
+
+def _has_complex_clenshaw(expr):
+    # the calls to trig_clenshaw are symbols, see clenshaw_expr, and complex
+    # coefficients are printed with a j
+    return any(s.name.startswith('trig_clenshaw(') and 'j' in s.name
+               for s in expr.free_symbols)
+
+def _print_dtype(expr):
+    """Prints the dtype of the array holding the values of expr: the arrays
+    are complex unless expr is real and computed from real values."""
+    if symbol_kind(expr) == 'real' and not _has_complex_clenshaw(expr) and \
+       not any(i.is_imaginary_symbol for i in expr.atoms(DerivativeSymbol)):
+        return 'float'
+    return 'complex'
+
+def _print_workspace_array(name, shape, dtype):
+    """Prints the allocation of the array name of a kernel, taken from its
+    workspace, see workspace_array."""
+    return "{name} = workspace_array(workspace, '{name}', {shape}, {dtype})".format(
+        name=name, shape=shape, dtype=dtype)
+
+def print_axis_factors(factors, backend, tab, temporaries=None):
+    """
+    Prints the code that evaluates the 1D factors of every axis, on the 1D
+    position and Fourier arrays of this axis. The temporaries of every axis
+    are computed before its factors, whose arrays are taken from the
+    workspace of the kernel.
+    """
+    if temporaries is None:
+        temporaries = [[] for fs in factors]
+
+    xs = coordinate_names(len(factors))
+
+    lines = []
+    for axis, fs in enumerate(factors):
+        if not fs:
+            continue
+
+        ws = temporaries[axis]
+
+        n  = 'n{}'.format(axis+1)
+        i  = 'i{}'.format(axis+1)
+        x  = xs[axis]
+        t  = 't{}'.format(x)
+        ax = 'arr_x{}'.format(axis+1)
+        at = 'arr_t{}'.format(axis+1)
+
+        if backend == 'numpy':
+            lines += ['{x} = {ax}'.format(x=x, ax=ax),
+                      '{t} = {at}'.format(t=t, at=at)]
+            lines += ['{w} = {e}'.format(w=w, e=print_expr(e)) for w, e in ws]
+            for j, f in enumerate(fs):
+                name = _axis_factor_name(axis, j)
+                lines += [_print_workspace_array(name, '({},)'.format(n),
+                                                 _print_dtype(f)),
+                          '{name}[...] = {f}'.format(name=name, f=print_expr(f))]
+
+        else:
+            for j, f in enumerate(fs):
+                name = _axis_factor_name(axis, j)
+                lines += [_print_workspace_array(name, '({},)'.format(n),
+                                                 _print_dtype(f))]
+
+            lines += ['for {i} in range(0, {n}):'.format(i=i, n=n),
+                      '    {x} = {ax}[{i}]'.format(x=x, ax=ax, i=i),
+                      '    {t} = {at}[{i}]'.format(t=t, at=at, i=i)]
+            lines += ['    {w} = {e}'.format(w=w, e=print_expr(e)) for w, e in ws]
+            for j, f in enumerate(fs):
+                name = _axis_factor_name(axis, j)
+                lines += ['    {name}[{i}] = {f}'.format(name=name, i=i,
+                                                         f=print_expr(f))]
+
+    return '\n'.join(tab + line for line in lines)
+
+def print_functions(functions, dim, backend, tab):
+    """
+    Prints the code that evaluates the functions coupling several position
+    variables, on the tensor grid of the position arrays, in arrays taken
+    from the workspace of the kernel.
+    """
+    if not functions:
+        return ''
+
+    xs = coordinate_names(dim)
+    ns = ['n{}'.format(axis+1) for axis in range(0, dim)]
+    shape = '({})'.format(', '.join(ns))
+
+    lines = []
+    if backend == 'numpy':
+        for axis in range(0, dim):
+            index = ['None']*dim
+            index[axis] = ':'
+            lines += ['{x} = arr_x{axis}[{index}]'.format(x=xs[axis],
+                                                         axis=axis+1,
+                                                         index=','.join(index))]
+
+        for j, g in enumerate(functions):
+            name = _function_name(j)
+            lines += [_print_workspace_array(name, shape, _print_dtype(g)),
+                      '{name}[...] = {g}'.format(name=name, g=print_expr(g))]
+
+    else:
+        for j, g in enumerate(functions):
+            lines += [_print_workspace_array(_function_name(j), shape,
+                                             _print_dtype(g))]
+
+        indent = ''
+        for axis in range(0, dim):
+            i = 'i{}'.format(axis+1)
+            lines += [indent + 'for {i} in range(0, {n}):'.format(i=i, n=ns[axis])]
+            indent += ' '*4
+
+        for axis in range(0, dim):
+            lines += [indent + '{x} = arr_x{axis}[i{axis}]'.format(x=xs[axis],
+                                                                  axis=axis+1)]
+
+        index = ', '.join('i{}'.format(axis+1) for axis in range(0, dim))
+        for j, g in enumerate(functions):
+            lines += [indent + '{name}[{index}] = {g}'.format(name=_function_name(j),
+                                                             index=index,
+                                                             g=print_expr(g))]
+
+    return '\n'.join(tab + line for line in lines)
+
+def _axis_factors_accesses(ir, backend):
+    d = {}
+    for axis, fs in enumerate(ir.factors):
+        for j in range(0, len(fs)):
+            name = _axis_factor_name(axis, j)
+            access = _axis_factor_access(axis, j, ir.dim, backend)
+            d[Symbol(name)] = Symbol(access)
+    return d
+
+def print_temporaries(ir, backend, tab):
+    """
+    Prints the computation of the temporaries of a non separable symbol IR,
+    for the current point (or the whole grid for the numpy backend).
+    """
+    accesses = _axis_factors_accesses(ir, backend)
+
+    lines = []
+    for w, e in ir.temporaries:
+        e = print_expr(e.xreplace(accesses))
+        lines += ['{w} = {e}'.format(w=w, e=e)]
+
+    return '\n'.join(tab + line for line in lines)
+
+def print_symbol_expr(ir, backend):
+    """
+    Prints the expression of a non separable symbol IR, the hoisted 1D
+    factors being accessed at the current point.
+    """
+    accesses = _axis_factors_accesses(ir, backend)
+    return _print_real_part(ir, print_expr(ir.expr.xreplace(accesses)))
+
+def print_separable_expr(ir, backend):
+    """
+    Prints the combination of the functions and 1D factors of the separable
+    terms of a symbol IR, as a sum of (outer) products.
+    """
+    dim = ir.dim
+    index = ', '.join('i{}'.format(axis+1) for axis in range(0, dim))
+
+    args = []
+    for term in ir.terms:
+        products = []
+        if not( term.coeff == 1 ):
+            products.append('({})'.format(print_expr(term.coeff)))
+
+        if not( term.function is None ):
+            name = _function_name(term.function)
+            if not( backend == 'numpy' ):
+                name = '{name}[{index}]'.format(name=name, index=index)
+
+            products.append(name)
+
+        for axis, j in enumerate(term.factors):
+            if j is None:
+                continue
+
+            products.append(_axis_factor_access(axis, j, dim, backend))
+
+        if not products:
+            products = ['1.0']
+
+        args.append('*'.join(products))
+
+    if not args:
+        return '0.'
+
+    return _print_real_part(ir, ' + '.join(args))
+
+def print_n_points(dim, tab):
+    """Prints the sizes n1, ... of the 1D arrays of every axis."""
+    lines = ['n{i} = len(arr_x{i})'.format(i=i) for i in range(1, dim+1)]
+    return '\n'.join(tab + line for line in lines)
+
+def _pointwise_args(ir):
+    """Returns, for every axis, the names of the position and Fourier
+    variables and of the hoisted 1D factors of the axis."""
+    xs = coordinate_names(ir.dim)
+
+    args = []
+    for axis, fs in enumerate(ir.factors):
+        names = [xs[axis], 't{}'.format(xs[axis])]
+        names += [_axis_factor_name(axis, j) for j in range(0, len(fs))]
+        args.append(names)
+    return args
+
+def print_pointwise_args(ir):
+    """Prints the arguments of the function evaluating a non separable symbol
+    IR on a chunk of the grid, see evaluate_pointwise."""
+    return ', '.join(i for names in _pointwise_args(ir) for i in names)
+
+def print_pointwise_arrays(ir, spans=None):
+    """
+    Prints the list of the pairs (array, axes) passed to evaluate_pointwise,
+    in the order of print_pointwise_args. By default, the arrays of the axis i
+    span the axis i of the grid; for the product grid, the position arrays
+    span the axes i, the Fourier arrays the axes d+i, and the 1D factors the
+    axes given by spans (see product_axis_spans).
+    """
+    dim = ir.dim
+
+    arrays = []
+    for axis, names in enumerate(_pointwise_args(ir)):
+        if spans is None:
+            x_axes = t_axes = f_axes = axis
+        else:
+            x_axes = axis
+            t_axes = dim + axis
+            f_axes = spans[axis]
+
+        arrays += ['(arr_x{}, {})'.format(axis+1, x_axes),
+                   '(arr_t{}, {})'.format(axis+1, t_axes)]
+        arrays += ['({}, {})'.format(f, f_axes) for f in names[2:]]
+
+    return '[{}]'.format(', '.join(arrays))
+
+def print_pointwise_temporaries(ir, tab):
+    """Prints the computation of the temporaries of a non separable symbol IR,
+    on a chunk of the grid, the 1D factors being given as broadcast views."""
+    lines = ['{w} = {e}'.format(w=w, e=print_expr(e)) for w, e in ir.temporaries]
+    return '\n'.join(tab + line for line in lines)
+
+def product_axis_spans(ir):
+    """
+    Returns, for every axis i of a symbol IR sampled on the product of the
+    position and Fourier grids, the axes of the grid spanned by the 1D factors
+    of the axis: (i, d+i), or only d+i (resp. i) if they do not depend on the
+    position (resp. Fourier) variable of the axis.
+    """
+    dim = ir.dim
+    xs = coordinate_names(dim)
+
+    spans = []
+    for axis, fs in enumerate(ir.factors):
+        exprs = list(fs) + [e for w, e in ir.axis_temporaries[axis]]
+        names = set(i for e in exprs for i in _free_names(e))
+
+        axes = []
+        if xs[axis] in names:
+            axes.append(axis)
+        if 't{}'.format(xs[axis]) in names or not axes:
+            axes.append(dim + axis)
+
+        spans.append(axes[0] if len(axes) == 1 else tuple(axes))
+
+    return spans
+
+def _free_names(expr):
+    """Returns the names of the free symbols of expr, a call to trig_clenshaw
+    (see clenshaw_expr) being replaced by the name of its variable."""
+    names = set()
+    for s in expr.free_symbols:
+        if s.name.startswith('trig_clenshaw('):
+            names.add(s.name[:-1].rsplit(', ', 1)[-1])
+        else:
+            names.add(s.name)
+    return names
+
+def print_product_n_points(ir, tab):
+    """
+    Prints the shape of the product grid, and the sizes n1, ... of the
+    position arrays and m1, ... of the Fourier arrays. The symbol is computed
+    for one position along the axes whose position variable it does not
+    depend on.
+    """
+    dim = ir.dim
+    xs = coordinate_names(dim)
+
+    sizes  = ['len(arr_x{})'.format(i) for i in range(1, dim+1)]
+    sizes += ['len(arr_t{})'.format(i) for i in range(1, dim+1)]
+    lines = ['shape = ({},)'.format(', '.join(sizes))]
+
+    for axis, x in enumerate(xs):
+        if not x in ir.positions:
+            lines += ['arr_x{i} = arr_x{i}[:1]'.format(i=axis+1)]
+
+    lines += ['n{i} = len(arr_x{i})'.format(i=i) for i in range(1, dim+1)]
+    lines += ['m{i} = len(arr_t{i})'.format(i=i) for i in range(1, dim+1)]
+
+    return '\n'.join(tab + line for line in lines)
+
+def print_product_axis_factors(ir, spans, tab):
+    """
+    Prints the code that evaluates the 1D factors of every axis on the
+    product of the position and Fourier arrays of the axis, or only on one of
+    them, see product_axis_spans.
+    """
+    dim = ir.dim
+    xs = coordinate_names(dim)
+
+    lines = []
+    for axis, fs in enumerate(ir.factors):
+        if not fs:
+            continue
+
+        i = axis + 1
+        x = xs[axis]
+        t = 't{}'.format(x)
+
+        if isinstance(spans[axis], tuple):
+            lines += ['{x} = arr_x{i}[:,None]'.format(x=x, i=i),
+                      '{t} = arr_t{i}[None,:]'.format(t=t, i=i)]
+            shape = '(n{i}, m{i})'.format(i=i)
+
+        else:
+            lines += ['{x} = arr_x{i}'.format(x=x, i=i),
+                      '{t} = arr_t{i}'.format(t=t, i=i)]
+            if spans[axis] == axis:
+                shape = '(n{},)'.format(i)
+            else:
+                shape = '(m{},)'.format(i)
+
+        lines += ['{w} = {e}'.format(w=w, e=print_expr(e))
+                  for w, e in ir.axis_temporaries[axis]]
+        for j, f in enumerate(fs):
+            name = _axis_factor_name(axis, j)
+            lines += [_print_workspace_array(name, shape, _print_dtype(f)),
+                      '{name}[...] = {f}'.format(name=name, f=print_expr(f))]
+
+    return '\n'.join(tab + line for line in lines)
+
+def print_product_values(ir, tab):
+    """Prints the allocation of the array of the values of a symbol IR on the
+    product grid, mat being used when the symbol depends on all the position
+    variables."""
+    dim = ir.dim
+
+    sizes  = ['n{}'.format(i) for i in range(1, dim+1)]
+    sizes += ['m{}'.format(i) for i in range(1, dim+1)]
+    dtype = '' if ir.kind == 'real' else ', dtype=complex'
+    values = 'zeros(({shape},){dtype})'.format(shape=', '.join(sizes),
+                                               dtype=dtype)
+
+    if len(ir.positions) == dim:
+        line = 'values = mat if not( mat is None ) else {}'.format(values)
+    else:
+        line = 'values = {}'.format(values)
+
+    return tab + line
+
+def print_separable_terms(ir, tab):
+    """
+    Prints the lists coeffs, factors and functions describing the separable
+    terms of a symbol IR, as expected by evaluate_separable. The functions
+    coupling several position variables are printed as python functions of
+    all the position variables.
+    """
+    xs = coordinate_names(ir.dim)
+
+    lines = []
+    for j, g in enumerate(ir.functions):
+        lines += ['def {name}({xs}):'.format(name=_function_name(j),
+                                             xs=', '.join(xs)),
+                  '    return {}'.format(print_expr(g))]
+
+    coeffs    = []
+    factors   = []
+    functions = []
+    for term in ir.terms:
+        coeffs.append(print_expr(term.coeff))
+
+        names = ['None' if j is None else _axis_factor_name(axis, j)
+                 for axis, j in enumerate(term.factors)]
+        factors.append('({},)'.format(', '.join(names)))
+
+        if term.function is None:
+            functions.append('None')
+        else:
+            functions.append(_function_name(term.function))
+
+    lines += ['coeffs    = [{}]'.format(', '.join(coeffs)),
+              'factors   = [{}]'.format(', '.join(factors)),
+              'functions = [{}]'.format(', '.join(functions))]
+
+    return '\n'.join(tab + line for line in lines)
+
+def _has_imaginary_parts(ir):
+    """True if some 1D symbols of an IR are purely imaginary, such as the
+    unevaluated symbols with an odd number of derivatives."""
+    exprs  = [ir.expr] + ir.functions
+    exprs += [f for fs in ir.factors for f in fs]
+    exprs += [e for w, e in ir.temporaries]
+    exprs += [e for ws in ir.axis_temporaries for w, e in ws]
+    return any(i.is_imaginary_symbol for e in exprs
+               for i in e.atoms(DerivativeSymbol))
+
+def _print_real_part(ir, code):
+    # a real symbol may be computed from imaginary 1D symbols
+    if ir.kind == 'real' and _has_imaginary_parts(ir):
+        return '({}).real'.format(code)
+    return code
+
 _docstring_header = """
 Parameters
 ----------
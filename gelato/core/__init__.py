@@ -1,4 +1,14 @@
 # -*- coding: UTF-8 -*-
+from .bspline import *
+from .cache import *
 from .glt import *
 from .expr import *
+from .fourier import *
+from .clenshaw import *
+from .trigpoly import *
+from .asymptotic import *
+from .table import *
+from .spectrum import *
+from .toeplitz import *
+from .distributed import *
 from .utils import *
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains a numerical evaluation of the 1D GLT symbols for large
+degrees. By the Poisson summation formula, the symbol of degree p involving
+the derivatives of order r of the B-splines is the aliasing sum
+
+    f_p(t) = sum_{j in Z} (-(t + 2 pi j))^r sinc((t + 2 pi j) / (2 pi))^(2p+2)
+
+where sinc(x) = sin(pi x) / (pi x). The terms decay like |j|^(r-2p-2), hence
+only a few of them are needed for large p, and the cost per point does not
+depend on the degree."""
+
+from math import log, pi
+
+import numpy as np
+
+from sympy import S
+
+from .glt import symbol_orders
+
+
+# ...
+def aliasing_terms(p, nderiv=0, tol=1.e-14, max_terms=1024):
+    """
+    Returns the number J of terms on each side (|j| <= J) of the aliasing sum
+    of a symbol of degree p, such that the remainder is smaller than tol for
+    every t.
+
+    p: int
+        spline degree
+
+    nderiv: int
+        order of the derivatives of the B-splines (0 for the mass symbol, 2 for
+        the stiffness symbol, ...)
+
+    tol: float
+        maximum absolute error
+
+    max_terms: int
+        maximum number of terms. A ValueError is raised if more terms are
+        needed, the exact symbol should then be used.
+    """
+    # ... for |t| <= pi and |j| > J, |t + 2 pi j| >= 2 pi (|j| - 1/2) and the
+    #     remainder is bounded by
+    #       2 * 2^(2p+2) (2 pi)^(-q) (J - 1/2)^(1-q) / (q-1),   q = 2p+2-r
+    q = 2*p + 2 - nderiv
+    if q <= 1:
+        raise ValueError('> The aliasing sum does not converge for p = {p} '
+                         'and nderiv = {r}'.format(p=p, r=nderiv))
+
+    c = log(2.) + (2*p + 2) * log(2.) - q * log(2*pi) - log(q - 1)
+    for J in range(1, max_terms+1):
+        if c + (1 - q) * log(J - 0.5) <= log(tol):
+            return J
+    # ...
+
+    raise ValueError('> More than {n} terms are needed for p = {p}, use the '
+                     'exact symbol'.format(n=max_terms, p=p))
+
+def _reduce(t):
+    """Returns t modulo 2 pi, in [-pi, pi)."""
+    return np.mod(t + np.pi, 2*np.pi) - np.pi
+
+def aliasing_sum(p, nderiv, t, tol=1.e-14, max_terms=1024):
+    """
+    Evaluates the aliasing sum of the symbol of degree p, see aliasing_terms.
+
+    p: int
+        spline degree
+
+    nderiv: int
+        order of the derivatives of the B-splines
+
+    t: float, numpy.ndarray
+        the points
+    """
+    t = _reduce(np.asarray(t, dtype=float))
+
+    values = np.zeros(t.shape)
+
+    # ... the derivatives of order larger than 2p+1 vanish
+    if nderiv > 2*p + 1:
+        J = -1
+    else:
+        J = aliasing_terms(p, nderiv=nderiv, tol=tol, max_terms=max_terms)
+    # ...
+
+    # ... since sin(t/2 + pi j) = +/- sin(t/2) and the power is even, only one
+    #     sine is computed per point
+    if J >= 0:
+        values += (-t)**nderiv * np.sinc(t / (2*np.pi))**(2*p + 2)
+
+    s = np.sin(t / 2)
+    for j in range(1, J+1):
+        for w in [t + 2*np.pi*j, t - 2*np.pi*j]:
+            values += (-w)**nderiv * (2*s / w)**(2*p + 2)
+    # ...
+
+    if values.ndim == 0:
+        return float(values)
+    return values
+# ...
+
+# ...
+def _phase(symbol):
+    """Returns the factor i^(s-r) / unit of the aliasing sum of a symbol."""
+    r, s, unit = symbol_orders(symbol)
+    return [1., 1.j, -1., -1.j][(s - r) % 4] / complex(unit), r + s
+
+def _scale(values, phase):
+    if phase.imag == 0.:
+        return phase.real * values
+    return phase * values
+
+def glt_limit(symbol, t):
+    """
+    Evaluates the limit, as p -> oo, of a 1D GLT symbol: the mass symbol
+    tends to one on 2 pi Z and to zero elsewhere, and the other symbols tend to
+    zero.
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        the derivatives of a DerivativeSymbol
+
+    t: float, numpy.ndarray
+        the points
+    """
+    phase, nderiv = _phase(symbol)
+
+    t = np.asarray(t, dtype=float)
+
+    values = np.zeros(t.shape)
+    if nderiv == 0:
+        values[_reduce(t) == 0.] = 1.
+    values = _scale(values, phase)
+
+    if values.ndim == 0:
+        return values[()]
+    return values
+
+def glt_asymptotic(symbol, p, t, tol=1.e-14, max_terms=1024):
+    """
+    Evaluates a 1D GLT symbol of large degree from its aliasing sum, with an
+    absolute error smaller than tol, at a cost per point independent of the
+    degree. The symbol with derivatives of orders r and s is
+    i^(s-r) times the aliasing sum with nderiv = r+s. Contrary to the sum of
+    cosines, the small values of the symbols near t = pi are computed with a
+    small relative error. For p = oo, the limit of the symbol is returned.
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        the derivatives of a DerivativeSymbol
+
+    p: int
+        spline degree, or numpy.inf (or sympy.oo)
+
+    t: float, numpy.ndarray
+        the points
+
+    tol: float
+        maximum absolute error
+
+    max_terms: int
+        maximum number of terms of the aliasing sum, see aliasing_terms
+    """
+    if p is S.Infinity or p == np.inf:
+        return glt_limit(symbol, t)
+
+    phase, nderiv = _phase(symbol)
+    values = aliasing_sum(int(p), nderiv, t, tol=tol, max_terms=max_terms)
+    return _scale(values, phase)
+# ...
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module computes exact values of cardinal B-splines and their
+derivatives at the integers, which are the Fourier coefficients of the 1D GLT
+symbols."""
+
+from fractions import Fraction
+
+
+# ...
+def cardinal_bspline_values(degree):
+    """
+    Returns the values of the cardinal B-spline of a given degree, supported on
+    [0, degree+1], at the integers 0, 1, ..., degree+1. The values are exact
+    rational numbers.
+
+    degree: int
+        degree of the cardinal B-spline
+    """
+    if degree < 0:
+        raise ValueError('> degree must be a non negative integer')
+
+    # ... the B-spline of degree 0 is the indicator function of [0, 1)
+    values = [Fraction(1), Fraction(0)]
+    # ...
+
+    # ... recurrence formula, evaluated at the integers
+    #     M_n(k) = ( k M_{n-1}(k) + (n+1-k) M_{n-1}(k-1) ) / n
+    for n in range(1, degree+1):
+        previous = [Fraction(0)] + values + [Fraction(0)]
+        values = [( k*previous[k+1] + (n+1-k)*previous[k] ) / n
+                  for k in range(0, n+2)]
+    # ...
+
+    return values
+# ...
+
+# ...
+def cardinal_bspline_derivatives(degree, nderiv=0):
+    """
+    Returns the values of the derivative of order nderiv of the cardinal
+    B-spline of a given degree, at the integers 0, 1, ..., degree+1. The values
+    are exact rational numbers.
+
+    degree: int
+        degree of the cardinal B-spline
+
+    nderiv: int
+        order of the derivative
+    """
+    if nderiv < 0:
+        raise ValueError('> nderiv must be a non negative integer')
+
+    # ... a derivative of order larger than the degree vanishes
+    if nderiv > degree:
+        return [Fraction(0)]*(degree+2)
+    # ...
+
+    # ... the derivative of order r is the r-th backward difference of the
+    #     B-spline of degree (degree - r)
+    #     M_n^(r)(k) = sum_j (-1)^j C(r,j) M_{n-r}(k-j)
+    values = cardinal_bspline_values(degree - nderiv)
+    values = values + [Fraction(0)]*nderiv
+
+    for r in range(0, nderiv):
+        values = [values[0]] + [values[k] - values[k-1]
+                                for k in range(1, len(values))]
+    # ...
+
+    return values
+# ...
+
+# ...
+def cardinal_bspline(degree, x, nderiv=0):
+    """
+    Returns the exact value of the derivative of order nderiv of the cardinal
+    B-spline of a given degree, at the integer x.
+
+    degree: int
+        degree of the cardinal B-spline
+
+    x: int
+        an integer where the B-spline is evaluated
+
+    nderiv: int
+        order of the derivative
+    """
+    if not( 0 <= x <= degree+1 ):
+        return Fraction(0)
+
+    return cardinal_bspline_derivatives(degree, nderiv=nderiv)[x]
+# ...
+
+# ...
+def glt_coefficients(p, nderiv=0):
+    """
+    Returns the list [phi_0, ..., phi_p] where phi_i is the value of the
+    derivative of order nderiv of the cardinal B-spline of degree 2p+1 at the
+    integer p+1-i. These are the (exact) Fourier coefficients of the 1D GLT
+    symbols for splines of degree p.
+
+    p: int
+        spline degree
+
+    nderiv: int
+        total number of derivatives (test + trial)
+    """
+    if p < 0:
+        raise ValueError('> p must be a non negative integer')
+
+    values = cardinal_bspline_derivatives(2*p + 1, nderiv=nderiv)
+    return [values[p+1-i] for i in range(0, p+1)]
+# ...
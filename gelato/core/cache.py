@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains process-wide caches, with an optional on-disk tier, such
+as the cache of the Fourier coefficients of the 1D GLT symbols."""
+
+import os
+import json
+import tempfile
+import threading
+from collections import OrderedDict
+from collections import namedtuple
+from fractions import Fraction
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'disk_hits',
+                                     'maxsize', 'currsize'])
+
+# ...
+def default_cache_dir():
+    """
+    Returns the default directory of the on-disk cache. It is given by the
+    environment variable GELATO_CACHE_DIR if set, and ~/.cache/gelato otherwise.
+    """
+    path = os.environ.get('GELATO_CACHE_DIR', None)
+    if path is None:
+        path = os.path.join(os.path.expanduser('~'), '.cache', 'gelato')
+    return path
+# ...
+
+# ...
+def atomic_write(filename, txt):
+    """
+    Writes txt to a file, through a temporary file that is then renamed, so
+    that concurrent readers never see a partially written file.
+
+    filename: str
+        path of the file to write
+
+    txt: str
+        content of the file
+    """
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=folder or None, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(txt)
+        os.replace(tmp, filename)
+    except:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+# ...
+
+# ...
+class BasicCache(object):
+    """
+    A thread-safe LRU cache with an optional on-disk tier, where every entry is
+    stored as a json file. Subclasses define the file name of a key and the
+    conversion of the values to/from json.
+
+    maxsize: int
+        maximum number of entries kept in memory
+
+    cache_dir: str
+        directory of the on-disk cache. The disk cache is disabled if None.
+    """
+    _folder = None
+
+    def __init__(self, maxsize=256, cache_dir=None):
+        self._maxsize   = maxsize
+        self._cache_dir = cache_dir
+        self._data      = OrderedDict()
+        self._lock      = threading.RLock()
+
+        self._hits      = 0
+        self._misses    = 0
+        self._disk_hits = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    def configure(self, maxsize=None, cache_dir=None, disk=None):
+        """
+        Changes the cache settings.
+
+        maxsize: int
+            maximum number of entries kept in memory
+
+        cache_dir: str
+            directory of the on-disk cache
+
+        disk: bool
+            enables (True) or disables (False) the on-disk cache. When enabled
+            without cache_dir, the default cache directory is used.
+        """
+        with self._lock:
+            if not( maxsize is None ):
+                self._maxsize = maxsize
+                self._shrink()
+
+            if not( cache_dir is None ):
+                self._cache_dir = cache_dir
+
+            if disk is True and self._cache_dir is None:
+                self._cache_dir = default_cache_dir()
+
+            elif disk is False:
+                self._cache_dir = None
+
+    def _basename(self, key):
+        raise NotImplementedError('')
+
+    def _dumps(self, value):
+        raise NotImplementedError('')
+
+    def _loads(self, data):
+        raise NotImplementedError('')
+
+    def _filename(self, key):
+        name = '{}.json'.format(self._basename(key))
+        return os.path.join(self._cache_dir, self._folder, name)
+
+    def _read(self, key):
+        if self._cache_dir is None:
+            return None
+
+        filename = self._filename(key)
+        try:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+            return self._loads(data)
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, key, value):
+        if self._cache_dir is None:
+            return
+
+        txt = json.dumps(self._dumps(value))
+        try:
+            atomic_write(self._filename(key), txt)
+        except (IOError, OSError):
+            # the disk cache is only an optimization
+            pass
+
+    def _shrink(self):
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def _lookup(self, key, compute):
+        """Returns the value of key, calling compute() if it is neither in
+        memory nor on disk. compute is called without holding the lock, so
+        that different keys can be computed concurrently."""
+        with self._lock:
+            if key in self._data:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        value = self._read(key)
+        if value is None:
+            value = compute()
+            self._write(key, value)
+            is_disk_hit = False
+
+        else:
+            is_disk_hit = True
+
+        with self._lock:
+            if is_disk_hit:
+                self._disk_hits += 1
+            else:
+                self._misses += 1
+
+            self._data[key] = value
+            self._shrink()
+
+        return value
+
+    def cache_info(self):
+        """Returns the hits/misses statistics of the cache."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._disk_hits,
+                             self._maxsize, len(self._data))
+
+    def clear(self, disk=False):
+        """
+        Clears the in-memory cache and resets the statistics.
+
+        disk: bool
+            also removes the on-disk entries if True
+        """
+        with self._lock:
+            self._data.clear()
+            self._hits      = 0
+            self._misses    = 0
+            self._disk_hits = 0
+
+            if disk and not( self._cache_dir is None ):
+                folder = os.path.join(self._cache_dir, self._folder)
+                if os.path.isdir(folder):
+                    for name in os.listdir(folder):
+                        if name.endswith('.json'):
+                            os.remove(os.path.join(folder, name))
+# ...
+
+# ...
+class SymbolCache(BasicCache):
+    """
+    A LRU cache for the coefficients of the 1D GLT symbols, keyed by
+    (kind, degree, derivative order).
+
+    maxsize: int
+        maximum number of entries kept in memory
+
+    cache_dir: str
+        directory of the on-disk cache. The disk cache is disabled if None.
+    """
+    _folder = 'symbols'
+
+    def _basename(self, key):
+        kind, p, nderiv = key
+        return '{kind}_p{p}_d{nderiv}'.format(kind=kind, p=p, nderiv=nderiv)
+
+    def _dumps(self, value):
+        return [str(i) for i in value]
+
+    def _loads(self, data):
+        return tuple(Fraction(i) for i in data)
+
+    def get(self, kind, p, nderiv, compute):
+        """
+        Returns the coefficients associated to (kind, p, nderiv), calling
+        compute(p, nderiv) if they are not in the cache.
+
+        kind: str
+            name of the symbol (Mass, Stiffness, ...)
+
+        p: int
+            spline degree
+
+        nderiv: int
+            total number of derivatives
+
+        compute: callable
+            function computing the coefficients
+        """
+        return self._lookup((kind, p, nderiv),
+                            lambda: tuple(compute(p, nderiv)))
+# ...
+
+# ... the cache shared by all BasicGlt subclasses
+symbol_cache = SymbolCache(cache_dir=os.environ.get('GELATO_CACHE_DIR', None))
+
+def symbol_cache_info():
+    """Returns the hits/misses statistics of the 1D symbols cache."""
+    return symbol_cache.cache_info()
+
+def clear_symbol_cache(disk=False):
+    """Clears the 1D symbols cache."""
+    symbol_cache.clear(disk=disk)
+
+def configure_symbol_cache(maxsize=None, cache_dir=None, disk=None):
+    """Changes the settings of the 1D symbols cache. See SymbolCache.configure."""
+    symbol_cache.configure(maxsize=maxsize, cache_dir=cache_dir, disk=disk)
+# ...
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains functions to evaluate trigonometric polynomials
+f(t) = sum_k a_k cos(k t) + b_k sin(k t), such as the 1D GLT symbols, with the
+Clenshaw recurrence. Writing cos(k t) = T_k(cos t) and sin(k t) = sin t U_{k-1}(cos
+t), where T_k and U_k are the Chebyshev polynomials, only one cosine and one
+sine are computed per point."""
+
+import numpy as np
+
+from .fourier import fourier_coefficients
+
+
+# ...
+def trig_coefficients(expr, t):
+    """
+    Returns the arrays (a, b), of size p+1, of the coefficients of a
+    trigonometric polynomial f(t) = sum_k a_k cos(k t) + b_k sin(k t), with
+    b_0 = 0. The arrays are complex only if needed.
+
+    expr: sympy.Expression
+        a trigonometric polynomial in t, with numerical coefficients
+
+    t: sympy.Symbol
+        the Fourier variable
+    """
+    c = fourier_coefficients(expr, t)
+    p = (len(c) - 1) // 2
+
+    # ... with c_k = (a_k - i b_k)/2 and c_{-k} = (a_k + i b_k)/2
+    a = np.zeros(p+1, dtype=complex)
+    b = np.zeros(p+1, dtype=complex)
+
+    a[0] = c[p]
+    for k in range(1, p+1):
+        a[k] = c[p+k] + c[p-k]
+        b[k] = 1.j * (c[p+k] - c[p-k])
+    # ...
+
+    if np.allclose(a.imag, 0.) and np.allclose(b.imag, 0.):
+        a = a.real
+        b = b.real
+
+    return a, b
+# ...
+
+# ...
+def _clenshaw(coeffs, x):
+    """Returns (b_1, b_2) of the Clenshaw recurrence b_k = c_k + 2 x b_{k+1} -
+    b_{k+2}, for k = n-1, ..., 1, where n = len(coeffs)."""
+    b1 = 0.
+    b2 = 0.
+    for k in range(len(coeffs)-1, 0, -1):
+        b1, b2 = coeffs[k] + 2. * x * b1 - b2, b1
+    return b1, b2
+
+def clenshaw_cos(a, t):
+    """
+    Evaluates sum_{k=0}^p a_k cos(k t) = sum_k a_k T_k(cos t).
+
+    a: list, tuple, numpy.ndarray
+        the coefficients a_0, ..., a_p
+
+    t: float, numpy.ndarray
+        the points
+    """
+    x = np.cos(t)
+    b1, b2 = _clenshaw(a, x)
+    return a[0] + x * b1 - b2
+
+def clenshaw_sin(b, t):
+    """
+    Evaluates sum_{k=1}^p b_k sin(k t) = sin t sum_k b_k U_{k-1}(cos t).
+
+    b: list, tuple, numpy.ndarray
+        the coefficients b_0, ..., b_p (b_0 is not used)
+
+    t: float, numpy.ndarray
+        the points
+    """
+    # ... with the Chebyshev polynomials of the second kind, the sum is
+    #     sin t (b_1 + 2 x s_2 - s_3), where s are the Clenshaw terms of
+    #     (b_1, b_2, ..., b_p)
+    if len(b) < 2:
+        return 0. * np.sin(t)
+
+    x = np.cos(t)
+    b1, b2 = _clenshaw(b[1:], x)
+    return np.sin(t) * (b[1] + 2. * x * b1 - b2)
+
+def trig_clenshaw(a, b, t):
+    """
+    Evaluates the trigonometric polynomial sum_k a_k cos(k t) + b_k sin(k t),
+    with one cosine and (if b is given) one sine per point.
+
+    a: list, tuple, numpy.ndarray
+        the cosine coefficients a_0, ..., a_p, or None if they vanish
+
+    b: list, tuple, numpy.ndarray
+        the sine coefficients b_0, ..., b_p, or None if they vanish
+
+    t: float, numpy.ndarray
+        the points
+    """
+    if a is None:
+        return clenshaw_sin(b, t)
+
+    if b is None:
+        return clenshaw_cos(a, t)
+
+    return clenshaw_cos(a, t) + clenshaw_sin(b, t)
+# ...
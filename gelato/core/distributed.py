@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains functions to sample GLT symbols on grids that are
+distributed over MPI processes, and to compute global statistics of the
+samples. mpi4py is only required when these functions are called."""
+
+import os
+import json
+
+import numpy as np
+
+from .spectrum import glt_sampling_sizes
+from .spectrum import glt_approximate_eigenvalues
+
+
+# ...
+def _mpi():
+    try:
+        from mpi4py import MPI
+    except ImportError:
+        raise ImportError('> mpi4py is required for the distributed sampling')
+
+    return MPI
+
+def _communicator(comm):
+    if comm is None:
+        comm = _mpi().COMM_WORLD
+    return comm
+
+def _check_real(local):
+    if np.iscomplexobj(local):
+        raise TypeError('> Expecting real samples')
+# ...
+
+# ...
+def local_range(size, n_procs, rank):
+    """
+    Returns the range [start, stop) of the flat indices owned by a process,
+    for a balanced decomposition of range(size) in contiguous blocks.
+
+    size: int
+        global number of indices
+
+    n_procs: int
+        number of processes
+
+    rank: int
+        rank of the process
+    """
+    q, r = divmod(size, n_procs)
+    start = rank * q + min(rank, r)
+    stop  = start + q + (1 if rank < r else 0)
+    return start, stop
+# ...
+
+# ...
+def distributed_eigenvalues(expr, degrees, n_elements, comm=None, **kwargs):
+    """
+    Approximates the eigenvalues of the matrix associated to a weak formulation
+    as glt_approximate_eigenvalues, the sampling points of the (x, theta) grid
+    being distributed over the processes of comm. Every process only allocates
+    and evaluates its own block. Returns (start, values), where start is the
+    position of the local values in the global array of eigenvalues.
+
+    expr: sympy.Expression, BilinearForm
+        a symbol as returned by gelatize, or a weak formulation
+
+    degrees: int, list, tuple
+        spline degrees
+
+    n_elements: int, list, tuple
+        number of elements
+
+    comm: mpi4py.MPI.Comm
+        the communicator, MPI.COMM_WORLD by default
+
+    The other keyword arguments are passed to glt_approximate_eigenvalues.
+    """
+    comm = _communicator(comm)
+
+    if isinstance(degrees, int):
+        degrees = [degrees]
+
+    if isinstance(n_elements, int):
+        n_elements = [n_elements]*len(degrees)
+
+    size = int(np.prod(glt_sampling_sizes(degrees, n_elements)))
+    start, stop = local_range(size, comm.Get_size(), comm.Get_rank())
+
+    values = glt_approximate_eigenvalues(expr, degrees, n_elements,
+                                         start=start, stop=stop, **kwargs)
+
+    # a block symbol gives several eigenvalues per sampling point
+    n_blocks = 1
+    if stop > start:
+        n_blocks = len(values) // (stop - start)
+
+    return start * n_blocks, values
+# ...
+
+# ...
+def global_size(local, comm=None):
+    """Returns the global number of samples."""
+    comm = _communicator(comm)
+    return comm.allreduce(len(local), op=_mpi().SUM)
+
+def global_min(local, comm=None):
+    """Returns the minimum of the distributed real samples."""
+    _check_real(local)
+    comm = _communicator(comm)
+    value = local.min() if len(local) > 0 else np.inf
+    return comm.allreduce(float(value), op=_mpi().MIN)
+
+def global_max(local, comm=None):
+    """Returns the maximum of the distributed real samples."""
+    _check_real(local)
+    comm = _communicator(comm)
+    value = local.max() if len(local) > 0 else -np.inf
+    return comm.allreduce(float(value), op=_mpi().MAX)
+
+def global_histogram(local, bins=10, range=None, comm=None):
+    """
+    Computes the histogram of the distributed real samples, as numpy.histogram.
+    Returns the global counts and the bin edges.
+
+    local: numpy.ndarray
+        the samples of the process
+
+    bins: int
+        number of bins
+
+    range: tuple
+        lower and upper range of the bins. By default, the global minimum and
+        maximum of the samples.
+
+    comm: mpi4py.MPI.Comm
+        the communicator, MPI.COMM_WORLD by default
+    """
+    _check_real(local)
+    comm = _communicator(comm)
+
+    if range is None:
+        range = (global_min(local, comm=comm), global_max(local, comm=comm))
+
+    counts, edges = np.histogram(local, bins=bins, range=range)
+    counts = counts.astype(np.int64)
+
+    total = np.zeros_like(counts)
+    comm.Allreduce(counts, total, op=_mpi().SUM)
+
+    return total, edges
+
+def global_quantiles(local, qs, comm=None):
+    """
+    Computes exact quantiles of the distributed real samples without gathering
+    them: the quantile q is the k-th smallest sample, with k = floor(q (N-1)),
+    as numpy.quantile with method='lower'. Every quantile is found by a
+    bisection on the values, which only needs global counts.
+
+    local: numpy.ndarray
+        the samples of the process
+
+    qs: float, list
+        quantiles, in [0, 1]
+
+    comm: mpi4py.MPI.Comm
+        the communicator, MPI.COMM_WORLD by default
+    """
+    _check_real(local)
+    comm = _communicator(comm)
+    MPI = _mpi()
+
+    is_scalar = np.isscalar(qs)
+    qs = np.atleast_1d(qs)
+
+    N = global_size(local, comm=comm)
+    if N == 0:
+        raise ValueError('> Expecting at least one sample')
+
+    vmin = global_min(local, comm=comm)
+    vmax = global_max(local, comm=comm)
+
+    local = np.sort(local)
+    def _count(v):
+        # number of samples <= v
+        n = int(np.searchsorted(local, v, side='right'))
+        return comm.allreduce(n, op=MPI.SUM)
+
+    def _min_above(v):
+        i = int(np.searchsorted(local, v, side='right'))
+        value = local[i] if i < len(local) else np.inf
+        return comm.allreduce(float(value), op=MPI.MIN)
+
+    values = []
+    for q in qs:
+        if not( 0. <= q <= 1. ):
+            raise ValueError('> quantiles must be in [0, 1]')
+
+        k = int(np.floor(q * (N - 1)))
+
+        # ... invariant: count(lo) <= k < count(hi)
+        lo = np.nextafter(vmin, -np.inf)
+        hi = vmax
+        while True:
+            if _count(lo) == k:
+                value = _min_above(lo)
+                break
+
+            mid = lo + (hi - lo) / 2.
+            if mid <= lo or mid >= hi:
+                # lo and hi are consecutive floats
+                value = hi
+                break
+
+            if _count(mid) > k:
+                hi = mid
+            else:
+                lo = mid
+        # ...
+
+        values.append(value)
+
+    values = np.array(values)
+    if is_scalar:
+        return values[0]
+    return values
+# ...
+
+# ...
+def write_shards(local, start, prefix, comm=None):
+    """
+    Writes the samples of every process to its own .npy file (shard), named
+    {prefix}_{rank}.npy, and the index {prefix}.json that describes the global
+    array. The shards are written concurrently.
+
+    local: numpy.ndarray
+        the samples of the process
+
+    start: int
+        position of the local samples in the global array
+
+    prefix: str
+        path prefix of the files
+
+    comm: mpi4py.MPI.Comm
+        the communicator, MPI.COMM_WORLD by default
+    """
+    comm = _communicator(comm)
+    rank = comm.Get_rank()
+
+    filename = '{prefix}_{rank:05d}.npy'.format(prefix=prefix, rank=rank)
+    np.save(filename, local)
+
+    shards = comm.gather({'file': os.path.basename(filename),
+                          'start': int(start),
+                          'size': int(len(local))}, root=0)
+
+    if rank == 0:
+        shards = sorted(shards, key=lambda i: i['start'])
+        index = {'size': sum(i['size'] for i in shards),
+                 'dtype': np.dtype(local.dtype).name,
+                 'shards': shards}
+
+        with open('{}.json'.format(prefix), 'w') as f:
+            json.dump(index, f, indent=2)
+
+    comm.Barrier()
+
+def read_shards(prefix, mmap_mode=None):
+    """
+    Reads the global array written by write_shards.
+
+    prefix: str
+        path prefix of the files
+
+    mmap_mode: str
+        passed to numpy.load for every shard
+    """
+    with open('{}.json'.format(prefix), 'r') as f:
+        index = json.load(f)
+
+    folder = os.path.dirname(prefix)
+
+    values = np.empty(index['size'], dtype=index['dtype'])
+    for shard in index['shards']:
+        data = np.load(os.path.join(folder, shard['file']), mmap_mode=mmap_mode)
+        values[shard['start']:shard['start']+shard['size']] = data
+
+    return values
+# ...
@@ -9,6 +9,12 @@ from sympy import S
 from sympy.core import Expr, Basic, AtomicExpr
 from sympy import simplify
 from sympy import Matrix, ImmutableDenseMatrix
+from sympy import expand_mul
+from sympy import expand
+from sympy import Pow
+from sympy.core.function import Application
+
+from collections import OrderedDict
 
 from symfe.core import BilinearForm, BilinearAtomicForm
 from symfe.core import tensorize
@@ -21,8 +27,87 @@ from symfe.core.basic import _coeffs_registery
 from .glt import (Mass,
                   Stiffness,
                   Advection,
-                  Bilaplacian)
+                  Bilaplacian,
+                  DerivativeSymbol)
+
+import numpy as np
+import re
+
+
+# ...
+_coordinates = ['x', 'y', 'z']
+
+def coordinate_names(dim):
+    """
+    Returns the names of the position variables of a logical domain of
+    dimension dim: x, y, z up to dim = 3, and x1, ..., xd otherwise (such as
+    for a space-time domain). The Fourier variable, the number of elements
+    and the degree of an axis of coordinate x are named tx, nx and px.
+
+    dim: int
+        dimension of the logical domain
+    """
+    if dim <= len(_coordinates):
+        return _coordinates[:dim]
+    return ['x{}'.format(i) for i in range(1, dim+1)]
+
+def coordinate_axis(name):
+    """Returns the axis of a position variable given by its name (see
+    coordinate_names), or None if name is not a position variable."""
+    if name in _coordinates:
+        return _coordinates.index(name)
+
+    m = re.match(r'^x([1-9][0-9]*)$', name)
+    if m:
+        return int(m.group(1)) - 1
+
+    return None
+# ...
+
+# ...
+def _derivative_order(expr, u):
+    """Returns the number of derivatives applied to u in expr, such as 2 for
+    dx(dx(u)), or None if expr is not a derivative of u."""
+    n = 0
+    while not( expr == u ):
+        if not( len(expr.args) == 1 ):
+            return None
+        expr = expr.args[0]
+        n += 1
+    return n
+
+def _derivative_orders(a):
+    """
+    Returns the orders (r, s) of the derivatives of the test and trial
+    functions of a 1D atomic form, such as (0, 2) for dx(dx(u))*v, or None if
+    the form is not a product of derivatives of its test and trial functions.
+    """
+    try:
+        v = a.test_functions[0]
+        u = a.trial_functions[0]
+        expr = a.expr
+    except (AttributeError, IndexError):
+        return None
+
+    r = s = None
+    for f in Mul.make_args(expr):
+        if f.is_number:
+            continue
+
+        i = _derivative_order(f, v)
+        j = _derivative_order(f, u)
+        if not( i is None ) and r is None:
+            r = i
+        elif not( j is None ) and s is None:
+            s = j
+        else:
+            return None
+
+    if r is None or s is None:
+        return None
 
+    return r, s
+# ...
 
 # ...
 def _gelatize(a, degrees=None, evaluate=False, verbose=False):
@@ -77,8 +162,7 @@ def _gelatize(a, degrees=None, evaluate=False, verbose=False):
         # ...
 
         # ...
-        _coordinates = ['x', 'y', 'z']
-        index = _coordinates.index(str(coord.name))
+        index = coordinate_axis(str(coord.name))
         # ...
 
         if evaluate and ( degrees is None ):
@@ -111,18 +195,143 @@ def _gelatize(a, degrees=None, evaluate=False, verbose=False):
             symbol = - sympy_I * Advection(p, t, evaluate=evaluate)
             return symbol
 
-        else:
+        # ... any other atomic form, such as the ones with second derivatives,
+        #     from the orders of its derivatives
+        orders = _derivative_orders(expr)
+        if orders is None:
             raise NotImplementedError('TODO')
 
+        r, s = orders
+        symbol = DerivativeSymbol(p, r, s, t, evaluate=evaluate)
+        return symbol * n**(r + s - 1)
+        # ...
+
     return expr
 # ...
 
 
-def gelatize(a, degrees=None, n_elements=None):
+def _numeric_terms(a, degrees, n_elements, dim):
+    """Returns the symbol of a form with numerical coefficients as a list of
+    terms (coeff, factors), factors[i] being a TrigPoly or None (one)."""
+    # imported here, since fourier depends on this module
+    from .trigpoly import glt_trig_poly
+
+    if isinstance(a, BilinearForm) and not(isinstance(a, BilinearAtomicForm)):
+        expr = tensorize(a)
+    else:
+        expr = a
 
+    if isinstance(expr, Add):
+        terms = []
+        for i in expr.args:
+            terms += _numeric_terms(i, degrees, n_elements, dim)
+        return terms
+
+    elif isinstance(expr, Mul):
+        terms = [(1., [None]*dim)]
+        for i in expr.args:
+            args = _numeric_terms(i, degrees, n_elements, dim)
+
+            ls = []
+            for c1, fs1 in terms:
+                for c2, fs2 in args:
+                    fs = [f if g is None else g if f is None else f * g
+                          for f, g in zip(fs1, fs2)]
+                    ls.append((c1 * c2, fs))
+            terms = ls
+
+        return terms
+
+    elif isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        raise NotImplementedError('> numeric symbols are only available for '
+                                  'scalar forms')
+
+    elif isinstance(expr, BilinearAtomicForm):
+        coord = expr.trial_spaces[0].coordinates
+
+        index = coordinate_axis(str(coord.name))
+
+        p = int(degrees[index])
+        n = int(n_elements[index])
+
+        if isinstance(expr, MassForm):
+            coeff = 1. / n
+            f = glt_trig_poly(Mass, p)
+
+        elif isinstance(expr, StiffnessForm):
+            coeff = float(n)
+            f = glt_trig_poly(Stiffness, p)
+
+        elif isinstance(expr, AdvectionForm):
+            coeff = 1.j
+            f = glt_trig_poly(Advection, p)
+
+        elif isinstance(expr, AdvectionTForm):
+            coeff = -1.j
+            f = glt_trig_poly(Advection, p)
+
+        else:
+            orders = _derivative_orders(expr)
+            if orders is None:
+                raise NotImplementedError('TODO')
+
+            r, s = orders
+            coeff = float(n)**(r + s - 1)
+            f = glt_trig_poly((r, s), p)
+
+        factors = [None]*dim
+        factors[index] = f
+        return [(coeff, factors)]
+
+    elif expr.is_number:
+        return [(complex(expr), [None]*dim)]
+
+    raise ValueError('> numeric symbols require numerical coefficients, '
+                     'got {}'.format(expr))
+
+def gelatize(a, degrees=None, n_elements=None, numeric=False):
+    """
+    Computes the GLT symbol of a bilinear form, as a sympy expression (or a
+    matrix for a block form).
+
+    a: BilinearForm
+        the weak formulation
+
+    degrees: int, list, tuple
+        spline degrees. If not given, they remain symbolic.
+
+    n_elements: int, list, tuple
+        number of elements. If not given, they remain symbolic.
+
+    numeric: bool
+        if True, the symbol of a scalar form with constant numerical
+        coefficients is returned as a TensorTrigPoly, computed without sympy
+        arithmetic. degrees and n_elements must then be given.
+    """
     if not isinstance(a, BilinearForm):
         raise TypeError('> Expecting a BilinearForm')
 
+    if numeric:
+        if degrees is None or n_elements is None:
+            raise ValueError('> degrees and n_elements must be provided')
+
+        dim = a.ldim
+        if isinstance(degrees, int):
+            degrees = [degrees]*dim
+
+        if isinstance(n_elements, int):
+            n_elements = [n_elements]*dim
+
+        if not( len(degrees) == dim ) or not( len(n_elements) == dim ):
+            raise ValueError('Wrong size for degrees or n_elements')
+
+        from .trigpoly import TrigPoly, TensorTrigPoly
+
+        one = TrigPoly.constant(1.)
+        terms = _numeric_terms(a, degrees, n_elements, dim)
+        terms = [(c, [one if f is None else f for f in fs]) for c, fs in terms]
+        return TensorTrigPoly(dim, terms)
+
     evaluate = False
     if not( degrees is None ):
         evaluate = True
@@ -131,7 +340,7 @@ def gelatize(a, degrees=None, n_elements=None):
 
     if not( n_elements is None ):
         dim = a.ldim
-        ns = ['nx', 'ny', 'nz'][:dim]
+        ns = ['n{}'.format(x) for x in coordinate_names(dim)]
         ns = [Symbol(i, integer=True) for i in ns]
 
         if isinstance(n_elements, int):
@@ -145,3 +354,238 @@ def gelatize(a, degrees=None, n_elements=None):
 
     return expr
 #    return simplify(expr)
+
+
+# ...
+def _axis_names(dim):
+    """Returns a dictionary mapping the names of the position and Fourier
+    variables of every axis to the axis index."""
+    names = {}
+    for i, x in enumerate(coordinate_names(dim)):
+        names[x] = i
+        names['t{}'.format(x)] = i
+
+    return names
+
+def _split_term(expr, names, dim, positions=None):
+    coeff    = S.One
+    function = S.One
+    factors  = [S.One]*dim
+    for f in Mul.make_args(expr):
+        symbols = [s.name for s in f.free_symbols if s.name in names]
+        axes = set([names[s] for s in symbols])
+        if not axes:
+            coeff = coeff * f
+
+        elif len(axes) == 1:
+            i = axes.pop()
+            factors[i] = factors[i] * f
+
+        elif positions and all(s in positions for s in symbols):
+            # a function coupling several position variables
+            function = function * f
+
+        else:
+            return None
+
+    if positions:
+        return coeff, function, tuple(factors)
+
+    return coeff, tuple(factors)
+
+def _separate(expr, dim, positions=None):
+    names = _axis_names(dim)
+
+    terms = OrderedDict()
+    for term in Add.make_args(expr):
+        r = _split_term(term, names, dim, positions=positions)
+        if r is None:
+            # a factor is coupling several axes, we try to distribute it
+            args = Add.make_args(expand_mul(term))
+            if len(args) == 1:
+                return None
+
+            r = [_split_term(i, names, dim, positions=positions) for i in args]
+            if None in r:
+                return None
+
+        else:
+            r = [r]
+
+        for i in r:
+            key = i[1:]
+            terms[key] = terms.get(key, S.Zero) + i[0]
+
+    return [(coeff,) + key for key, coeff in terms.items()
+            if not( coeff == 0 )]
+
+def separate_axes(expr, dim):
+    """
+    Splits a symbol into a sum of separable terms. Every term is given as a
+    tuple (coeff, factors) where coeff does not depend on the axes variables and
+    factors[i] only depends on the position and Fourier variables of the i-th
+    axis. Returns None if the symbol is not separable.
+
+    expr: sympy.Expression
+        a scalar symbol, as returned by gelatize
+
+    dim: int
+        dimension of the logical domain
+    """
+    if isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        return None
+
+    return _separate(expr, dim)
+
+def separate_terms(expr, dim):
+    """
+    Splits a symbol into a sum of terms coeff * function * prod_i factors[i],
+    given as tuples (coeff, function, factors), where coeff does not depend on
+    the axes variables, function only depends on the position variables (it
+    couples several of them, and is one otherwise), and factors[i] only
+    depends on the position and Fourier variables of the i-th axis. Contrary
+    to separate_axes, the symbols with variable coefficients that are not
+    products of 1D functions are then split. Returns None if a factor couples
+    the Fourier variables of several axes.
+
+    expr: sympy.Expression
+        a scalar symbol, as returned by gelatize
+
+    dim: int
+        dimension of the logical domain
+    """
+    if isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        return None
+
+    positions = set(coordinate_names(dim))
+    return _separate(expr, dim, positions=positions)
+# ...
+
+
+# ... a symbol is real (0), purely imaginary (1) or complex (None)
+_REAL      = 0
+_IMAGINARY = 1
+
+def _parity(expr):
+    """Returns the parity of the power of the imaginary unit of an expression,
+    assuming that all its symbols and functions are real, or None if the
+    expression is a general complex expression."""
+    if expr is sympy_I:
+        return _IMAGINARY
+
+    elif expr.is_number:
+        if expr.is_real:
+            return _REAL
+        elif expr.is_imaginary:
+            return _IMAGINARY
+        elif expr.is_zero:
+            return _REAL
+        return None
+
+    elif expr.is_Symbol:
+        return _REAL
+
+    elif isinstance(expr, DerivativeSymbol):
+        # the symbols with an odd number of derivatives are imaginary
+        if expr.is_imaginary_symbol:
+            return _IMAGINARY
+        return _REAL
+
+    elif isinstance(expr, Application):
+        # 1D GLT symbols and elementary functions of real arguments are real
+        if all(_parity(i) == _REAL for i in expr.args):
+            return _REAL
+        return None
+
+    elif isinstance(expr, Add):
+        ps = set(_parity(i) for i in expr.args)
+        if len(ps) == 1:
+            return ps.pop()
+        return None
+
+    elif isinstance(expr, Mul):
+        p = _REAL
+        for i in expr.args:
+            q = _parity(i)
+            if q is None:
+                return None
+            p = (p + q) % 2
+        return p
+
+    elif isinstance(expr, Pow):
+        b, e = expr.args
+        q = _parity(b)
+        # the exponent may be an integral Float, as in x**2.0
+        if q is None or not( e.is_number and e.is_real and float(e) == int(e) ):
+            return None
+        return (q * int(e)) % 2
+
+    return None
+
+def symbol_kind(expr):
+    """
+    Statically classifies a symbol as 'real', 'imaginary' (purely imaginary)
+    or 'complex'. The position and Fourier variables, the number of elements,
+    the constants and the 1D GLT symbols are real.
+
+    expr: sympy.Expression, sympy.Matrix
+        a symbol as returned by gelatize. For a block symbol, the
+        classification applies to all its entries.
+    """
+    if isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        kinds = set(symbol_kind(i) for i in expr if not( i == 0 ))
+        if len(kinds) == 1:
+            return kinds.pop()
+        elif not kinds:
+            return 'real'
+        return 'complex'
+
+    p = _parity(expr)
+    if p == _REAL:
+        return 'real'
+    elif p == _IMAGINARY:
+        return 'imaginary'
+    return 'complex'
+
+def _conjugate(expr):
+    # all the atoms other than the imaginary unit and the imaginary 1D symbols
+    # are real
+    d = {sympy_I: -sympy_I}
+    for i in expr.atoms(DerivativeSymbol):
+        if i.is_imaginary_symbol:
+            d[i] = -i
+    return expr.xreplace(d)
+
+def is_hermitian_symbol(expr):
+    """
+    Returns True if a block symbol is Hermitian for every value of the position
+    and Fourier variables.
+
+    expr: sympy.Matrix
+        a block symbol, as returned by gelatize
+    """
+    if not isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        return symbol_kind(expr) == 'real'
+
+    n_rows, n_cols = expr.shape
+    if not( n_rows == n_cols ):
+        return False
+
+    for i in range(0, n_rows):
+        for j in range(i, n_cols):
+            aij = expr[i,j]
+            aji = _conjugate(expr[j,i])
+            if not( aij == aji ) and not( expand(aij - aji) == 0 ):
+                return False
+
+    return True
+
+def symbol_dtype(expr):
+    """
+    Returns the narrowest numpy data type that holds the values of a symbol:
+    float64 for a real symbol and complex128 otherwise.
+    """
+    if symbol_kind(expr) == 'real':
+        return np.dtype(np.float64)
+    return np.dtype(np.complex128)
+# ...
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains functions to evaluate GLT symbols on uniform grids of
+the Fourier variables, using the Fast Fourier Transform."""
+
+import numpy as np
+
+from sympy import Symbol
+from sympy import cos, sin
+from sympy import expand
+from sympy.core import Add, Mul
+
+from .expr import separate_axes
+from .expr import coordinate_names
+
+
+# ...
+def fourier_coefficients(expr, t):
+    """
+    Returns the coefficients c_k, k = -p..p, of a trigonometric polynomial
+    f(t) = sum_k c_k exp(i k t), as a complex array of size 2p+1 where c_k is
+    stored at the position p+k.
+
+    expr: sympy.Expression
+        a trigonometric polynomial in t, with numerical coefficients, such as
+        Mass(p, t) for an integer p
+
+    t: sympy.Symbol
+        the Fourier variable
+    """
+    coeffs = {}
+    for term in Add.make_args(expand(expr)):
+        c = 1. + 0.j
+        k = 0
+        kind = None
+        for f in Mul.make_args(term):
+            if f.is_number:
+                c *= complex(f)
+
+            elif isinstance(f, (cos, sin)) and kind is None:
+                # the frequency may be an integral Float, as in cos(2.0*t)
+                kf = f.args[0] / t
+                if not( kf.is_number and kf.is_real and float(kf) == int(kf) ):
+                    raise ValueError('> Expecting a trigonometric polynomial in {}'.format(t))
+
+                k = int(kf)
+                kind = type(f)
+
+            else:
+                raise ValueError('> Expecting a trigonometric polynomial in {}'.format(t))
+
+        # ... cos(kt) = (e^{ikt} + e^{-ikt})/2 and sin(kt) = (e^{ikt} - e^{-ikt})/2i
+        if kind is None:
+            coeffs[0] = coeffs.get(0, 0.) + c
+
+        elif kind is cos:
+            coeffs[k]  = coeffs.get(k, 0.)  + c/2
+            coeffs[-k] = coeffs.get(-k, 0.) + c/2
+
+        else:
+            coeffs[k]  = coeffs.get(k, 0.)  + c/2.j
+            coeffs[-k] = coeffs.get(-k, 0.) - c/2.j
+        # ...
+
+    p = max([abs(k) for k in coeffs.keys()] + [0])
+
+    c = np.zeros(2*p+1, dtype=complex)
+    for k, v in coeffs.items():
+        c[p+k] += v
+
+    return c
+# ...
+
+# ...
+def fourier_grid(n, endpoint=True):
+    """
+    Returns the uniform grid of n points over [-pi, pi] used by the evaluation
+    functions. If endpoint is True, this is linspace(-pi, pi, n), otherwise the
+    point pi is excluded.
+    """
+    return np.linspace(-np.pi, np.pi, n, endpoint=endpoint)
+# ...
+
+# ...
+def _fourier_variable(expr, t):
+    if not( t is None ):
+        return t
+
+    ts = [i for i in expr.free_symbols if isinstance(i, Symbol)]
+    if len(ts) > 1:
+        raise ValueError('> the Fourier variable must be provided')
+
+    elif len(ts) == 0:
+        return Symbol('t')
+
+    return ts[0]
+
+def evaluate_on_grid(symbol, n, t=None, endpoint=True):
+    """
+    Evaluates a 1D symbol on the uniform grid returned by fourier_grid(n,
+    endpoint), through a zero padded (or folded) inverse FFT of its Fourier
+    coefficients. The result is real (float64) when the symbol is real.
+
+    symbol: sympy.Expression, numpy.ndarray
+        a trigonometric polynomial, or its Fourier coefficients as returned by
+        fourier_coefficients
+
+    n: int
+        number of points
+
+    t: sympy.Symbol
+        the Fourier variable. Only needed if the symbol has several free
+        symbols.
+
+    endpoint: bool
+        includes the point pi in the grid if True
+    """
+    if isinstance(symbol, np.ndarray):
+        c = np.asarray(symbol, dtype=complex)
+    else:
+        c = fourier_coefficients(symbol, _fourier_variable(symbol, t))
+
+    p = (len(c) - 1) // 2
+    k = np.arange(-p, p+1)
+
+    is_real = np.allclose(c, np.conj(c[::-1]))
+
+    # ... number of distinct points, pi being identified with -pi
+    m = n
+    if endpoint:
+        m = n - 1
+    # ...
+
+    if m < 1:
+        values = np.array([np.sum(c * (-1.)**k)])
+
+    else:
+        # ... at t_j = -pi + 2 pi j / m we have
+        #     f(t_j) = sum_k c_k (-1)^k exp(2 i pi j k / m)
+        #     the coefficients are folded modulo m when m < 2p+1
+        a = np.zeros(m, dtype=complex)
+        np.add.at(a, k % m, c * (-1.)**k)
+
+        if is_real:
+            values = np.fft.irfft(a[:m//2+1], m) * m
+        else:
+            values = np.fft.ifft(a) * m
+        # ...
+
+    if endpoint and n > 1:
+        values = np.concatenate([values, values[:1]])
+
+    if is_real:
+        values = values.real
+
+    return values[:n]
+# ...
+
+# ...
+def evaluate_on_tensor_grid(symbol, ns, endpoint=True):
+    """
+    Evaluates a separable symbol, that only depends on the Fourier variables
+    tx, ty, tz, on the tensor product of uniform grids. Every 1D factor is
+    evaluated with evaluate_on_grid and the terms are combined as outer
+    products.
+
+    symbol: sympy.Expression
+        a symbol as returned by gelatize, for given degrees and number of
+        elements
+
+    ns: int, list, tuple
+        number of points in every direction
+
+    endpoint: bool
+        includes the point pi in the grids if True
+    """
+    if isinstance(ns, int):
+        ns = [ns]
+    dim = len(ns)
+
+    terms = separate_axes(symbol, dim)
+    if terms is None:
+        raise ValueError('> Expecting a separable symbol')
+
+    ts = [Symbol('t{}'.format(x)) for x in coordinate_names(dim)]
+
+    is_real = True
+    values  = []
+    for coeff, factors in terms:
+        if not( coeff.is_number ):
+            raise ValueError('> free symbols {} must be given a value'.format(coeff.free_symbols))
+
+        c = complex(coeff)
+        is_real = is_real and (c.imag == 0.)
+
+        arrays = []
+        for t, f, n in zip(ts, factors, ns):
+            names = [i.name for i in f.free_symbols]
+            if [i for i in names if not( i == t.name )]:
+                raise ValueError('> {} depends on the position variables'.format(f))
+
+            f = f.subs({i: t for i in f.free_symbols})
+            w = evaluate_on_grid(f, n, t=t, endpoint=endpoint)
+            is_real = is_real and not( np.iscomplexobj(w) )
+            arrays.append(w)
+
+        values.append((c, arrays))
+
+    dtype = float if is_real else complex
+    mat = np.zeros(ns, dtype=dtype)
+    for c, arrays in values:
+        term = arrays[0]
+        for w in arrays[1:]:
+            term = np.multiply.outer(term, w)
+
+        if is_real:
+            c = c.real
+        mat += c * term
+
+    return mat
+# ...
@@ -5,23 +5,21 @@
 
 from sympy import Symbol
 from sympy import Function
-from sympy import bspline_basis
-from sympy import lambdify
 from sympy import cos
 from sympy import sin
 from sympy import Rational
-from sympy import diff
+from sympy import Integer
+from sympy import sympify
 from sympy import I as sympy_I
+from sympy import Piecewise, Eq
 from sympy.core import Basic
 from sympy.core.singleton import S
-from sympy.simplify.simplify import nsimplify
 from sympy import Tuple
 
 from itertools import product
 
-
-# TODO add it to glt_function
-TOLERANCE    = 1.e-10
+from .bspline import glt_coefficients
+from .cache import symbol_cache
 
 class BasicGlt(Function):
     """
@@ -30,6 +28,7 @@ class BasicGlt(Function):
 
     """
     nargs = None
+    _nderiv = None
 
     def __new__(cls, *args, **options):
         # (Try to) sympify args first
@@ -40,6 +39,7 @@ class BasicGlt(Function):
             r = None
 
         if r is None:
+            args = [sympify(i) for i in args]
             return Basic.__new__(cls, *args, **options)
         else:
             return r
@@ -48,6 +48,30 @@ class BasicGlt(Function):
     def name(self):
         return self._name
 
+    @classmethod
+    def coefficients(cls, p):
+        """
+        Returns the exact coefficients [phi_0, ..., phi_p] of the symbol, as
+        sympy rationals. They are shared through the process-wide symbol cache.
+
+        p: int
+            spline degree
+        """
+        return derivative_coefficients(p, cls._nderiv)
+
+    @classmethod
+    def degree_limit(cls, t):
+        """
+        Returns the pointwise limit of the symbol as p -> oo. By the aliasing
+        sum of the symbols (see glt_asymptotic), the mass symbol tends to one
+        on 2 pi Z and to zero elsewhere, while the symbols involving
+        derivatives tend to zero.
+
+        t: sympy.Symbol
+            the Fourier variable
+        """
+        return _degree_limit(cls._nderiv, t)
+
     def _sympystr(self, printer):
         sstr = printer.doprint
 
@@ -59,196 +83,228 @@ class BasicGlt(Function):
 #        return '{name}_{p}({t})'.format(name=name, p=p, t=t)
 
 # ...
-class Mass(BasicGlt):
+def derivative_coefficients(p, nderiv):
     """
-    A class for the mass symbol
+    Returns the exact coefficients [phi_0, ..., phi_p] of the symbols with
+    nderiv derivatives in total, as sympy rationals: phi_k is the derivative
+    of order nderiv of the cardinal B-spline of degree 2p+1 at p+1-k. They
+    are shared by all the symbols through the process-wide symbol cache.
+
+    p: int
+        spline degree
+
+    nderiv: int
+        total number of derivatives (test + trial)
     """
-    nargs = 2
-    _name = 'Mass'
+    phi = symbol_cache.get('Derivative', p, nderiv, glt_coefficients)
+    return [Rational(c.numerator, c.denominator) for c in phi]
+
+def _degree_limit(nderiv, t):
+    if nderiv == 0:
+        return Piecewise((S.One, Eq(cos(t), 1)), (S.Zero, True))
+    return S.Zero
+
+def _as_int(p):
+    if isinstance(p, (int, Integer)):
+        return int(p)
+    return None
+
+def _derivative_symbol(p, r, s, t, unit=S.One):
+    """Returns the symbol of the atomic form with derivatives of orders r and
+    s, divided by unit, for an integer degree p."""
+    n = r + s
+    phi = derivative_coefficients(p, n)
+
+    # ... the coefficients of exp(-ikt) are (-1)^n those of exp(ikt), hence
+    #     the symbol is a sum of cosines if n is even and of sines otherwise
+    sign = (-1)**s
+    if n % 2 == 0:
+        m = sign * phi[0] * cos(S.Zero) / unit
+        for i in range(1, p+1):
+            m += (2 * sign * phi[i] / unit) * cos(i * t)
+
+    else:
+        m = S.Zero
+        for i in range(1, p+1):
+            m += (2 * sympy_I * sign * phi[i] / unit) * sin(i * t)
+    # ...
+
+    return m
+# ...
+
+# ...
+class DerivativeSymbol(BasicGlt):
+    """
+    The symbol of the 1D atomic form int N_i^(r) N_j^(s), for splines of
+    degree p, where r (resp. s) is the order of the derivative of the test
+    (resp. trial) function,
+
+        (-1)^s sum_{k=-p}^{p} phi_k exp(i k t)
+
+    phi_k being the derivative of order r+s of the cardinal B-spline of degree
+    2p+1 at p+1-k. The symbol is real if r+s is even, and purely imaginary
+    otherwise. Mass, Stiffness, Advection and Bilaplacian are the symbols of
+    the orders (0,0), (1,1), (0,1) and (2,2); the advection symbol is divided
+    by the imaginary unit, to be real.
+
+    Examples
+
+    >>> DerivativeSymbol(1, 1, 1, t)
+    2 - 2*cos(t)
+    """
+    nargs = 4
+    _name = 'DerivativeSymbol'
+
+    # orders of the derivatives of the subclasses, and the (constant) factor
+    # dividing their symbol
+    _orders = None
+    _unit = S.One
 
     @classmethod
-    def eval(cls, p, t):
+    def eval(cls, p, r, s, t):
+        r = _as_int(r)
+        s = _as_int(s)
+        if r is None or s is None or r < 0 or s < 0:
+            raise ValueError('> the orders of the derivatives must be non '
+                             'negative integers')
+
+        return cls._evaluate(p, r, s, t)
 
+    @classmethod
+    def _evaluate(cls, p, r, s, t):
         if p is S.Infinity:
-            raise NotImplementedError('Add symbol limit for p -> oo')
+            return _degree_limit(r + s, t)
 
         elif isinstance(p, Symbol):
-            return Mass(p, t, evaluate=False)
+            return None
 
-        elif isinstance(p, int):
+        p = _as_int(p)
+        if not( p is None ):
+            return _derivative_symbol(p, r, s, t, unit=cls._unit)
 
-            # ...
-            r  = Symbol('r')
+    @property
+    def orders(self):
+        """The orders (r, s) of the derivatives of the test and trial
+        functions."""
+        if self._orders is None:
+            return (int(self.args[1]), int(self.args[2]))
+        return self._orders
 
-            pp = 2*p + 1
-            N = pp + 1
-            L = list(range(0, N + pp + 1))
+    @property
+    def degree(self):
+        return self.args[0]
 
-            b0 = bspline_basis(pp, L, 0, r)
-            bsp = lambdify(r, b0)
-            # ...
+    @property
+    def fourier_variable(self):
+        return self.args[-1]
 
-            # ... we use nsimplify to get the rational number
-            phi = []
-            for i in range(0, p+1):
-                y = bsp(p+1-i)
-                y = nsimplify(y, tolerance=TOLERANCE, rational=True)
-                phi.append(y)
-            # ...
+    @property
+    def is_imaginary_symbol(self):
+        """True if the symbol is purely imaginary for real values of t."""
+        r, s = self.orders
+        return ( (r + s) % 2 == 1 ) == ( self._unit == 1 )
 
-            # ...
-            m = phi[0] * cos(S.Zero)
-            for i in range(1, p+1):
-                m += 2 * phi[i] * cos(i * t)
-            # ...
+    def _sympystr(self, printer):
+        if self._orders:
+            return BasicGlt._sympystr(self, printer)
 
-            return m
+        sstr = printer.doprint
+        args = ', '.join(sstr(i) for i in self.args)
+        return '{name}({args})'.format(name=sstr(self.name), args=args)
 # ...
 
 # ...
-class Stiffness(BasicGlt):
+class Mass(DerivativeSymbol):
     """
-    A class for the stiffness symbol
+    A class for the mass symbol
     """
     nargs = 2
-    _name = 'Stiffness'
+    _name = 'Mass'
+    _nderiv = 0
+    _orders = (0, 0)
 
     @classmethod
     def eval(cls, p, t):
+        return cls._evaluate(p, 0, 0, t)
+# ...
 
-        if p is S.Infinity:
-            raise NotImplementedError('Add symbol limit for p -> oo')
+# ...
+class Stiffness(DerivativeSymbol):
+    """
+    A class for the stiffness symbol
+    """
+    nargs = 2
+    _name = 'Stiffness'
+    _nderiv = 2
+    _orders = (1, 1)
 
-        elif isinstance(p, Symbol):
-            return Stiffness(p, t, evaluate=False)
-
-        elif isinstance(p, int):
-
-            # ...
-            r  = Symbol('r')
-
-            pp = 2*p + 1
-            N = pp + 1
-            L = list(range(0, N + pp + 1))
-
-            b0    = bspline_basis(pp, L, 0, r)
-            b0_r  = diff(b0, r)
-            b0_rr = diff(b0_r, r)
-            bsp   = lambdify(r, b0_rr)
-            # ...
-
-            # ... we use nsimplify to get the rational number
-            phi = []
-            for i in range(0, p+1):
-                y = bsp(p+1-i)
-                y = nsimplify(y, tolerance=TOLERANCE, rational=True)
-                phi.append(y)
-            # ...
-
-            # ...
-            m = -phi[0] * cos(S.Zero)
-            for i in range(1, p+1):
-                m += -2 * phi[i] * cos(i * t)
-            # ...
-
-            return m
+    @classmethod
+    def eval(cls, p, t):
+        return cls._evaluate(p, 1, 1, t)
 # ...
 
 # ...
-class Advection(BasicGlt):
+class Advection(DerivativeSymbol):
     """
     A class for the advection symbol
     """
     nargs = 2
     _name = 'Advection'
+    _nderiv = 1
+    _orders = (0, 1)
+    _unit = sympy_I
 
     @classmethod
     def eval(cls, p, t):
-
-        if p is S.Infinity:
-            raise NotImplementedError('Add symbol limit for p -> oo')
-
-        elif isinstance(p, Symbol):
-            return Advection(p, t, evaluate=False)
-
-        elif isinstance(p, int):
-
-            # ...
-            r  = Symbol('r')
-
-            pp = 2*p + 1
-            N = pp + 1
-            L = list(range(0, N + pp + 1))
-
-            b0   = bspline_basis(pp, L, 0, r)
-            b0_r = diff(b0, r)
-            bsp  = lambdify(r, b0_r)
-            # ...
-
-            # ... we use nsimplify to get the rational number
-            phi = []
-            for i in range(0, p+1):
-                y = bsp(p+1-i)
-                y = nsimplify(y, tolerance=TOLERANCE, rational=True)
-                phi.append(y)
-            # ...
-
-            # ...
-            m = -phi[0] * cos(S.Zero)
-            for i in range(1, p+1):
-                m += -2 * phi[i] * sin(i * t)
-            # ...
-
-            return m
+        return cls._evaluate(p, 0, 1, t)
 # ...
 
 # ...
-class Bilaplacian(BasicGlt):
+class Bilaplacian(DerivativeSymbol):
     """
     A class for the bilaplacian symbol
     """
     nargs = 2
     _name = 'Bilaplacian'
+    _nderiv = 4
+    _orders = (2, 2)
 
     @classmethod
     def eval(cls, p, t):
+        return cls._evaluate(p, 2, 2, t)
+# ...
 
-        if p is S.Infinity:
-            raise NotImplementedError('Add symbol limit for p -> oo')
+# ...
+_glt_symbols = {'Mass':        Mass,
+                'Stiffness':   Stiffness,
+                'Advection':   Advection,
+                'Bilaplacian': Bilaplacian}
 
-        elif isinstance(p, Symbol):
-            return Bilaplacian(p, t, evaluate=False)
-
-        elif isinstance(p, int):
-
-            # ...
-            r  = Symbol('r')
-
-            pp = 2*p + 1
-            N = pp + 1
-            L = list(range(0, N + pp + 1))
-
-            b0    = bspline_basis(pp, L, 0, r)
-            b0_r  = diff(b0, r)
-            b0_rr = diff(b0_r, r)
-            b0_rrr = diff(b0_rr, r)
-            b0_rrrr = diff(b0_rrr, r)
-            bsp   = lambdify(r, b0_rrrr)
-            # ...
-
-            # ... we use nsimplify to get the rational number
-            phi = []
-            for i in range(0, p+1):
-                y = bsp(p+1-i)
-                y = nsimplify(y, tolerance=TOLERANCE, rational=True)
-                phi.append(y)
-            # ...
-
-            # ...
-            m = phi[0] * cos(S.Zero)
-            for i in range(1, p+1):
-                m += 2 * phi[i] * cos(i * t)
-            # ...
-
-            return m
+def symbol_orders(symbol):
+    """
+    Returns the orders (r, s) of the derivatives of a 1D GLT symbol, and the
+    factor dividing it (the imaginary unit for Advection, one otherwise).
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        a DerivativeSymbol
+    """
+    if isinstance(symbol, str):
+        if not symbol in _glt_symbols:
+            raise ValueError('> Unknown GLT symbol {}'.format(symbol))
+        symbol = _glt_symbols[symbol]
+
+    if isinstance(symbol, (tuple, list, Tuple)):
+        r, s = [int(i) for i in symbol]
+        if r < 0 or s < 0:
+            raise ValueError('> the orders of the derivatives must be non '
+                             'negative integers')
+        return r, s, S.One
+
+    if isinstance(symbol, type) and issubclass(symbol, DerivativeSymbol) \
+       and not( symbol._orders is None ):
+        r, s = symbol._orders
+        return r, s, symbol._unit
+
+    raise TypeError('> Expecting a 1D GLT symbol, got {}'.format(symbol))
 # ...
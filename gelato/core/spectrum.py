@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains functions to approximate the spectrum of the matrices
+associated to a weak formulation, by sampling its GLT symbol."""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from sympy import Symbol
+from sympy import lambdify
+from sympy import Matrix, ImmutableDenseMatrix
+
+from symfe.core import BilinearForm
+
+from .expr import gelatize
+from .expr import symbol_dtype
+from .expr import is_hermitian_symbol
+from .expr import coordinate_names
+
+
+# ...
+def glt_sampling_sizes(degrees, n_elements):
+    """
+    Returns the number of sampling points in every direction, which is the
+    number of degrees of freedom n + p.
+
+    degrees: int, list, tuple
+        spline degrees
+
+    n_elements: int, list, tuple
+        number of elements
+    """
+    if isinstance(degrees, int):
+        degrees = [degrees]
+
+    if isinstance(n_elements, int):
+        n_elements = [n_elements]*len(degrees)
+
+    if not( len(degrees) == len(n_elements) ):
+        raise ValueError('> degrees and n_elements must have the same size')
+
+    # TODO boundary condition
+    return [n + p for n, p in zip(n_elements, degrees)]
+# ...
+
+# ...
+def _lambdify_symbol(expr, dim, n_elements=None, constants=None):
+    """Returns a numpy function f(x, y, z, tx, ty, tz) of the symbol, after
+    substituting the number of elements and the constants."""
+    # ... values of the free symbols that are not sampling variables
+    values = {}
+    if not( n_elements is None ):
+        for x, n in zip(coordinate_names(dim), n_elements):
+            values['n{}'.format(x)] = n
+
+    if constants:
+        for k, v in constants.items():
+            values[str(k)] = v
+    # ...
+
+    xs = coordinate_names(dim)
+    ts = ['t{}'.format(x) for x in xs]
+    names = xs + ts
+
+    args = [Symbol(i) for i in names]
+    subs = {}
+    for s in expr.free_symbols:
+        if s.name in values:
+            subs[s] = values[s.name]
+
+        elif s.name in names:
+            subs[s] = args[names.index(s.name)]
+
+        else:
+            raise ValueError('> a value must be given for {}'.format(s.name))
+
+    expr = expr.subs(subs)
+
+    return lambdify(args, expr, 'numpy')
+# ...
+
+# ...
+def iter_symbol_samples(expr, ns,
+                        n_elements=None,
+                        constants=None,
+                        chunksize=2**18,
+                        dtype=None,
+                        start=0,
+                        stop=None):
+    """
+    Samples a symbol on the uniform grid of [0,1]^d x [-pi,pi]^d used by
+    glt_approximate_eigenvalues, by chunks of at most chunksize points. Yields
+    (start, values) where values are the samples of the flat indices
+    start, ..., start + len(values) - 1 of the grid (in C order).
+
+    expr: sympy.Expression
+        a scalar symbol, as returned by gelatize
+
+    ns: list, tuple
+        number of sampling points in every direction
+
+    n_elements: list, tuple
+        number of elements, substituted to nx, ny, nz if given
+
+    constants: dict
+        values of the constants of the weak formulation
+
+    chunksize: int
+        maximum number of points per chunk
+
+    dtype: numpy.dtype
+        data type of the samples. By default, float64 for a real symbol and
+        complex128 otherwise.
+
+    start, stop: int
+        only the flat indices start, ..., stop - 1 are sampled. By default,
+        the whole grid is sampled.
+    """
+    if isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        raise TypeError('> Expecting a scalar symbol')
+
+    if dtype is None:
+        dtype = symbol_dtype(expr)
+
+    dim = len(ns)
+    f = _lambdify_symbol(expr, dim, n_elements=n_elements, constants=constants)
+
+    xs = [np.linspace(0., 1., n) for n in ns]
+    ts = [np.linspace(-np.pi, np.pi, n) for n in ns]
+
+    if stop is None:
+        stop = int(np.prod(ns))
+
+    for i_start in range(start, stop, chunksize):
+        i_stop = min(i_start + chunksize, stop)
+
+        # ... position and Fourier variables of the chunk points
+        indices = np.unravel_index(np.arange(i_start, i_stop), ns)
+        args  = [x[i] for x, i in zip(xs, indices)]
+        args += [t[i] for t, i in zip(ts, indices)]
+        # ...
+
+        values = np.empty(i_stop - i_start, dtype=dtype)
+        values[:] = f(*args)
+
+        yield i_start, values
+# ...
+
+# ...
+def iter_block_symbol_samples(expr, ns,
+                              n_elements=None,
+                              constants=None,
+                              chunksize=2**16,
+                              dtype=None,
+                              start=0,
+                              stop=None):
+    """
+    Samples a matrix valued symbol on the same grid as iter_symbol_samples.
+    Yields (start, values) where values is an array of shape (m, k, l) that
+    stacks the samples of the flat indices start, ..., start + m - 1.
+
+    expr: sympy.Matrix
+        a block symbol, as returned by gelatize
+
+    See iter_symbol_samples for the other arguments.
+    """
+    if not isinstance(expr, (Matrix, ImmutableDenseMatrix)):
+        raise TypeError('> Expecting a block symbol')
+
+    if dtype is None:
+        dtype = symbol_dtype(expr)
+
+    dim = len(ns)
+    n_rows, n_cols = expr.shape
+    fs = [[_lambdify_symbol(expr[i,j], dim,
+                            n_elements=n_elements,
+                            constants=constants) for j in range(0, n_cols)]
+          for i in range(0, n_rows)]
+
+    xs = [np.linspace(0., 1., n) for n in ns]
+    ts = [np.linspace(-np.pi, np.pi, n) for n in ns]
+
+    if stop is None:
+        stop = int(np.prod(ns))
+
+    for i_start in range(start, stop, chunksize):
+        i_stop = min(i_start + chunksize, stop)
+
+        indices = np.unravel_index(np.arange(i_start, i_stop), ns)
+        args  = [x[i] for x, i in zip(xs, indices)]
+        args += [t[i] for t, i in zip(ts, indices)]
+
+        values = np.empty((i_stop - i_start, n_rows, n_cols), dtype=dtype)
+        for i in range(0, n_rows):
+            for j in range(0, n_cols):
+                values[:,i,j] = fs[i][j](*args)
+
+        yield i_start, values
+# ...
+
+# ...
+def is_hermitian_stack(F, tol=1.e-12):
+    """
+    Returns True if every matrix of the stack F, of shape (N, k, k), is
+    Hermitian.
+    """
+    if not( F.shape[-1] == F.shape[-2] ):
+        return False
+
+    FH = np.conj(np.swapaxes(F, -1, -2))
+    return np.allclose(F, FH, rtol=0., atol=tol*max(1., np.abs(F).max(initial=0.)))
+
+def _stack_eigenvalues(F, hermitian):
+    if hermitian:
+        return np.linalg.eigvalsh(F)
+    return np.linalg.eigvals(F)
+
+def block_eigenvalues(F, hermitian=None, n_workers=None, executor=None):
+    """
+    Computes the eigenvalues of a stack of matrices F, of shape (N, k, k), with
+    the batched numpy.linalg routines. Returns an array of shape (N, k), which
+    is real when the matrices are Hermitian.
+
+    F: numpy.ndarray
+        the sampled block symbol
+
+    hermitian: bool
+        uses eigvalsh if True, eigvals if False. The property is detected from
+        the samples if None.
+
+    n_workers: int
+        if larger than 1, the stack is split over a pool of processes
+
+    executor: concurrent.futures.Executor
+        an existing pool of n_workers processes to use
+    """
+    if hermitian is None:
+        hermitian = is_hermitian_stack(F)
+
+    if not n_workers or n_workers < 2 or len(F) < 2*n_workers:
+        return _stack_eigenvalues(F, hermitian)
+
+    parts = np.array_split(F, n_workers)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            values = list(executor.map(_stack_eigenvalues, parts,
+                                       [hermitian]*len(parts)))
+
+    else:
+        values = list(executor.map(_stack_eigenvalues, parts,
+                                   [hermitian]*len(parts)))
+
+    return np.concatenate(values)
+# ...
+
+# ...
+def glt_approximate_eigenvalues(expr, degrees, n_elements,
+                                constants=None,
+                                chunksize=2**18,
+                                out=None,
+                                filename=None,
+                                hermitian=None,
+                                n_workers=None,
+                                start=0,
+                                stop=None):
+    """
+    Approximates the eigenvalues of the matrix associated to a weak formulation
+    using a uniform sampling of its GLT symbol. The sampling is done by chunks,
+    so that only the output array is allocated at full size; it can be a
+    preallocated or memory-mapped array. The eigenvalues are stored as float64
+    for real symbols and Hermitian block symbols, and as complex128 otherwise.
+
+    expr: sympy.Expression, BilinearForm
+        a symbol as returned by gelatize, or a weak formulation
+
+    degrees: int, list, tuple
+        spline degrees
+
+    n_elements: int, list, tuple
+        number of elements
+
+    constants: dict
+        values of the constants of the weak formulation
+
+    chunksize: int
+        maximum number of points evaluated at once
+
+    out: numpy.ndarray
+        a 1D array, of size the number of sampling points (times the number of
+        blocks for a block symbol), where the approximate eigenvalues are
+        written
+
+    filename: str
+        if given (and out is None), the eigenvalues are written to a memory
+        mapped .npy file
+
+    hermitian: bool
+        for a block symbol, tells if the sampled matrices are Hermitian. It is
+        detected from the symbol if None.
+
+    n_workers: int
+        for a block symbol, number of processes used for the eigenvalue
+        computations
+
+    start, stop: int
+        only the sampling points of flat indices start, ..., stop - 1 are
+        treated, out being then of size stop - start (times the number of
+        blocks). By default, the whole grid is sampled.
+    """
+    if isinstance(degrees, int):
+        degrees = [degrees]
+
+    if isinstance(n_elements, int):
+        n_elements = [n_elements]*len(degrees)
+
+    if isinstance(expr, BilinearForm):
+        expr = gelatize(expr, degrees=degrees, n_elements=n_elements)
+
+    ns = glt_sampling_sizes(degrees, n_elements)
+    if stop is None:
+        stop = int(np.prod(ns))
+    size = stop - start
+
+    is_block = isinstance(expr, (Matrix, ImmutableDenseMatrix))
+    if is_block:
+        n_rows, n_cols = expr.shape
+        if not( n_rows == n_cols ):
+            raise ValueError('> Expecting a square block symbol')
+
+        size = size * n_rows
+
+        if hermitian is None:
+            hermitian = is_hermitian_symbol(expr)
+
+    # ... real symbols and Hermitian block symbols have real eigenvalues
+    if is_block:
+        dtype = np.dtype(np.float64) if hermitian else np.dtype(np.complex128)
+
+    else:
+        dtype = symbol_dtype(expr)
+    # ...
+
+    # ... output array
+    if out is None:
+        if filename is None:
+            out = np.empty(size, dtype=dtype)
+
+        else:
+            out = np.lib.format.open_memmap(filename, mode='w+',
+                                            dtype=dtype, shape=(size,))
+
+    elif not( out.shape == (size,) ):
+        raise ValueError('> out must be a 1D array of size {}'.format(size))
+    # ...
+
+    if is_block:
+        # ... the block symbol is sampled by chunks, whose eigenvalues are
+        #     computed with batched routines
+        executor = None
+        if n_workers and n_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=n_workers)
+
+        try:
+            chunksize = max(1, chunksize // n_rows)
+            for i_start, F in iter_block_symbol_samples(expr, ns,
+                                                        n_elements=n_elements,
+                                                        constants=constants,
+                                                        chunksize=chunksize,
+                                                        start=start,
+                                                        stop=stop):
+                values = block_eigenvalues(F, hermitian=hermitian,
+                                           n_workers=n_workers,
+                                           executor=executor).ravel()
+                i_start = (i_start - start) * n_rows
+                out[i_start:i_start+len(values)] = values
+
+        finally:
+            if not( executor is None ):
+                executor.shutdown()
+        # ...
+
+    else:
+        for i_start, values in iter_symbol_samples(expr, ns,
+                                                   n_elements=n_elements,
+                                                   constants=constants,
+                                                   chunksize=chunksize,
+                                                   dtype=out.dtype,
+                                                   start=start,
+                                                   stop=stop):
+            i_start = i_start - start
+            out[i_start:i_start+len(values)] = values
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
+# ...
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains the tables of the coefficients of the 1D GLT symbols,
+for all the degrees up to a maximum degree, so that a symbol can be evaluated
+for a degree that is only known at runtime, such as an argument of a
+generated kernel."""
+
+import threading
+
+import numpy as np
+
+from .glt import symbol_orders
+from .clenshaw import trig_clenshaw
+from .trigpoly import glt_trig_poly, _cos_sin_coefficients
+from .asymptotic import glt_asymptotic
+
+
+# ...
+class GltTable(object):
+    """
+    The cosine and sine coefficients of a 1D GLT symbol, for the degrees
+    0, ..., max_degree: the row p of the arrays a and b, of shape
+    (max_degree+1, max_degree+1), holds the coefficients of the symbol of
+    degree p, padded with zeros. The table is extended when a larger degree
+    is requested.
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        the derivatives of a DerivativeSymbol
+    """
+    def __init__(self, symbol, max_degree=0):
+        self._symbol = symbol
+        self._lock   = threading.Lock()
+
+        # ... the coefficients of a purely imaginary symbol are complex
+        r, s, unit = symbol_orders(symbol)
+        if ( (r + s) % 2 == 0 ) == ( unit == 1 ):
+            self._dtype = float
+        else:
+            self._dtype = complex
+        # ...
+
+        self._a = np.zeros((0, 0), dtype=self._dtype)
+        self._b = np.zeros((0, 0), dtype=self._dtype)
+        self._has_sine = False
+
+        self.extend(max_degree)
+
+    @property
+    def symbol(self):
+        return self._symbol
+
+    @property
+    def max_degree(self):
+        return len(self._a) - 1
+
+    def extend(self, max_degree):
+        """Computes the coefficients of the degrees up to max_degree."""
+        with self._lock:
+            n = len(self._a)
+            if max_degree < n:
+                return
+
+            # the table is (at least) doubled, to amortize the extensions
+            max_degree = max(max_degree, 2*n - 1)
+
+            a = np.zeros((max_degree+1, max_degree+1), dtype=self._dtype)
+            b = np.zeros((max_degree+1, max_degree+1), dtype=self._dtype)
+            a[:n, :n] = self._a
+            b[:n, :n] = self._b
+
+            for p in range(n, max_degree+1):
+                ap, bp = _cos_sin_coefficients(glt_trig_poly(self._symbol, p).coeffs)
+                if self._dtype is float:
+                    ap = ap.real
+                    bp = bp.real
+                a[p, :p+1] = ap
+                b[p, :p+1] = bp
+
+            self._has_sine = b.any()
+            self._a = a
+            self._b = b
+
+    def coefficients(self, p):
+        """
+        Returns the arrays (a, b), of size p+1, of the cosine and sine
+        coefficients of the symbol of degree p. b is None if the symbol has no
+        sine.
+        """
+        p = int(p)
+        if p < 0:
+            raise ValueError('> Expecting a non negative degree')
+
+        self.extend(p)
+
+        a = self._a[p, :p+1]
+        b = self._b[p, :p+1] if self._has_sine else None
+        return a, b
+
+    def __call__(self, p, t):
+        """
+        Evaluates the symbol of degree p using the Clenshaw recurrence.
+
+        p: int
+            spline degree
+
+        t: float, numpy.ndarray
+            the points
+        """
+        a, b = self.coefficients(p)
+        return trig_clenshaw(a, b, t)
+
+    def __repr__(self):
+        symbol = self._symbol
+        if isinstance(symbol, type):
+            symbol = symbol._name
+        return 'GltTable({symbol}, max_degree={p})'.format(symbol=symbol,
+                                                           p=self.max_degree)
+# ...
+
+# ... the tables of the 1D GLT symbols, shared by the process
+_glt_tables = {}
+_lock = threading.Lock()
+
+def glt_table(symbol):
+    """
+    Returns the (process-wide) GltTable of a 1D GLT symbol.
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        the derivatives of a DerivativeSymbol
+    """
+    r, s, unit = symbol_orders(symbol)
+    key = (r, s, str(unit))
+    with _lock:
+        table = _glt_tables.get(key, None)
+        if table is None:
+            table = GltTable(symbol)
+            _glt_tables[key] = table
+
+    return table
+
+# ... from this degree, the symbols are evaluated from their aliasing sum, with
+#     a few terms, instead of building the exact symbols
+_asymptotic_degree = 20
+
+def glt_symbol(symbol, p, t):
+    """
+    Evaluates a 1D GLT symbol for a degree known at runtime, using the table
+    of its coefficients, or the aliasing sum of the symbol for large degrees
+    (see glt_asymptotic). This is the function called by the kernels
+    generated without degrees.
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        the derivatives of a DerivativeSymbol
+
+    p: int
+        spline degree
+
+    t: float, numpy.ndarray
+        the points
+    """
+    if p >= _asymptotic_degree:
+        return glt_asymptotic(symbol, p, t)
+
+    return glt_table(symbol)(p, t)
+# ...
@@ -0,0 +1,60 @@
+# coding: utf-8
+
+from numpy import linspace, pi, allclose, inf, all as np_all
+
+from sympy import Symbol
+from sympy import lambdify
+
+from gelato.core import Mass, Stiffness, Advection, Bilaplacian
+from gelato.core import aliasing_terms
+from gelato.core import glt_asymptotic
+from gelato.core import glt_symbol
+
+# ...
+def test_asymptotic_1():
+    print('============ test_asymptotic_1 ==============')
+
+    t = Symbol('t')
+    ts = linspace(-pi, pi, 101)
+
+    # ... the aliasing sum agrees with the exact symbols
+    for symbol in [Mass, Stiffness, Advection, Bilaplacian]:
+        for p in [6, 9, 14]:
+            expected = lambdify(t, symbol(p, t), 'numpy')(ts) + 0.*ts
+            assert( allclose(glt_asymptotic(symbol, p, ts), expected,
+                             rtol=0., atol=1.e-13) )
+    # ...
+
+    # ... the symbols are 2 pi periodic
+    assert( allclose(glt_asymptotic(Mass, 8, ts + 2*pi), glt_asymptotic(Mass, 8, ts)) )
+    # ...
+# ...
+
+# ...
+def test_asymptotic_2():
+    print('============ test_asymptotic_2 ==============')
+
+    ts = linspace(-pi, pi, 101)
+
+    # ... the number of terms decreases with the degree
+    assert( aliasing_terms(40, nderiv=2) <= aliasing_terms(10, nderiv=2) )
+    assert( aliasing_terms(40, nderiv=4) <= 2 )
+    # ...
+
+    # ... large degrees, and their limit
+    m = glt_asymptotic(Mass, 50, ts)
+    assert( abs(glt_asymptotic(Mass, 50, 0.) - 1.) < 1.e-14 )
+    assert( np_all(m > 0.) and np_all(m <= 1.) )
+
+    assert( allclose(glt_symbol('Stiffness', 50, ts),
+                     glt_asymptotic(Stiffness, 50, ts)) )
+
+    m = glt_asymptotic(Mass, inf, [0., 1., 2*pi])
+    assert( allclose(m, [1., 0., 1.]) )
+    # ...
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_asymptotic_1()
+    test_asymptotic_2()
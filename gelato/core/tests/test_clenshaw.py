@@ -0,0 +1,52 @@
+# coding: utf-8
+
+from numpy import linspace, pi, allclose
+
+from sympy import Symbol
+from sympy import lambdify
+
+from gelato.core import Mass, Stiffness, Advection, Bilaplacian
+from gelato.core import trig_coefficients
+from gelato.core import trig_clenshaw
+
+# ...
+def test_clenshaw_1d_1():
+    print('============ test_clenshaw_1d_1 ==============')
+
+    t = Symbol('t')
+    ts = linspace(-pi, pi, 101)
+
+    for p in [1, 2, 5, 9]:
+        for symbol in [Mass, Stiffness, Advection, Bilaplacian]:
+            expr = symbol(p, t)
+            a, b = trig_coefficients(expr, t)
+            assert( len(a) <= p+1 )
+
+            expected = lambdify(t, expr, 'numpy')(ts) + 0. * ts
+            assert( allclose(trig_clenshaw(a, b, ts), expected) )
+
+            # ... scalar evaluation
+            assert( allclose(trig_clenshaw(a, b, ts[3]), expected[3]) )
+# ...
+
+# ...
+def test_clenshaw_1d_2():
+    print('============ test_clenshaw_1d_2 ==============')
+
+    t = Symbol('t')
+    ts = linspace(-pi, pi, 101)
+
+    # ... complex polynomial, with vanishing cosine coefficients
+    expr = 1j * Advection(3, t)
+    a, b = trig_coefficients(expr, t)
+    assert( allclose(a, 0.) )
+
+    expected = lambdify(t, expr, 'numpy')(ts)
+    assert( allclose(trig_clenshaw(None, b, ts), expected) )
+# ...
+
+###############################################
+if __name__ == '__main__':
+
+    test_clenshaw_1d_1()
+    test_clenshaw_1d_2()
@@ -0,0 +1,127 @@
+# coding: utf-8
+
+# These tests can be run in parallel with
+#     mpirun -n 4 python3 gelato/core/tests/test_distributed.py
+# They are skipped if mpi4py is not available.
+
+import os
+import tempfile
+
+import pytest
+
+from numpy import allclose, array_equal, quantile, histogram
+
+from sympy import symbols
+
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+requires_mpi = pytest.mark.skipif(MPI is None,
+                                  reason='mpi4py is not available')
+
+from gelato.core import Mass, Stiffness
+from gelato.core import glt_approximate_eigenvalues
+from gelato.core import local_range
+from gelato.core import distributed_eigenvalues
+from gelato.core import global_size, global_min, global_max
+from gelato.core import global_histogram
+from gelato.core import global_quantiles
+from gelato.core import write_shards, read_shards
+
+# ...
+def _symbol():
+    tx, ty, tz = symbols('tx ty tz')
+
+    n = 8
+    p = 2
+    symbol = ( Stiffness(p, tx) * Mass(p, ty) * Mass(p, tz) +
+               Mass(p, tx) * Stiffness(p, ty) * Mass(p, tz) +
+               Mass(p, tx) * Mass(p, ty) * Stiffness(p, tz) ) * n
+
+    return symbol, [p, p, p], [n, n, n]
+# ...
+
+# ...
+def test_local_range():
+    print('============ test_local_range ==============')
+
+    for size in [0, 3, 10, 101]:
+        for n_procs in [1, 2, 4, 7]:
+            ranges = [local_range(size, n_procs, rank) for rank in range(0, n_procs)]
+
+            assert( ranges[0][0] == 0 )
+            assert( ranges[-1][1] == size )
+            for (a, b), (c, d) in zip(ranges[:-1], ranges[1:]):
+                assert( b == c )
+                assert( b - a >= d - c )
+# ...
+
+# ...
+@requires_mpi
+def test_distributed_3d_1():
+    print('============ test_distributed_3d_1 ==============')
+
+    comm = MPI.COMM_WORLD
+
+    symbol, degrees, n_elements = _symbol()
+
+    # ... every process samples its own block
+    start, local = distributed_eigenvalues(symbol, degrees, n_elements,
+                                           comm=comm)
+
+    reference = glt_approximate_eigenvalues(symbol, degrees, n_elements)
+    assert( allclose(local, reference[start:start+len(local)]) )
+    # ...
+
+    # ... global reductions
+    assert( global_size(local, comm=comm) == len(reference) )
+    assert( global_min(local, comm=comm) == reference.min() )
+    assert( global_max(local, comm=comm) == reference.max() )
+
+    counts, edges = global_histogram(local, bins=16, comm=comm)
+    counts_ref, edges_ref = histogram(reference, bins=16,
+                                      range=(reference.min(), reference.max()))
+    assert( array_equal(counts, counts_ref) )
+    assert( allclose(edges, edges_ref) )
+
+    qs = [0., 0.1, 0.25, 0.5, 0.9, 1.]
+    values = global_quantiles(local, qs, comm=comm)
+    assert( array_equal(values, quantile(reference, qs, method='lower')) )
+    # ...
+# ...
+
+# ...
+@requires_mpi
+def test_distributed_3d_2():
+    print('============ test_distributed_3d_2 ==============')
+
+    comm = MPI.COMM_WORLD
+
+    symbol, degrees, n_elements = _symbol()
+
+    start, local = distributed_eigenvalues(symbol, degrees, n_elements,
+                                           comm=comm)
+
+    # ... the shards are written concurrently, then read as one array
+    folder = None
+    if comm.Get_rank() == 0:
+        folder = tempfile.mkdtemp()
+    folder = comm.bcast(folder, root=0)
+
+    prefix = os.path.join(folder, 'eigenvalues')
+    write_shards(local, start, prefix, comm=comm)
+
+    values = read_shards(prefix)
+    reference = glt_approximate_eigenvalues(symbol, degrees, n_elements)
+    assert( allclose(values, reference) )
+    # ...
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_local_range()
+    if MPI is not None:
+        test_distributed_3d_1()
+        test_distributed_3d_2()
@@ -6,6 +6,10 @@ from sympy import symbols
 from sympy import pi, cos, sin
 from sympy import srepr
 from sympy import I
+from sympy import Matrix
+from sympy import lambdify
+
+from numpy import linspace, meshgrid, allclose
 
 from symfe.core import dx, dy, dz
 from symfe.core import Constant
@@ -17,6 +21,10 @@ from symfe.core import VectorTestFunction
 from symfe.core import BilinearForm
 
 from gelato.core import gelatize
+from gelato.core import separate_axes
+from gelato.core import symbol_kind
+from gelato.core import is_hermitian_symbol
+from gelato.core import TensorTrigPoly
 from gelato.core import (Mass,
                          Stiffness,
                          Advection,
@@ -165,9 +173,114 @@ def test_gelatize_2d_4():
     print('> gelatized >>> {0}'.format(gelatize(expr)))
 # ...
 
+# ...
+def test_gelatize_2d_5():
+    print('============ test_gelatize_2d_5 =============')
+
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    nx, ny = symbols('nx ny', integer=True)
+    px, py = symbols('px py', integer=True)
+    tx, ty = symbols('tx ty')
+
+    # ...
+    expr = gelatize(BilinearForm((v,u), dot(grad(v), grad(u))))
+    terms = separate_axes(expr, 2)
+
+    assert(len(terms) == 2)
+    assert((nx/ny, (Stiffness(px,tx), Mass(py,ty))) in terms)
+    assert((ny/nx, (Mass(px,tx), Stiffness(py,ty))) in terms)
+    # ...
+
+    # ...
+    expr = gelatize(BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v))
+    terms = separate_axes(expr, 2)
+
+    assert(len(terms) == 3)
+    assert((I/ny, (Advection(px,tx), Mass(py,ty))) in terms)
+    # ...
+# ...
+
+# ...
+def test_gelatize_2d_6():
+    print('============ test_gelatize_2d_6 =============')
+
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    bx = Constant('bx')
+    by = Constant('by')
+    b = Tuple(bx, by)
+
+    # ...
+    expr = gelatize(BilinearForm((v,u), dot(grad(v), grad(u)) + u*v))
+    assert(symbol_kind(expr) == 'real')
+
+    expr = gelatize(BilinearForm((v,u), dx(u) * v))
+    assert(symbol_kind(expr) == 'imaginary')
+
+    expr = gelatize(BilinearForm((v,u), dot(grad(v), grad(u)) + dx(u)*v))
+    assert(symbol_kind(expr) == 'complex')
+
+    expr = gelatize(BilinearForm((v,u), dot(b, grad(v)) * dot(b, grad(u))))
+    assert(symbol_kind(expr) == 'real')
+    # ...
+
+    # ...
+    tx, ty = symbols('tx ty')
+    px, py = symbols('px py', integer=True)
+
+    a = I*Advection(px,tx)*Mass(py,ty)
+    assert(is_hermitian_symbol(Matrix([[Stiffness(px,tx), a], [-a, Mass(px,tx)]])))
+    assert(not is_hermitian_symbol(Matrix([[Stiffness(px,tx), a], [a, Mass(px,tx)]])))
+    # ...
+# ...
+
+# ...
+def test_gelatize_2d_7():
+    print('============ test_gelatize_2d_7 =============')
+
+    V = H1Space('V', ldim=2)
+
+    v = TestFunction(V, name='v')
+    u = TestFunction(V, name='u')
+
+    tx, ty = symbols('tx ty')
+
+    degrees = [3, 2]
+    n_elements = [16, 8]
+
+    ts = [linspace(-3.14, 3.14, 17), linspace(-3.14, 3.14, 9)]
+    T1, T2 = meshgrid(*ts, indexing='ij')
+
+    # ... the numeric symbol agrees with the sympy one
+    for expr in [dot(grad(v), grad(u)) + u*v,
+                 dot(grad(v), grad(u)) + 3*dx(u)*v + 2*v*dy(u)]:
+        a = BilinearForm((v,u), expr)
+
+        symbol = gelatize(a, degrees=degrees, n_elements=n_elements)
+        f = gelatize(a, degrees=degrees, n_elements=n_elements, numeric=True)
+
+        assert(isinstance(f, TensorTrigPoly))
+        assert(f.degrees == tuple(degrees))
+        assert(f.is_real == (symbol_kind(symbol) == 'real'))
+
+        expected = lambdify((tx, ty), symbol, 'numpy')(T1, T2)
+        assert(allclose(f(*ts), expected))
+    # ...
+# ...
+
 # .....................................................
 if __name__ == '__main__':
     test_gelatize_2d_1()
 #    test_gelatize_2d_2()
     test_gelatize_2d_3()
     test_gelatize_2d_4()
+    test_gelatize_2d_5()
+    test_gelatize_2d_6()
+    test_gelatize_2d_7()
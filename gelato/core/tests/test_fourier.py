@@ -0,0 +1,94 @@
+# coding: utf-8
+
+from numpy import allclose, meshgrid
+
+from sympy import Symbol
+from sympy import symbols
+from sympy import lambdify
+from sympy import I
+from sympy import Float
+from sympy import cos
+
+from gelato.core import Mass, Stiffness, Advection, Bilaplacian
+from gelato.core import fourier_grid
+from gelato.core import fourier_coefficients
+from gelato.core import evaluate_on_grid
+from gelato.core import evaluate_on_tensor_grid
+
+# ...
+def test_fourier_1d_1():
+    print('============ test_fourier_1d_1 ==============')
+
+    t = Symbol('t')
+
+    for p in [1, 2, 5]:
+        for symbol in [Mass(p, t), Stiffness(p, t), Advection(p, t),
+                       Bilaplacian(p, t), Mass(p, t) + I*Advection(p, t)]:
+            f = lambdify(t, symbol, 'numpy')
+
+            # ... n is smaller or larger than the number of coefficients
+            for n in [3, 4, 65]:
+                for endpoint in [True, False]:
+                    ts = fourier_grid(n, endpoint=endpoint)
+                    w = evaluate_on_grid(symbol, n, endpoint=endpoint)
+                    assert( allclose(w, f(ts)) )
+            # ...
+# ...
+
+# ...
+def test_fourier_1d_2():
+    print('============ test_fourier_1d_2 ==============')
+
+    t = Symbol('t')
+
+    # ... real symbols are returned as float64
+    w = evaluate_on_grid(Stiffness(3, t), 17)
+    assert( w.dtype.kind == 'f' )
+
+    w = evaluate_on_grid(Mass(3, t) + I*Advection(3, t), 17)
+    assert( w.dtype.kind == 'c' )
+    # ...
+# ...
+
+# ...
+def test_fourier_1d_3():
+    print('============ test_fourier_1d_3 ==============')
+
+    t = Symbol('t')
+
+    # ... the frequencies may be integral floats, as in the generated code
+    c = fourier_coefficients(1 + 4*cos(Float(2.)*t), t)
+    assert( allclose(c, [2., 0., 1., 0., 2.]) )
+
+    try:
+        fourier_coefficients(cos(Float(2.5)*t), t)
+        assert( False )
+    except ValueError:
+        pass
+    # ...
+# ...
+
+# ...
+def test_fourier_3d_1():
+    print('============ test_fourier_3d_1 ==============')
+
+    tx, ty, tz = symbols('tx ty tz')
+
+    symbol = ( 4 * Stiffness(2, tx) * Mass(3, ty) * Mass(1, tz) +
+               Mass(2, tx) * Stiffness(3, ty) * Mass(1, tz) / 2 +
+               Mass(2, tx) * Mass(3, ty) * Stiffness(1, tz) )
+
+    ns = [9, 10, 11]
+    w = evaluate_on_tensor_grid(symbol, ns)
+
+    f = lambdify((tx, ty, tz), symbol, 'numpy')
+    ts = meshgrid(*[fourier_grid(n) for n in ns], indexing='ij')
+    assert( allclose(w, f(*ts)) )
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_fourier_1d_1()
+    test_fourier_1d_2()
+    test_fourier_1d_3()
+    test_fourier_3d_1()
@@ -2,10 +2,15 @@
 
 from sympy.core import Symbol
 from sympy import cos, sin
+from sympy import Rational
 
 from matplotlib import pyplot as plt
 
 from gelato.core import Mass, Stiffness, Advection, Bilaplacian
+from gelato.core import DerivativeSymbol
+from gelato.core import SymbolCache
+from gelato.core import glt_coefficients
+from gelato.core import symbol_cache_info, clear_symbol_cache
 
 # ...
 def test_glt_symbol_1():
@@ -18,24 +23,24 @@ def test_glt_symbol_1():
     three = 3
 
     # ... linear splines
-    assert( Mass(one, t) == cos(t)/3 + 2/3 )
+    assert( Mass(one, t) == cos(t)/3 + Rational(2,3) )
     assert( Stiffness(one, t) == -2*cos(t) + 2 )
     assert( Advection(one, t) == -sin(t) )
     assert( Bilaplacian(one, t) == 0 )
     # ...
 
     # ... quadratic splines
-    assert( Mass(two, t) == 13*cos(t)/30 + cos(2*t)/60 + 11/20 )
+    assert( Mass(two, t) == 13*cos(t)/30 + cos(2*t)/60 + Rational(11,20) )
     assert( Stiffness(two, t) == -2*cos(t)/3 - cos(2*t)/3 + 1 )
     assert( Advection(two, t) == -5*sin(t)/6 - sin(2*t)/12 )
     assert( Bilaplacian(two, t) == -8*cos(t) + 2*cos(2*t) + 6 )
     # ...
 
     # ... cubic splines
-    assert( Mass(three, t) == 397*cos(t)/840 + cos(2*t)/21 + cos(3*t)/2520 + 4793650774/9999999959 )
-    assert( Stiffness(three, t) == -cos(t)/4 - 2*cos(2*t)/5 - cos(3*t)/60 + 2/3)
+    assert( Mass(three, t) == 397*cos(t)/840 + cos(2*t)/21 + cos(3*t)/2520 + Rational(151,315) )
+    assert( Stiffness(three, t) == -cos(t)/4 - 2*cos(2*t)/5 - cos(3*t)/60 + Rational(2,3))
     assert( Advection(three, t) == -49*sin(t)/72 - 7*sin(2*t)/45 - sin(3*t)/360 )
-    assert( Bilaplacian(three, t) == -3*cos(t) + cos(3*t)/3 + 8/3 )
+    assert( Bilaplacian(three, t) == -3*cos(t) + cos(3*t)/3 + Rational(8,3) )
     # ...
 
 #    p = 3
@@ -45,6 +50,66 @@ def test_glt_symbol_1():
 #    print(Bilaplacian(p, t))
 # ...
 
+# ...
+def test_glt_symbol_3():
+    print('============ test_glt_symbol_3 ==============')
+
+    t = Symbol('t')
+
+    # ... high degree symbols are exact:
+    #     the mass symbol is 1 at t = 0, the others vanish at t = 0
+    for p in [5, 8, 12]:
+        assert( Mass(p, t).subs(t, 0) == 1 )
+        assert( Stiffness(p, t).subs(t, 0) == 0 )
+        assert( Advection(p, t).subs(t, 0) == 0 )
+        assert( Bilaplacian(p, t).subs(t, 0) == 0 )
+    # ...
+
+    # ... the stiffness symbol of degree p is (2-2cos(t)) times the mass
+    #     symbol of degree p-1
+    p = 6
+    e = Stiffness(p, t) - (2 - 2*cos(t))*Mass(p-1, t)
+    for v in [0.1, 0.7, 2.3]:
+        assert( abs(e.subs(t, v).evalf()) < 1.e-12 )
+    # ...
+# ...
+
+# ...
+def test_glt_symbol_4():
+    print('============ test_glt_symbol_4 ==============')
+
+    import tempfile
+
+    t = Symbol('t')
+
+    # ... the process-wide cache is shared by all the symbols
+    clear_symbol_cache()
+
+    Mass(4, t) ; Stiffness(4, t)
+    info = symbol_cache_info()
+    assert( info.misses == 2 and info.hits == 0 )
+
+    Mass(4, t) ; Stiffness(4, t) ; Mass(4, t)
+    info = symbol_cache_info()
+    assert( info.misses == 2 and info.hits == 3 )
+    # ...
+
+    # ... LRU eviction and on-disk tier
+    with tempfile.TemporaryDirectory() as folder:
+        cache = SymbolCache(maxsize=2, cache_dir=folder)
+        for p in [1, 2, 3]:
+            cache.get('Mass', p, 0, glt_coefficients)
+        assert( cache.cache_info().currsize == 2 )
+
+        # the evicted entry is read back from the disk
+        cache = SymbolCache(maxsize=2, cache_dir=folder)
+        phi = cache.get('Mass', 1, 0, glt_coefficients)
+        info = cache.cache_info()
+        assert( info.disk_hits == 1 and info.misses == 0 )
+        assert( list(phi) == glt_coefficients(1, 0) )
+    # ...
+# ...
+
 # ...
 def test_glt_symbol_2():
     print('============ test_glt_symbol_2 ==============')
@@ -58,7 +123,52 @@ def test_glt_symbol_2():
     l = limit(Mass(p, t), p, oo)
     print(l)
 
+    # ... the mass symbol tends to one on 2 pi Z and to zero elsewhere, the
+    #     other symbols tend to zero
+    assert( l == Mass(oo, t) )
+    assert( Mass(oo, 0) == 1 and Mass(oo, 1) == 0 )
+    assert( Stiffness(oo, t) == 0 )
+    assert( Advection(oo, t) == 0 )
+    assert( Bilaplacian(oo, t) == 0 )
+    # ...
+# ...
+
+# ...
+def test_glt_symbol_5():
+    print('============ test_glt_symbol_5 ==============')
+
+    from sympy import I, expand
+
+    t = Symbol('t')
+
+    for p in [1, 2, 3]:
+        assert( DerivativeSymbol(p, 0, 0, t) == Mass(p, t) )
+        assert( DerivativeSymbol(p, 1, 1, t) == Stiffness(p, t) )
+        assert( DerivativeSymbol(p, 2, 2, t) == Bilaplacian(p, t) )
+        assert( expand(DerivativeSymbol(p, 0, 1, t) - I*Advection(p, t)) == 0 )
+        assert( expand(DerivativeSymbol(p, 1, 0, t) + I*Advection(p, t)) == 0 )
+        assert( expand(DerivativeSymbol(p, 0, 2, t) + Stiffness(p, t)) == 0 )
+
+    # ... orders that are not covered by the other classes
+    print(DerivativeSymbol(2, 1, 2, t))
+    assert( DerivativeSymbol(1, 2, 3, t) == 0 )
+    assert( DerivativeSymbol(1, 3, 3, t) == 0 )
+    # ...
+
+    # ... unevaluated symbols
+    p = Symbol('p')
+    d = DerivativeSymbol(p, 1, 2, t)
+    assert( d.orders == (1, 2) )
+    assert( d.is_imaginary_symbol )
+    assert( not DerivativeSymbol(p, 1, 3, t).is_imaginary_symbol )
+    assert( not Advection(p, t).is_imaginary_symbol )
+    # ...
+# ...
+
 # .....................................................
 if __name__ == '__main__':
     test_glt_symbol_1()
-#    test_glt_symbol_2()
+    test_glt_symbol_2()
+    test_glt_symbol_3()
+    test_glt_symbol_4()
+    test_glt_symbol_5()
@@ -0,0 +1,152 @@
+# coding: utf-8
+
+import os
+import tempfile
+
+from numpy import allclose, load, meshgrid, linspace, pi
+from numpy import sort
+from numpy.random import rand
+from numpy.linalg import eigvals
+
+from sympy import Symbol
+from sympy import symbols
+from sympy import lambdify
+from sympy import Matrix
+from sympy import I
+
+from gelato.core import Mass, Stiffness, Advection
+from gelato.core import glt_approximate_eigenvalues
+from gelato.core import iter_symbol_samples
+from gelato.core import block_eigenvalues
+
+# ...
+def _symbol_2d():
+    x = Symbol('x')
+    tx, ty = symbols('tx ty')
+    nx, ny = symbols('nx ny', integer=True)
+    c = Symbol('c')
+
+    return ( nx*Stiffness(2,tx)*Mass(3,ty)/ny +
+             ny*Mass(2,tx)*Stiffness(3,ty)/nx +
+             c*x*Mass(2,tx)*Mass(3,ty)/(nx*ny) )
+# ...
+
+# ...
+def test_spectrum_2d_1():
+    print('============ test_spectrum_2d_1 ==============')
+
+    expr = _symbol_2d()
+
+    degrees    = [2, 3]
+    n_elements = [8, 6]
+    constants  = {'c': 2.}
+
+    # ... reference: sampling on the full meshgrid
+    x, y = symbols('x y')
+    tx, ty = symbols('tx ty')
+    nx, ny = symbols('nx ny', integer=True)
+
+    f = lambdify((x, y, tx, ty), expr.subs({nx: 8, ny: 6, Symbol('c'): 2.}))
+
+    u  = [linspace(0., 1., 10), linspace(0., 1., 9)]
+    ts = [linspace(-pi, pi, 10), linspace(-pi, pi, 9)]
+    X, Y = meshgrid(*u, indexing='ij')
+    T1, T2 = meshgrid(*ts, indexing='ij')
+
+    expected = f(X, Y, T1, T2).ravel()
+    # ...
+
+    # ... the result must not depend on the chunk size
+    for chunksize in [7, 1000]:
+        w = glt_approximate_eigenvalues(expr, degrees, n_elements,
+                                        constants=constants,
+                                        chunksize=chunksize)
+        assert( allclose(w, expected) )
+
+    # real symbols have real spectra
+    assert( w.dtype.kind == 'f' )
+    # ...
+
+    # ... streaming into a memory mapped file
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, 'eigen.npy')
+        glt_approximate_eigenvalues(expr, degrees, n_elements,
+                                    constants=constants,
+                                    chunksize=11,
+                                    filename=filename)
+        assert( allclose(load(filename), expected) )
+    # ...
+# ...
+
+# ...
+def test_spectrum_2d_2():
+    print('============ test_spectrum_2d_2 ==============')
+
+    expr = _symbol_2d()
+
+    # ... chunks cover the grid without overlapping
+    ns = [10, 9]
+    size = 0
+    for start, values in iter_symbol_samples(expr, ns,
+                                             n_elements=[8, 6],
+                                             constants={'c': 1.},
+                                             chunksize=16):
+        assert( len(values) <= 16 )
+        assert( start == size )
+        size += len(values)
+
+    assert( size == 90 )
+    # ...
+# ...
+
+# ...
+def test_spectrum_block_1():
+    print('============ test_spectrum_block_1 ==============')
+
+    # ... Hermitian and non Hermitian stacks, compared to a point-wise loop
+    F = rand(50, 3, 3) + 1.j*rand(50, 3, 3)
+    for G in [F, F + F.conj().transpose(0, 2, 1)]:
+        expected = [sort(eigvals(G[i])) for i in range(0, len(G))]
+
+        for n_workers in [None, 2]:
+            w = block_eigenvalues(G, n_workers=n_workers)
+            assert( w.shape == (50, 3) )
+            for i in range(0, len(G)):
+                assert( allclose(sort(w[i]), expected[i]) )
+    # ...
+
+    # ... Hermitian stacks give real eigenvalues
+    G = F + F.conj().transpose(0, 2, 1)
+    assert( block_eigenvalues(G).dtype.kind == 'f' )
+    # ...
+# ...
+
+# ...
+def test_spectrum_block_2():
+    print('============ test_spectrum_block_2 ==============')
+
+    tx, ty = symbols('tx ty')
+
+    a = I*Advection(2,tx)*Advection(2,ty)
+    expr = Matrix([[Stiffness(2,tx)*Mass(2,ty), a],
+                   [-a, Mass(2,tx)*Stiffness(2,ty)]])
+
+    degrees    = [2, 2]
+    n_elements = [8, 6]
+
+    w1 = glt_approximate_eigenvalues(expr, degrees, n_elements, chunksize=13)
+    w2 = glt_approximate_eigenvalues(expr, degrees, n_elements,
+                                     hermitian=False, n_workers=2)
+
+    assert( w1.shape == (2*10*8,) )
+    assert( w1.dtype.kind == 'f' )
+    assert( allclose(sort(w1.real), sort(w2.real)) )
+    assert( allclose(w2.imag, 0.) )
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_spectrum_2d_1()
+    test_spectrum_2d_2()
+    test_spectrum_block_1()
+    test_spectrum_block_2()
@@ -0,0 +1,70 @@
+# coding: utf-8
+
+from numpy import linspace, pi, allclose
+
+from sympy import Symbol
+from sympy import lambdify
+
+from gelato.core import Mass, Stiffness, Advection, Bilaplacian
+from gelato.core import DerivativeSymbol
+from gelato.core import GltTable
+from gelato.core import glt_table, glt_symbol
+from gelato.core import glt_asymptotic
+
+# ...
+def test_table_1():
+    print('============ test_table_1 ==============')
+
+    t = Symbol('t')
+    ts = linspace(-pi, pi, 65)
+
+    # ... the table gives the symbols of every degree
+    for symbol in [Mass, Stiffness, Advection, Bilaplacian]:
+        for p in range(1, 9):
+            expected = lambdify(t, symbol(p, t), 'numpy')(ts) + 0.*ts
+            assert( allclose(glt_symbol(symbol, p, ts), expected) )
+            assert( allclose(glt_symbol(symbol._name, p, ts), expected) )
+    # ...
+# ...
+
+# ...
+def test_table_2():
+    print('============ test_table_2 ==============')
+
+    table = GltTable(Mass, max_degree=3)
+    assert( table.max_degree == 3 )
+
+    # ... the table is extended on demand
+    a, b = table.coefficients(5)
+    assert( len(a) == 6 and b is None )
+    assert( table.max_degree >= 5 )
+
+    a, b = glt_table('Advection').coefficients(3)
+    assert( len(b) == 4 )
+    # ...
+# ...
+
+# ...
+def test_table_3():
+    print('============ test_table_3 ==============')
+
+    t = Symbol('t')
+    ts = linspace(-pi, pi, 65)
+
+    # ... any pair of derivative orders, including the purely imaginary symbols
+    for orders in [(0, 1), (0, 2), (1, 2), (2, 3), (3, 3)]:
+        for p in [3, 5, 25]:
+            if p < 20:
+                expr = DerivativeSymbol(p, orders[0], orders[1], t)
+                expected = lambdify(t, expr, 'numpy')(ts) + 0.*ts
+            else:
+                expected = glt_asymptotic(orders, p, ts)
+            assert( allclose(glt_symbol(orders, p, ts), expected) )
+    # ...
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_table_1()
+    test_table_2()
+    test_table_3()
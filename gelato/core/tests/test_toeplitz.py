@@ -0,0 +1,91 @@
+# coding: utf-8
+
+from numpy import allclose, sort
+from numpy.linalg import eigvalsh
+from scipy.linalg import toeplitz, eigh
+
+from sympy import Symbol
+from sympy import symbols
+
+from gelato.core import Mass, Stiffness, Advection
+from gelato.core import fourier_coefficients
+from gelato.core import toeplitz_coefficients
+from gelato.core import toeplitz_sparse
+from gelato.core import toeplitz_eigenvalues_1d
+from gelato.core import assemble_toeplitz
+from gelato.core import toeplitz_eigenvalues
+from gelato.core import toeplitz_pencil_eigenvalues
+from gelato.core import glt_approximate_eigenvalues
+
+# ...
+def test_toeplitz_1d_1():
+    print('============ test_toeplitz_1d_1 ==============')
+
+    t = Symbol('t')
+
+    for p in [1, 2, 5]:
+        for symbol in [Mass, Stiffness, Advection]:
+            c = toeplitz_coefficients(symbol, p=p)
+            assert( allclose(c, fourier_coefficients(symbol(p, t), t)) )
+
+            # ... banded and dense eigenvalues, for n smaller or larger than
+            #     the band width
+            for n in [3, 20]:
+                col = c[p:][:n].tolist() + [0.]*max(0, n-p-1)
+                row = c[p::-1][:n].tolist() + [0.]*max(0, n-p-1)
+                A = toeplitz(col, row)
+
+                assert( allclose(toeplitz_sparse(c, n).toarray(), A) )
+                assert( allclose(sort(toeplitz_eigenvalues_1d(c, n).real),
+                                 eigvalsh(A)) )
+            # ...
+# ...
+
+# ...
+def test_toeplitz_2d_1():
+    print('============ test_toeplitz_2d_1 ==============')
+
+    tx, ty = symbols('tx ty')
+
+    # ... Kronecker sum, compared to the dense solver
+    symbol = Stiffness(3, tx) + 2 * Stiffness(2, ty)
+    ns = [11, 7]
+
+    A = assemble_toeplitz(symbol, ns).toarray()
+    values = toeplitz_eigenvalues(symbol, ns, max_dense_size=0)
+    assert( allclose(sort(values), eigvalsh(A)) )
+    # ...
+
+    # ... Laplace symbol, scaled by the number of elements of every axis
+    nx = 16
+    ny = 12
+    p = 3
+    symbol = ( nx * Stiffness(p, tx) * Mass(p, ty) / ny +
+               ny * Mass(p, tx) * Stiffness(p, ty) / nx )
+    ns = [nx+p, ny+p]
+
+    A = assemble_toeplitz(symbol, ns).toarray()
+    assert( allclose(toeplitz_eigenvalues(symbol, ns), eigvalsh(A)) )
+
+    # the pencil (A, M) is reduced to 1D problems
+    values, mass = toeplitz_pencil_eigenvalues(symbol, ns)
+
+    M = assemble_toeplitz(mass, ns).toarray()
+    assert( allclose(sort(values), eigh(A, M, eigvals_only=True)) )
+
+    # and approximated by the symbol divided by the masses, which can be
+    # done for large sizes since only 1D problems are solved; the sizes keep
+    # the ratio nx/ny of the symbol
+    nx = 64
+    ny = 48
+    values, mass = toeplitz_pencil_eigenvalues(symbol, [nx+p, ny+p])
+    approx = glt_approximate_eigenvalues(symbol / mass, [p, p], [nx, ny])
+    error = abs(sort(approx) - sort(values)).max() / values.max()
+    assert( error < 0.05 )
+    # ...
+# ...
+
+# .....................................................
+if __name__ == '__main__':
+    test_toeplitz_1d_1()
+    test_toeplitz_2d_1()
@@ -0,0 +1,82 @@
+# coding: utf-8
+
+from numpy import linspace, pi, allclose, meshgrid, conj
+
+from sympy import Symbol
+from sympy import symbols
+from sympy import lambdify
+
+from gelato.core import Mass, Stiffness, Advection
+from gelato.core import TrigPoly, TensorTrigPoly
+from gelato.core import glt_trig_poly
+from gelato.core import symbol_cache_info
+
+# ...
+def test_trigpoly_1d_1():
+    print('============ test_trigpoly_1d_1 ==============')
+
+    t = Symbol('t')
+    ts = linspace(-pi, pi, 65)
+
+    m = glt_trig_poly(Mass, 3)
+    s = glt_trig_poly(Stiffness, 2)
+    a = glt_trig_poly(Advection, 3)
+
+    assert( m == TrigPoly.from_expr(Mass(3, t), t) )
+    assert( m.degree == 3 and m.is_real )
+
+    # ... algebra on the coefficients
+    f = 2 * m * s - s / 4 + 1j * a + 1
+    expected = 2 * m(ts) * s(ts) - s(ts) / 4 + 1j * a(ts) + 1
+    assert( f.degree == 5 )
+    assert( allclose(f(ts), expected) )
+    assert( allclose(f.conjugate()(ts), conj(expected)) )
+
+    # ... conversion to sympy
+    assert( allclose(lambdify(t, f.to_expr(t), 'numpy')(ts), expected) )
+    # ...
+
+    # ... the coefficients are taken from the symbol cache
+    hits = symbol_cache_info().hits
+    assert( glt_trig_poly(Mass, 3) == m )
+    assert( symbol_cache_info().hits == hits + 1 )
+    # ...
+# ...
+
+# ...
+def test_trigpoly_2d_1():
+    print('============ test_trigpoly_2d_1 ==============')
+
+    tx, ty = symbols('tx ty')
+    ts = [linspace(-pi, pi, 17), linspace(-pi, pi, 9)]
+    T1, T2 = meshgrid(*ts, indexing='ij')
+
+    mx = TensorTrigPoly.axis(2, 0, glt_trig_poly(Mass, 2))
+    my = TensorTrigPoly.axis(2, 1, glt_trig_poly(Mass, 3))
+    sx = TensorTrigPoly.axis(2, 0, glt_trig_poly(Stiffness, 2))
+    sy = TensorTrigPoly.axis(2, 1, glt_trig_poly(Stiffness, 3))
+
+    laplace = sx * my + mx * sy
+    assert( laplace.degrees == (2, 3) )
+    assert( len(laplace.terms) == 2 )
+    assert( laplace.is_real )
+
+    expected = lambdify((tx, ty), laplace.to_expr([tx, ty]), 'numpy')(T1, T2)
+    assert( allclose(laplace(*ts), expected) )
+
+    # ... terms with the same factors are merged
+    f = laplace + 2 * sx * my
+    assert( len(f.terms) == 2 )
+
+    # ... product and conjugation
+    g = (laplace + 1j * mx) * (laplace + 1j * mx).conjugate()
+    assert( g.is_real )
+    assert( allclose(g(*ts), abs(expected + 1j * mx(*ts))**2) )
+    # ...
+# ...
+
+###############################################
+if __name__ == '__main__':
+
+    test_trigpoly_1d_1()
+    test_trigpoly_2d_1()
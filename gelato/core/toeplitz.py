@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains functions to assemble the banded Toeplitz matrices (and
+their Kronecker products) associated to GLT symbols, and to compute their
+eigenvalues. They are used as references to validate the symbols, without any
+finite element library."""
+
+from functools import reduce
+from itertools import product
+from collections import OrderedDict
+
+import numpy as np
+from scipy.linalg import eig_banded, eigh, eigvals
+from scipy.sparse import diags, kron
+
+from sympy import Symbol
+from sympy import S
+
+from .glt import BasicGlt
+from .expr import separate_axes
+from .expr import coordinate_names
+from .fourier import fourier_coefficients
+from .fourier import evaluate_on_grid
+
+
+# ...
+def toeplitz_coefficients(symbol, p=None, t=None):
+    """
+    Returns the coefficients c_k, k = -p..p, of the Toeplitz matrices T_n(f),
+    (T_n(f))_{ij} = c_{i-j}, generated by a 1D symbol f(t) = sum_k c_k exp(ikt).
+    The layout is the one of fourier_coefficients.
+
+    symbol: sympy.Expression, BasicGlt subclass, numpy.ndarray
+        a 1D symbol, a 1D GLT symbol class such as Mass (then p must be given),
+        or an array of coefficients that is returned as is
+
+    p: int
+        spline degree, when symbol is a class
+
+    t: sympy.Symbol
+        the Fourier variable. Only needed if the symbol has several free
+        symbols.
+    """
+    if isinstance(symbol, np.ndarray):
+        return np.asarray(symbol, dtype=complex)
+
+    if isinstance(symbol, type) and issubclass(symbol, BasicGlt):
+        if not isinstance(p, int):
+            raise ValueError('> an integer degree must be given')
+
+        t = Symbol('t')
+        symbol = symbol(p, t)
+
+    if t is None:
+        ts = list(symbol.free_symbols)
+        if len(ts) > 1:
+            raise ValueError('> the Fourier variable must be provided')
+        t = ts[0] if ts else Symbol('t')
+
+    return fourier_coefficients(symbol, t)
+
+def _is_hermitian(c):
+    return np.allclose(c, np.conj(c[::-1]))
+
+def _is_skew_hermitian(c):
+    return np.allclose(c, -np.conj(c[::-1]))
+
+def _as_real(c):
+    if np.allclose(c.imag, 0.):
+        return c.real
+    return c
+# ...
+
+# ...
+def toeplitz_band(c, n):
+    """
+    Returns the upper banded storage, as used by scipy.linalg.eig_banded, of the
+    Hermitian Toeplitz matrix of size n generated by the coefficients c.
+
+    c: numpy.ndarray
+        coefficients, as returned by toeplitz_coefficients
+
+    n: int
+        size of the matrix
+    """
+    c = _as_real(np.asarray(c))
+    p = (len(c) - 1) // 2
+    u = min(p, n-1)
+
+    # ... a_band[u + i - j, j] = a[i, j] = c_{i-j} for i <= j
+    ab = np.zeros((u+1, n), dtype=c.dtype)
+    for d in range(0, u+1):
+        ab[u-d, d:] = c[p-d]
+    # ...
+
+    return ab
+
+def toeplitz_sparse(c, n, format='csr'):
+    """
+    Returns the Toeplitz matrix of size n generated by the coefficients c, as a
+    scipy.sparse matrix.
+
+    c: numpy.ndarray
+        coefficients, as returned by toeplitz_coefficients
+
+    n: int
+        size of the matrix
+
+    format: str
+        scipy.sparse format of the result
+    """
+    c = _as_real(np.asarray(c))
+    p = (len(c) - 1) // 2
+    u = min(p, n-1)
+
+    # ... the d-th diagonal (j - i = d) is c_{-d}
+    offsets = list(range(-u, u+1))
+    values  = [c[p-d] for d in offsets]
+    # ...
+
+    return diags(values, offsets, shape=(n, n), format=format)
+# ...
+
+# ...
+def _numerical_coefficient(coeff):
+    if not( coeff.is_number ):
+        raise ValueError('> free symbols {} must be given a value'.format(coeff.free_symbols))
+    c = complex(coeff)
+    if c.imag == 0.:
+        return c.real
+    return c
+
+def _axis_coefficients(factor, axis, dim):
+    """Coefficients of a 1D factor returned by separate_axes."""
+    if factor.is_number:
+        return np.array([complex(factor)])
+
+    t = Symbol('t{}'.format(coordinate_names(dim)[axis]))
+    names = [i.name for i in factor.free_symbols]
+    if [i for i in names if not( i == t.name )]:
+        raise ValueError('> {} depends on the position variables'.format(factor))
+
+    factor = factor.subs({i: t for i in factor.free_symbols})
+    return toeplitz_coefficients(factor, t=t)
+
+def assemble_toeplitz(expr, ns, format='csr'):
+    """
+    Assembles the matrix associated to a separable symbol, with constant
+    coefficients, as a sum of Kronecker products of 1D Toeplitz matrices.
+
+    expr: sympy.Expression
+        a symbol as returned by gelatize, for given degrees and number of
+        elements
+
+    ns: int, list, tuple
+        size of the 1D matrices in every direction
+
+    format: str
+        scipy.sparse format of the result
+    """
+    if isinstance(ns, int):
+        ns = [ns]
+    dim = len(ns)
+
+    terms = separate_axes(expr, dim)
+    if terms is None:
+        raise ValueError('> Expecting a separable symbol')
+
+    N = int(np.prod(ns))
+    A = diags([np.zeros(N)], [0], shape=(N, N), format=format)
+    for coeff, factors in terms:
+        c = _numerical_coefficient(coeff)
+
+        mats = [toeplitz_sparse(_axis_coefficients(f, i, dim), n, format=format)
+                for i, (f, n) in enumerate(zip(factors, ns))]
+        B = reduce(lambda x, y: kron(x, y, format=format), mats)
+
+        A = A + c * B
+
+    return A.asformat(format)
+# ...
+
+# ...
+def toeplitz_eigenvalues_1d(c, n):
+    """
+    Computes the eigenvalues of the Toeplitz matrix of size n generated by the
+    coefficients c, in ascending order for a Hermitian matrix. Hermitian (real
+    symbol) and skew-Hermitian (imaginary symbol) matrices are treated with
+    scipy.linalg.eig_banded, the latter through the Hermitian matrix -i T.
+    Other matrices are treated with a dense solver.
+
+    c: numpy.ndarray
+        coefficients, as returned by toeplitz_coefficients
+
+    n: int
+        size of the matrix
+    """
+    c = np.asarray(c, dtype=complex)
+
+    if _is_hermitian(c):
+        return eig_banded(toeplitz_band(c, n), lower=False, eigvals_only=True)
+
+    elif _is_skew_hermitian(c):
+        ab = toeplitz_band(-1.j*c, n)
+        return 1.j * eig_banded(ab, lower=False, eigvals_only=True)
+
+    return eigvals(toeplitz_sparse(c, n).toarray())
+
+def toeplitz_pencil_eigenvalues_1d(c, m, n):
+    """
+    Computes the generalized eigenvalues of the pencil (T_n(f), T_n(g)), where
+    the coefficients c and m are respectively those of f and g, and g is
+    positive (such as a mass symbol).
+
+    c: numpy.ndarray
+        coefficients of f
+
+    m: numpy.ndarray
+        coefficients of g
+
+    n: int
+        size of the matrices
+    """
+    c = np.asarray(c, dtype=complex)
+    m = np.asarray(m, dtype=complex)
+
+    A = toeplitz_sparse(c, n).toarray()
+    B = toeplitz_sparse(m, n).toarray()
+
+    if _is_hermitian(c) and _is_hermitian(m):
+        return eigh(A, B, eigvals_only=True)
+
+    return eigvals(A, B)
+
+def kronecker_sum_eigenvalues(values):
+    """
+    Returns the eigenvalues of the Kronecker sum A_1 + ... + A_d, where
+    A_k = I x ... x A_k x ... x I, from the eigenvalues of the 1D matrices,
+    ordered as the flat (C order) tensor grid.
+
+    values: list
+        list of the 1D eigenvalues arrays
+    """
+    return reduce(np.add.outer, values).ravel()
+# ...
+
+# ...
+def _normalize_terms(terms):
+    """Moves the rational content of the 1D factors to the coefficients, since
+    numbers are distributed over sums: n*Mass(p, t) is not a multiple of
+    Mass(p, t) for sympy."""
+    normalized = []
+    for coeff, factors in terms:
+        fs = []
+        for f in factors:
+            if f.is_Add:
+                content, f = f.primitive()
+                coeff = coeff * content
+            fs.append(f)
+        normalized.append((coeff, tuple(fs)))
+
+    return normalized
+
+def _kronecker_sum(terms, masses):
+    """
+    Tries to write a list of separable terms as sum_k F_k(t_k) prod_{j != k}
+    masses[j](t_j). Returns the list of the factors F_k, or None.
+    """
+    dim = len(masses)
+
+    axes = [S.Zero]*dim
+    for coeff, factors in terms:
+        others = [i for i in range(0, dim) if not( factors[i] == masses[i] )]
+        if len(others) > 1:
+            return None
+
+        k = others[0] if others else 0
+        axes[k] = axes[k] + coeff * factors[k]
+
+    return axes
+
+def _is_positive(factor, axis, dim):
+    if factor.is_number:
+        return complex(factor).imag == 0. and complex(factor).real > 0.
+
+    t = Symbol('t{}'.format(coordinate_names(dim)[axis]))
+    try:
+        # the grid contains t = 0, where derivative symbols vanish
+        values = evaluate_on_grid(factor, 65, t=t)
+    except ValueError:
+        return False
+
+    if np.iscomplexobj(values):
+        return False
+    return values.min() > 1.e-10 * np.abs(values).max()
+
+def _mass_factors(terms, dim):
+    """Returns, for every axis, a positive 1D factor g_j such that the terms are
+    of the form f_k(t_k) prod_{j != k} g_j(t_j), or None. Factors appearing in
+    most terms are tried first."""
+    candidates = []
+    for i in range(0, dim):
+        counts = OrderedDict()
+        for coeff, factors in terms:
+            counts[factors[i]] = counts.get(factors[i], 0) + 1
+
+        fs = [f for f in counts.keys() if _is_positive(f, i, dim)]
+        candidates.append(sorted(fs, key=lambda f: -counts[f]))
+
+    for masses in product(*candidates):
+        if not( _kronecker_sum(terms, masses) is None ):
+            return list(masses)
+
+    return None
+
+def toeplitz_eigenvalues(expr, ns, max_dense_size=4096):
+    """
+    Computes the eigenvalues of the matrix associated to a separable symbol,
+    with constant coefficients. When the symbol is a sum of univariate terms
+    (for instance in 1D), the matrix is a Kronecker sum and its eigenvalues are
+    sums of the banded 1D eigenvalues. Otherwise, a dense solver is used if the
+    matrix size does not exceed max_dense_size.
+
+    expr: sympy.Expression
+        a symbol as returned by gelatize, for given degrees and number of
+        elements
+
+    ns: int, list, tuple
+        size of the 1D matrices in every direction
+
+    max_dense_size: int
+        maximum size of the matrix for the dense fallback
+    """
+    if isinstance(ns, int):
+        ns = [ns]
+    dim = len(ns)
+
+    terms = separate_axes(expr, dim)
+    if terms is None:
+        raise ValueError('> Expecting a separable symbol')
+
+    axes = _kronecker_sum(_normalize_terms(terms), [S.One]*dim)
+    if not( axes is None ):
+        values = [toeplitz_eigenvalues_1d(_axis_coefficients(f, i, dim), n)
+                  for i, (f, n) in enumerate(zip(axes, ns))]
+        return kronecker_sum_eigenvalues(values)
+
+    if np.prod(ns) > max_dense_size:
+        raise ValueError('> the matrix is not a Kronecker sum and its size '
+                         'exceeds max_dense_size')
+
+    A = assemble_toeplitz(expr, ns).toarray()
+    if np.allclose(A, np.conj(A.T)):
+        return np.linalg.eigvalsh(A)
+    return np.linalg.eigvals(A)
+
+def toeplitz_pencil_eigenvalues(expr, ns, masses=None):
+    """
+    Computes the generalized eigenvalues of the pencil (A, M_1 x ... x M_d),
+    where A is the matrix associated to a separable symbol of the form
+    sum_k f_k(t_k) prod_{j != k} g_j(t_j) and M_j is the Toeplitz matrix of
+    g_j. They are sums of the eigenvalues of the 1D pencils (T(f_k), T(g_k)),
+    and are approximated by sampling the symbol divided by prod_j g_j.
+    Returns the eigenvalues and the product prod_j g_j.
+
+    expr: sympy.Expression
+        a symbol as returned by gelatize, for given degrees and number of
+        elements
+
+    ns: int, list, tuple
+        size of the 1D matrices in every direction
+
+    masses: list
+        the 1D symbols g_j. By default, they are searched among the positive
+        1D factors of the symbol, the most frequent ones first.
+    """
+    if isinstance(ns, int):
+        ns = [ns]
+    dim = len(ns)
+
+    terms = separate_axes(expr, dim)
+    if terms is None:
+        raise ValueError('> Expecting a separable symbol')
+    terms = _normalize_terms(terms)
+
+    if masses is None:
+        masses = _mass_factors(terms, dim)
+        if masses is None:
+            raise ValueError('> could not find positive factors g_j')
+
+    axes = _kronecker_sum(terms, masses)
+    if axes is None:
+        raise ValueError('> the symbol is not a sum of univariate terms times '
+                         'the given masses')
+
+    values = []
+    for i, (f, g, n) in enumerate(zip(axes, masses, ns)):
+        c = _axis_coefficients(f, i, dim)
+        m = _axis_coefficients(g, i, dim)
+        values.append(toeplitz_pencil_eigenvalues_1d(c, m, n))
+
+    return kronecker_sum_eigenvalues(values), reduce(lambda x, y: x*y, masses)
+# ...
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+#
+#
+"""This module contains numerical trigonometric polynomials. A TrigPoly holds
+the coefficients c_k, k = -p..p, of a 1D symbol f(t) = sum_k c_k exp(i k t),
+and a TensorTrigPoly is a sum of tensor products of 1D polynomials. Their
+algebra (addition, multiplication, scaling and conjugation) only acts on the
+numpy arrays of the coefficients."""
+
+from numbers import Number
+
+import numpy as np
+
+from sympy import cos, sin
+from sympy import I as sympy_I
+from sympy import S
+
+from .fourier import fourier_coefficients
+from .clenshaw import trig_clenshaw
+from .glt import symbol_orders, derivative_coefficients
+
+
+# ...
+def _trim(c):
+    """Removes the vanishing extreme coefficients of a centered array."""
+    p = (len(c) - 1) // 2
+    while p > 0 and c[0] == 0 and c[-1] == 0:
+        c = c[1:-1]
+        p -= 1
+    return c
+
+def _pad(c, p):
+    """Pads a centered array of coefficients to the degree p."""
+    q = (len(c) - 1) // 2
+    if q == p:
+        return c
+    return np.pad(c, (p-q, p-q))
+
+def _cos_sin_coefficients(c):
+    """Returns the cosine and sine coefficients (a_k, b_k), k = 0..p, of a
+    centered array of coefficients."""
+    p = (len(c) - 1) // 2
+    a = np.empty(p+1, dtype=complex)
+    b = np.zeros(p+1, dtype=complex)
+
+    a[0] = c[p]
+    a[1:] = c[p+1:] + c[:p][::-1]
+    b[1:] = 1.j * (c[p+1:] - c[:p][::-1])
+
+    return a, b
+
+def _evaluate(c, t):
+    a, b = _cos_sin_coefficients(c)
+    if not b.any():
+        b = None
+    return trig_clenshaw(a, b, t)
+# ...
+
+# ...
+class TrigPoly(object):
+    """
+    A 1D trigonometric polynomial f(t) = sum_k c_k exp(i k t), k = -p..p.
+
+    coeffs: list, tuple, numpy.ndarray
+        the 2p+1 coefficients, c_k being stored at the position p+k, as
+        returned by fourier_coefficients
+    """
+    __slots__ = ('coeffs',)
+
+    def __init__(self, coeffs):
+        coeffs = np.asarray(coeffs, dtype=complex)
+        if not( coeffs.ndim == 1 ) or not( len(coeffs) % 2 == 1 ):
+            raise ValueError('> Expecting an array of odd size')
+
+        self.coeffs = _trim(coeffs)
+
+    @classmethod
+    def from_expr(cls, expr, t):
+        """
+        Creates a polynomial from a sympy trigonometric polynomial in t.
+        """
+        return cls(fourier_coefficients(expr, t))
+
+    @classmethod
+    def constant(cls, value):
+        return cls([value])
+
+    @property
+    def degree(self):
+        return (len(self.coeffs) - 1) // 2
+
+    @property
+    def is_real(self):
+        """True if the polynomial is real for real values of t."""
+        return np.allclose(self.coeffs, np.conj(self.coeffs[::-1]))
+
+    def __repr__(self):
+        return 'TrigPoly(degree={})'.format(self.degree)
+
+    def __eq__(self, other):
+        if isinstance(other, Number):
+            other = TrigPoly.constant(other)
+
+        if not isinstance(other, TrigPoly):
+            return NotImplemented
+
+        p = max(self.degree, other.degree)
+        return np.allclose(_pad(self.coeffs, p), _pad(other.coeffs, p))
+
+    def __ne__(self, other):
+        r = self.__eq__(other)
+        if r is NotImplemented:
+            return r
+        return not r
+
+    __hash__ = None
+
+    def __neg__(self):
+        return TrigPoly(-self.coeffs)
+
+    def __add__(self, other):
+        if isinstance(other, Number):
+            other = TrigPoly.constant(other)
+
+        if not isinstance(other, TrigPoly):
+            return NotImplemented
+
+        p = max(self.degree, other.degree)
+        return TrigPoly(_pad(self.coeffs, p) + _pad(other.coeffs, p))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Number):
+            return TrigPoly(complex(other) * self.coeffs)
+
+        if not isinstance(other, TrigPoly):
+            return NotImplemented
+
+        if other.degree == 0:
+            return TrigPoly(other.coeffs[0] * self.coeffs)
+
+        elif self.degree == 0:
+            return TrigPoly(self.coeffs[0] * other.coeffs)
+
+        # the product of exponentials is a convolution of the coefficients
+        return TrigPoly(np.convolve(self.coeffs, other.coeffs))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        return TrigPoly(self.coeffs / complex(other))
+
+    def conjugate(self):
+        """Returns the complex conjugate of the polynomial, for real t."""
+        return TrigPoly(np.conj(self.coeffs[::-1]))
+
+    conj = conjugate
+
+    def __call__(self, t):
+        """
+        Evaluates the polynomial using the Clenshaw recurrence. The values are
+        real if the polynomial is real.
+
+        t: float, numpy.ndarray
+            the points
+        """
+        values = _evaluate(self.coeffs, t)
+        if self.is_real:
+            values = np.real(values)
+        return values
+
+    def to_expr(self, t):
+        """Returns the polynomial as a sympy expression in t."""
+        a, b = _cos_sin_coefficients(self.coeffs)
+
+        def _number(v):
+            if v.imag == 0:
+                return S(float(v.real))
+            return S(float(v.real)) + sympy_I * S(float(v.imag))
+
+        expr = _number(a[0])
+        for k in range(1, self.degree+1):
+            if not( a[k] == 0 ):
+                expr += _number(a[k]) * cos(k * t)
+            if not( b[k] == 0 ):
+                expr += _number(b[k]) * sin(k * t)
+
+        return expr
+# ...
+
+# ...
+class TensorTrigPoly(object):
+    """
+    A multivariate trigonometric polynomial, given as a sum of tensor products
+    of 1D polynomials, f(t_1, ..., t_d) = sum_j coeff_j prod_i f_ji(t_i).
+    Terms with the same 1D factors are merged.
+
+    dim: int
+        number of variables
+
+    terms: list
+        list of (coeff, factors), where factors is a list of dim TrigPoly (or
+        arrays of coefficients)
+    """
+    __slots__ = ('dim', 'terms')
+
+    def __init__(self, dim, terms=()):
+        self.dim = dim
+
+        # ... merging the terms with the same factors
+        d = {}
+        for coeff, factors in terms:
+            if not( len(factors) == dim ):
+                raise ValueError('> Expecting {} factors'.format(dim))
+
+            factors = tuple(f if isinstance(f, TrigPoly) else TrigPoly(f)
+                            for f in factors)
+            key = tuple(f.coeffs.tobytes() for f in factors)
+            if key in d:
+                d[key] = (d[key][0] + complex(coeff), d[key][1])
+            else:
+                d[key] = (complex(coeff), factors)
+
+        self.terms = [(c, fs) for c, fs in d.values() if not( c == 0 )]
+        # ...
+
+    @classmethod
+    def constant(cls, dim, value):
+        return cls(dim, [(value, [TrigPoly.constant(1.)]*dim)])
+
+    @classmethod
+    def axis(cls, dim, axis, f):
+        """
+        Returns the polynomial f(t_axis), where f is a TrigPoly.
+        """
+        factors = [TrigPoly.constant(1.)]*dim
+        factors[axis] = f
+        return cls(dim, [(1., factors)])
+
+    @property
+    def degrees(self):
+        """Maximum degree of the polynomial in every variable."""
+        return tuple(max([fs[i].degree for c, fs in self.terms] + [0])
+                     for i in range(0, self.dim))
+
+    @property
+    def is_real(self):
+        """True if the polynomial is real for real values of the variables."""
+        c = self.toarray()
+        return np.allclose(c, np.conj(c[(slice(None, None, -1),)*self.dim]))
+
+    def __repr__(self):
+        return 'TensorTrigPoly(dim={dim}, n_terms={n}, degrees={p})'.format(
+            dim=self.dim, n=len(self.terms), p=self.degrees)
+
+    def _coerce(self, other):
+        if isinstance(other, Number):
+            return TensorTrigPoly.constant(self.dim, other)
+
+        if isinstance(other, TensorTrigPoly):
+            if not( other.dim == self.dim ):
+                raise ValueError('> Incompatible dimensions')
+            return other
+
+        return None
+
+    def __neg__(self):
+        return TensorTrigPoly(self.dim, [(-c, fs) for c, fs in self.terms])
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+
+        return TensorTrigPoly(self.dim, self.terms + other.terms)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Number):
+            return TensorTrigPoly(self.dim, [(complex(other) * c, fs)
+                                             for c, fs in self.terms])
+
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+
+        terms = []
+        for c1, fs1 in self.terms:
+            for c2, fs2 in other.terms:
+                fs = [f1 * f2 for f1, f2 in zip(fs1, fs2)]
+                terms.append((c1 * c2, fs))
+
+        return TensorTrigPoly(self.dim, terms)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        return self * (1. / complex(other))
+
+    def conjugate(self):
+        """Returns the complex conjugate of the polynomial, for real t."""
+        return TensorTrigPoly(self.dim, [(np.conj(c), [f.conjugate() for f in fs])
+                                         for c, fs in self.terms])
+
+    conj = conjugate
+
+    def toarray(self):
+        """
+        Returns the dense array of the coefficients c_k, of shape (2p_1+1, ...,
+        2p_d+1), c_k being stored at the position (p_1+k_1, ..., p_d+k_d).
+        """
+        ps = self.degrees
+        c = np.zeros([2*p+1 for p in ps], dtype=complex)
+        for coeff, fs in self.terms:
+            arrays = [_pad(f.coeffs, p) for f, p in zip(fs, ps)]
+            c += coeff * _outer(arrays)
+        return c
+
+    def __call__(self, *ts):
+        """
+        Evaluates the polynomial on the tensor grid of the 1D points ts, of
+        shape (len(t_1), ..., len(t_d)). Every distinct 1D factor is evaluated
+        once, using the Clenshaw recurrence.
+
+        ts: numpy.ndarray
+            the points of every variable
+        """
+        if not( len(ts) == self.dim ):
+            raise ValueError('> Expecting {} arrays of points'.format(self.dim))
+
+        ts = [np.asarray(t, dtype=float) for t in ts]
+
+        values = np.zeros([t.size for t in ts], dtype=complex)
+        cache = {}
+        for coeff, fs in self.terms:
+            arrays = []
+            for i, (f, t) in enumerate(zip(fs, ts)):
+                key = (i, f.coeffs.tobytes())
+                if not key in cache:
+                    cache[key] = _evaluate(f.coeffs, t.ravel()) + 0. * t.ravel()
+                arrays.append(cache[key])
+
+            values += coeff * _outer(arrays)
+
+        if self.is_real:
+            values = values.real
+
+        return values
+
+    def to_expr(self, ts):
+        """
+        Returns the polynomial as a sympy expression.
+
+        ts: list, tuple
+            the sympy symbols of the variables
+        """
+        expr = S.Zero
+        for coeff, fs in self.terms:
+            term = complex(coeff)
+            if term.imag == 0:
+                term = S(term.real)
+            else:
+                term = S(term.real) + sympy_I * S(term.imag)
+
+            for f, t in zip(fs, ts):
+                term = term * f.to_expr(t)
+
+            expr += term
+
+        return expr
+# ...
+
+# ...
+def _outer(arrays):
+    r = arrays[0]
+    for a in arrays[1:]:
+        r = np.multiply.outer(r, a)
+    return r
+# ...
+
+# ...
+def glt_trig_poly(symbol, p):
+    """
+    Returns the TrigPoly of a 1D GLT symbol. Its coefficients are the sympy
+    rationals of derivative_coefficients, converted to floats, which are
+    computed once per degree and kept in the (bounded and thread-safe)
+    symbol cache.
+
+    symbol: DerivativeSymbol subclass, str, tuple
+        a 1D GLT symbol class such as Mass, its name, or the orders (r, s) of
+        the derivatives of a DerivativeSymbol
+
+    p: int
+        spline degree
+    """
+    r, s, unit = symbol_orders(symbol)
+
+    # ... c_k = (-1)^s phi_k and c_{-k} = (-1)^n c_k, with n = r+s
+    n = r + s
+    phi = np.array([float(c) for c in derivative_coefficients(p, n)])
+
+    c = np.zeros(2*p+1, dtype=complex)
+    c[p:] = phi
+    c[:p] = (-1)**n * phi[1:][::-1]
+    c *= (-1)**s / complex(unit)
+    # ...
+
+    return TrigPoly(c)
+# ...
@@ -40,6 +40,13 @@ class LatexPrinter(LatexPrinterSympy):
     def _print_Bilaplacian(self, expr):
         return self._print_BasicGlt('b', *expr.args)
 
+    def _print_DerivativeSymbol(self, expr):
+        p, r, s, t = expr.args
+
+        # the orders of the derivatives are printed as a superscript
+        name, index = self._print_BasicGlt('d', p, t).split('_', 1)
+        return name + '^{(' + '{},{}'.format(r, s) + ')}_' + index
+
 def latex(expr, **settings):
 
     coords = ['x', 'y', 'z']